@@ -0,0 +1,200 @@
+# Aho Corasick Implementation
+# References:
+# https://dl.acm.org/doi/10.1145/360825.360855
+# https://www.cs.princeton.edu/~wayne/cs423/lectures/stringsearch-4up.pdf
+from array import array
+from bisect import bisect_left
+from collections import deque
+
+BINARY_TYPES = (bytes, bytearray, memoryview)
+
+
+class AhoCorasick:
+    """
+    Multi pattern search. Finds every occurrence of every
+    pattern in a single pass over the text.
+
+    The automaton is a trie of the patterns with failure
+    links. The failure link of a state is the longest proper
+    suffix of the state that is also a prefix of some pattern,
+    exactly what the KMP LCS table stores for one pattern.
+
+    Initialize with a list of patterns (all str or all
+    bytes-like); a pattern's id is its index in the list.
+    With compact=True the automaton is packed into flat
+    arrays after construction, which takes a fraction of
+    the memory of the dict based trie for large
+    dictionaries at the cost of a binary search per
+    transition.
+    """
+
+    def __init__(self, patterns, compact=False):
+        self.patterns = [bytes(p) if isinstance(p, (bytearray, memoryview)) else p for p in patterns]
+        if not self.patterns:
+            raise ValueError("At least one pattern is required")
+        self.binary = isinstance(self.patterns[0], bytes)
+        for pattern in self.patterns:
+            if not pattern:
+                raise ValueError("Empty Pattern")
+            if isinstance(pattern, bytes) != self.binary:
+                raise TypeError("patterns must all be str or all be bytes-like")
+        self.pattern_lengths = [len(p) for p in self.patterns]
+
+        self.build_trie()
+        self.build_failure_links()
+        self.compact = compact
+        if compact:
+            self.pack()
+
+    def build_trie(self):
+        """
+        goto[state] maps a character to the next state,
+        out[state] lists the ids of the patterns ending
+        at state. State 0 is the root.
+        """
+        self.goto = [{}]
+        self.out = [[]]
+        for pattern_id, pattern in enumerate(self.patterns):
+            state = 0
+            for c in pattern:
+                next_state = self.goto[state].get(c)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][c] = next_state
+                    self.goto.append({})
+                    self.out.append([])
+                state = next_state
+            self.out[state].append(pattern_id)
+
+    def build_failure_links(self):
+        """
+        Breadth first over the trie. The failure link of
+        the child of state on c is found by following the
+        failure links of state until some state has a
+        transition on c, the same fallback KMP does through
+        its LCS table.
+
+        dict_link[state] is the nearest state on the failure
+        chain which ends a pattern (or 0), so reporting the
+        matches only walks states that have output.
+        """
+        states = len(self.goto)
+        self.fail = [0] * states
+        self.dict_link = [0] * states
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for c, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and c not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(c, 0)
+                self.fail[child] = target if target != child else 0
+                self.dict_link[child] = self.fail[child] if self.out[self.fail[child]] \
+                    else self.dict_link[self.fail[child]]
+
+    def pack(self):
+        """
+        Packs the automaton into flat arrays (CSR layout):
+        the transitions of state s are labels/targets from
+        offsets[s] to offsets[s + 1], sorted by label, and the
+        outputs of s are out_ids from out_offsets[s] to
+        out_offsets[s + 1]. Labels are character codes.
+        The dict based trie is dropped afterwards.
+        """
+        self.offsets = array("q", [0])
+        self.labels = array("q")
+        self.targets = array("q")
+        self.out_offsets = array("q", [0])
+        self.out_ids = array("q")
+        for state, transitions in enumerate(self.goto):
+            for c in sorted(transitions, key=self._code):
+                self.labels.append(self._code(c))
+                self.targets.append(transitions[c])
+            self.offsets.append(len(self.labels))
+            self.out_ids.extend(self.out[state])
+            self.out_offsets.append(len(self.out_ids))
+        self.fail = array("q", self.fail)
+        self.dict_link = array("q", self.dict_link)
+        self.goto = None
+        self.out = None
+
+    def _code(self, c):
+        return c if self.binary else ord(c)
+
+    def state_count(self):
+        return len(self.fail)
+
+    def finditer(self, text):
+        """
+        Generator yielding (pattern id, offset) for every
+        occurrence in text, ordered by the position where the
+        occurrence ends, longer patterns first.
+        """
+        if self.binary != isinstance(text, BINARY_TYPES):
+            raise TypeError("patterns and text must both be str or both be bytes-like")
+        if self.compact:
+            return self._scan_compact(text)
+        return self._scan(text)
+
+    def findall(self, text):
+        """
+        Returns the list of (pattern id, offset) of all the
+        occurrences in text.
+        """
+        return list(self.finditer(text))
+
+    def _scan(self, text):
+        goto = self.goto
+        fail = self.fail
+        out = self.out
+        dict_link = self.dict_link
+        lengths = self.pattern_lengths
+        state = 0
+        for i, c in enumerate(text):
+            while True:
+                next_state = goto[state].get(c)
+                if next_state is not None:
+                    state = next_state
+                    break
+                if state == 0:
+                    break
+                state = fail[state]
+
+            match_state = state if out[state] else dict_link[state]
+            while match_state:
+                for pattern_id in out[match_state]:
+                    yield pattern_id, i - lengths[pattern_id] + 1
+                match_state = dict_link[match_state]
+
+    def _scan_compact(self, text):
+        offsets = self.offsets
+        labels = self.labels
+        targets = self.targets
+        fail = self.fail
+        dict_link = self.dict_link
+        out_offsets = self.out_offsets
+        out_ids = self.out_ids
+        lengths = self.pattern_lengths
+        binary = self.binary
+        state = 0
+        for i, c in enumerate(text):
+            code = c if binary else ord(c)
+            while True:
+                lo = offsets[state]
+                hi = offsets[state + 1]
+                k = bisect_left(labels, code, lo, hi)
+                if k < hi and labels[k] == code:
+                    state = targets[k]
+                    break
+                if state == 0:
+                    break
+                state = fail[state]
+
+            match_state = state if out_offsets[state] != out_offsets[state + 1] else dict_link[state]
+            while match_state:
+                for k in range(out_offsets[match_state], out_offsets[match_state + 1]):
+                    pattern_id = out_ids[k]
+                    yield pattern_id, i - lengths[pattern_id] + 1
+                match_state = dict_link[match_state]
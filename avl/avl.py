@@ -1,14 +1,254 @@
 from avl.node import Node
 
+# treeStats, treeSnapshot and bulkLookup are imported by the methods
+# that use them, so importing the tree does not load them.
+
 
 class AVLTree:
     """
     Adelson-Velsky and Landis Tree Implementation
     Initiatize with no parameter to constructor.
+    With orderStatistics=True every node also keeps
+    the size of its subtree, which enables rank(),
+    select(), countRange() and median() in O(log n).
+    enableStats() attaches operation counters, see
+    treeStats.
     """
 
-    def __init__(self):
+    def __init__(self, orderStatistics=False):
         self.root = None
+        self.orderStatistics = orderStatistics
+        self.stats = None
+        # sorted keys for searchMany, None once the keys change
+        self.frozenKeys = None
+
+    def enableStats(self):
+        """
+        Starts counting comparisons, rotations and search
+        visits. Returns the TreeStats being updated.
+        """
+        from treeStats.treeStats import TreeStats
+        if self.stats is None:
+            self.stats = TreeStats()
+        return self.stats
+
+    def disableStats(self):
+        self.stats = None
+
+    def resetStats(self):
+        if self.stats is not None:
+            self.stats.reset()
+
+    def statsSnapshot(self):
+        """
+        Counters and current height as a dict, None when
+        stats are not enabled.
+        """
+        if self.stats is None:
+            return None
+        return self.stats.snapshot(self.getDepth(self.root))
+
+    @classmethod
+    def fromSorted(cls, keys, orderStatistics=False):
+        """
+        Builds a perfectly balanced tree from keys in
+        ascending order in O(n). Equal neighbours are
+        kept once, a descending pair raises ValueError.
+        """
+        tree = cls(orderStatistics)
+        keys = tree.uniqueSorted(keys)
+        tree.root = tree.buildBalanced(keys, 0, len(keys))
+        return tree
+
+    def bulkLoad(self, keys):
+        """
+        Adds keys in any order to the tree by sorting
+        them together with the keys already present and
+        rebuilding a perfectly balanced tree.
+        """
+        merged = sorted(set(self.keysInOrder()).union(keys))
+        self.root = self.buildBalanced(merged, 0, len(merged))
+        self.frozenKeys = None
+
+    def save(self, path, keyType=None):
+        """
+        Writes the keys to a binary snapshot, see
+        treeSnapshot. keyType is 'q' or 'd', by default
+        picked from the keys.
+        """
+        from treeSnapshot.treeSnapshot import write_snapshot
+        write_snapshot(path, self.keysInOrder(), keyType)
+
+    @classmethod
+    def load(cls, path, orderStatistics=False):
+        """
+        Builds a perfectly balanced tree from a snapshot
+        in linear time, reading the keys through a
+        memory map. Raises ValueError if the keys in the
+        file are not sorted and unique.
+        """
+        from treeSnapshot.treeSnapshot import SnapshotView
+        tree = cls(orderStatistics)
+        with SnapshotView(path) as view:
+            view.validate()
+            tree.root = tree.buildBalanced(view.keys, 0, len(view))
+        return tree
+
+    @staticmethod
+    def uniqueSorted(keys):
+        """
+        Returns keys as a list without duplicates,
+        checking that they are in ascending order.
+        """
+        unique = []
+        for key in keys:
+            if unique and key <= unique[-1]:
+                if key == unique[-1]:
+                    continue
+                raise ValueError("keys are not sorted: " + str(key) + " after " + str(unique[-1]))
+            unique.append(key)
+        return unique
+
+    def buildBalanced(self, keys, lo, hi):
+        """
+        Builds the subtree of keys[lo:hi] with the middle
+        key as root, so the depths of any two subtrees
+        differ by at most one and no rotation is needed.
+        """
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        root = Node(keys[mid])
+        root.left = self.buildBalanced(keys, lo, mid)
+        root.right = self.buildBalanced(keys, mid + 1, hi)
+        self.updateDepth(root)
+        return root
+
+    def keysInOrder(self):
+        """
+        Returns the keys in ascending order.
+        """
+        return list(self.ascending())
+
+    def __iter__(self):
+        return self.ascending()
+
+    def ascending(self):
+        """
+        Generator over the keys in ascending order. It
+        keeps an explicit stack of O(log n) nodes instead
+        of recursing; the tree must not be modified while
+        the generator is in use.
+        """
+        stack = []
+        node = self.root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.data
+            node = node.right
+
+    def descending(self):
+        """
+        Generator over the keys in descending order.
+        """
+        stack = []
+        node = self.root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.right
+            node = stack.pop()
+            yield node.data
+            node = node.left
+
+    def range(self, lo, hi):
+        """
+        Generator over the keys with lo <= key <= hi in
+        ascending order. Seeks to lo in O(log n), so a
+        scan yielding k keys costs O(log n + k).
+        """
+        stack = []
+        node = self.root
+        while node:
+            if node.data < lo:
+                node = node.right
+            else:
+                stack.append(node)
+                node = node.left
+        while stack:
+            node = stack.pop()
+            if node.data > hi:
+                return
+            yield node.data
+            node = node.right
+            while node:
+                stack.append(node)
+                node = node.left
+
+    def floor(self, key):
+        """
+        Largest key <= key, None if there is none.
+        """
+        found = None
+        node = self.root
+        while node:
+            if node.data == key:
+                return node.data
+            if node.data < key:
+                found = node.data
+                node = node.right
+            else:
+                node = node.left
+        return found
+
+    def ceiling(self, key):
+        """
+        Smallest key >= key, None if there is none.
+        """
+        found = None
+        node = self.root
+        while node:
+            if node.data == key:
+                return node.data
+            if node.data > key:
+                found = node.data
+                node = node.left
+            else:
+                node = node.right
+        return found
+
+    def predecessor(self, key):
+        """
+        Largest key < key, None if there is none. key
+        itself does not have to be in the tree.
+        """
+        found = None
+        node = self.root
+        while node:
+            if node.data < key:
+                found = node.data
+                node = node.right
+            else:
+                node = node.left
+        return found
+
+    def successor(self, key):
+        """
+        Smallest key > key, None if there is none. key
+        itself does not have to be in the tree.
+        """
+        found = None
+        node = self.root
+        while node:
+            if node.data > key:
+                found = node.data
+                node = node.left
+            else:
+                node = node.right
+        return found
 
     def search(self, key):
         """
@@ -17,8 +257,46 @@ class AVLTree:
         returns parent and node if found. Parent is None
         if key is the root.
         """
+        if self.stats is not None:
+            self.stats.searches += 1
         return self.searchUtil(self.root, None, key)
 
+    def searchMany(self, keys, positions=False):
+        """
+        Looks up a batch of keys at once, see bulkLookup.
+        Returns for every key whether it is in the tree,
+        or with positions=True its index in ascending
+        order and -1 when absent. The sorted keys are
+        copied on the first call and reused until the
+        tree changes.
+        """
+        from bulkLookup.bulkLookup import search_many
+        return search_many(self.freezeKeys(), keys, positions)
+
+    def freezeKeys(self):
+        """
+        The sorted copy of the keys used by searchMany,
+        made now if the tree changed since the last one.
+        """
+        if self.frozenKeys is None:
+            from bulkLookup.bulkLookup import freeze
+            self.frozenKeys = freeze(self.ascending())
+        return self.frozenKeys
+
+    def findNode(self, key):
+        """
+        The node holding key or None. Not counted in the
+        stats: insert() and delete() use it to check for
+        duplicate and missing keys, a check RedBlackTree
+        does as part of its own descent.
+        """
+        node = self.root
+        while node:
+            if key == node.data:
+                return node
+            node = node.left if key < node.data else node.right
+        return None
+
     def searchUtil(self, root, parent, key):
         """
         Searched the tree recursively using the
@@ -27,6 +305,9 @@ class AVLTree:
         """
         if not root:
             return None, None
+        if self.stats is not None:
+            self.stats.nodes_visited += 1
+            self.stats.comparisons += 1 if root.data == key else 2
         if root.data == key:
             return parent, root
         elif root.data > key:
@@ -56,9 +337,19 @@ class AVLTree:
     def updateDepth(self, root):
         """
         Updating depth of nodes when an insert, delete
-        or rebalance happens.
+        or rebalance happens. Subtree sizes change at
+        exactly the same nodes, so they are updated here
+        as well when order statistics are enabled.
         """
         root.updateDepth(1 + max(self.getDepth(root.left), self.getDepth(root.right)))
+        if self.orderStatistics:
+            root.size = 1 + self.getSize(root.left) + self.getSize(root.right)
+
+    def getSize(self, root):
+        """
+        Number of nodes in the subtree.
+        """
+        return root.size if root else 0
 
     def getBalance(self, root):
         """
@@ -72,11 +363,12 @@ class AVLTree:
         If key exists already, returns with a message
         to user. Otherwise adds the key to the tree.
         """
-        if self.search(key)[1]:
+        if self.findNode(key):
             print("Cannot Insert Duplicate Key. Please try again with another key!")
             return
         if not self.root:
             self.root = Node(key)
+            self.frozenKeys = None
         else:
             self.root = self.insertUtil(self.root, key)
         print("Insert Completed")
@@ -89,8 +381,11 @@ class AVLTree:
         is checked.
         """
         if root is None:
+            self.frozenKeys = None
             return Node(key)
-        elif root.data < key:
+        if self.stats is not None:
+            self.stats.comparisons += 1
+        if root.data < key:
             root.right = self.insertUtil(root.right, key)
         else:
             root.left = self.insertUtil(root.left, key)
@@ -116,11 +411,15 @@ class AVLTree:
         """
         balance = self.getBalance(root)
         if balance < -1:
+            if self.stats is not None:
+                self.stats.comparisons += 1 if key > root.right.data else 2
             if key > root.right.data:
                 root = self.leftRotate(root)
             elif key < root.right.data:
                 root = self.rightLeftRotate(root)
         elif balance > 1:
+            if self.stats is not None:
+                self.stats.comparisons += 1 if key < root.left.data else 2
             if key < root.left.data:
                 root = self.rightRotate(root)
             elif key > root.left.data:
@@ -133,7 +432,7 @@ class AVLTree:
         with a message to user. Otherwise calls
         deleteUtil() to remove the key from the tree
         """
-        if not self.search(key)[1]:
+        if not self.findNode(key):
             print("Key not Found! Please try again with another key!")
             return
         self.root = self.deleteUtil(self.root, key)
@@ -154,11 +453,14 @@ class AVLTree:
         """
         if root is None:
             return root
-        elif root.data > key:
+        if self.stats is not None:
+            self.stats.comparisons += 1 if root.data > key else 2
+        if root.data > key:
             root.left = self.deleteUtil(root.left, key)
         elif root.data < key:
             root.right = self.deleteUtil(root.right, key)
         else:
+            self.frozenKeys = None
             if not root.right:
                 left_child = root.left
                 root = None
@@ -209,6 +511,8 @@ class AVLTree:
         new root and parent's right child as
         left child of the grandparent.
         """
+        if self.stats is not None:
+            self.stats.rotations += 1
         newRoot = root.left
         root.left = newRoot.right
         newRoot.right = root
@@ -225,6 +529,8 @@ class AVLTree:
         child of the parent becomes the right child
         of the grandparent.
         """
+        if self.stats is not None:
+            self.stats.rotations += 1
         newRoot = root.right
         root.right = newRoot.left
         newRoot.left = root
@@ -239,6 +545,8 @@ class AVLTree:
         child of the grandparent with left rotation
         defined above and then do a right rotation
         """
+        if self.stats is not None:
+            self.stats.double_rotations += 1
         root.left = self.leftRotate(root.left)
         return self.rightRotate(root)
 
@@ -249,9 +557,292 @@ class AVLTree:
         defined above and then do a left rotation
         on the grandparent.
         """
+        if self.stats is not None:
+            self.stats.double_rotations += 1
         root.right = self.rightRotate(root.right)
         return self.leftRotate(root)
 
+    def copy(self):
+        """
+        Returns an independent copy of the tree in O(n).
+        The set operations below reuse the nodes of
+        their inputs, copy first to keep an input.
+        """
+        tree = type(self)(self.orderStatistics)
+        tree.root = self.copyUtil(self.root)
+        return tree
+
+    def copyUtil(self, root):
+        if not root:
+            return None
+        node = Node(root.data)
+        node.left = self.copyUtil(root.left)
+        node.right = self.copyUtil(root.right)
+        node.depth = root.depth
+        node.size = root.size
+        return node
+
+    def takeRoot(self, other):
+        """
+        Detaches and returns the root of other, which is
+        left empty. Both trees must agree on keeping
+        order statistics, otherwise the sizes of the
+        nodes taken over would be wrong.
+        """
+        return self.takeRoots(other)[0]
+
+    def takeRoots(self, *others):
+        """
+        takeRoot for several trees at once, returning
+        their roots in order. Every tree is checked
+        before any is detached, so on a ValueError all
+        of them are left intact.
+        """
+        if any(other.orderStatistics != self.orderStatistics for other in others):
+            raise ValueError("cannot combine trees with and without order statistics")
+        roots = []
+        for other in others:
+            roots.append(other.root)
+            other.root = None
+            other.frozenKeys = None
+        return roots
+
+    def withRoot(self, root):
+        tree = type(self)(self.orderStatistics)
+        tree.root = root
+        return tree
+
+    def split(self, key):
+        """
+        Splits the tree at key in O(log n). Returns
+        (smaller, found, larger): a tree of the keys
+        < key, whether key was present and a tree of
+        the keys > key. This tree is left empty.
+        """
+        left, node, right = self.splitUtil(self.takeRoot(self), key)
+        return self.withRoot(left), node is not None, self.withRoot(right)
+
+    @classmethod
+    def join(cls, left, key, right):
+        """
+        Returns the tree of the keys of left, key and
+        the keys of right in O(|depth(left) - depth(right)|).
+        Every key of left must be smaller than key and
+        every key of right larger. key may be None to
+        concatenate the two trees. left and right are
+        left empty.
+        """
+        tree = cls(left.orderStatistics)
+        leftRoot, rightRoot = tree.takeRoots(left, right)
+        if key is None:
+            tree.root = tree.joinTwo(leftRoot, rightRoot)
+        else:
+            tree.root = tree.joinUtil(leftRoot, Node(key), rightRoot)
+        return tree
+
+    def union(self, other):
+        """
+        Returns the tree of the keys in either tree, in
+        O(m log(n/m + 1)) for sizes m <= n. Both trees
+        are left empty, their nodes are reused.
+        """
+        return self.withRoot(self.unionUtil(*self.takeRoots(self, other)))
+
+    def intersection(self, other):
+        """
+        Returns the tree of the keys in both trees. Both
+        trees are left empty.
+        """
+        return self.withRoot(self.intersectionUtil(*self.takeRoots(self, other)))
+
+    def difference(self, other):
+        """
+        Returns the tree of the keys of this tree that
+        are not in other. Both trees are left empty.
+        """
+        return self.withRoot(self.differenceUtil(*self.takeRoots(self, other)))
+
+    def joinUtil(self, left, node, right):
+        """
+        Join of two subtrees around node, all keys in
+        left < node.data < all keys in right. The lower
+        subtree is hung into the spine of the taller one
+        at the first node whose depth is within one of
+        it, then the path back up is rebalanced.
+        """
+        if self.getDepth(left) > self.getDepth(right) + 1:
+            return self.joinRight(left, node, right)
+        if self.getDepth(right) > self.getDepth(left) + 1:
+            return self.joinLeft(left, node, right)
+        node.left = left
+        node.right = right
+        self.updateDepth(node)
+        return node
+
+    def joinRight(self, left, node, right):
+        if self.getDepth(left.right) <= self.getDepth(right) + 1:
+            node.left = left.right
+            node.right = right
+            self.updateDepth(node)
+            left.right = node
+            if self.getDepth(node) > self.getDepth(left.left) + 1:
+                left.right = self.rightRotate(node)
+                return self.leftRotate(left)
+            self.updateDepth(left)
+            return left
+        left.right = self.joinRight(left.right, node, right)
+        if self.getDepth(left.right) > self.getDepth(left.left) + 1:
+            return self.leftRotate(left)
+        self.updateDepth(left)
+        return left
+
+    def joinLeft(self, left, node, right):
+        if self.getDepth(right.left) <= self.getDepth(left) + 1:
+            node.left = left
+            node.right = right.left
+            self.updateDepth(node)
+            right.left = node
+            if self.getDepth(node) > self.getDepth(right.right) + 1:
+                right.left = self.leftRotate(node)
+                return self.rightRotate(right)
+            self.updateDepth(right)
+            return right
+        right.left = self.joinLeft(left, node, right.left)
+        if self.getDepth(right.left) > self.getDepth(right.right) + 1:
+            return self.rightRotate(right)
+        self.updateDepth(right)
+        return right
+
+    def joinTwo(self, left, right):
+        """
+        Concatenates two subtrees, all keys in left <
+        all keys in right, using the largest node of
+        left as the middle node.
+        """
+        if not left:
+            return right
+        left, node = self.splitLast(left)
+        return self.joinUtil(left, node, right)
+
+    def splitLast(self, root):
+        """
+        Removes the largest node of the subtree, returns
+        (rest of the subtree, largest node).
+        """
+        if not root.right:
+            return root.left, root
+        rest, last = self.splitLast(root.right)
+        return self.joinUtil(root.left, root, rest), last
+
+    def splitUtil(self, root, key):
+        """
+        Returns (subtree of keys < key, node holding key
+        or None, subtree of keys > key). Joins the
+        pieces on the way back up, O(log n) in total.
+        """
+        if not root:
+            return None, None, None
+        left, right = root.left, root.right
+        if key == root.data:
+            return left, root, right
+        if key < root.data:
+            smaller, found, larger = self.splitUtil(left, key)
+            return smaller, found, self.joinUtil(larger, root, right)
+        smaller, found, larger = self.splitUtil(right, key)
+        return self.joinUtil(left, root, smaller), found, larger
+
+    def unionUtil(self, first, second):
+        if not first:
+            return second
+        if not second:
+            return first
+        left, right = second.left, second.right
+        smaller, found, larger = self.splitUtil(first, second.data)
+        return self.joinUtil(self.unionUtil(smaller, left), second, self.unionUtil(larger, right))
+
+    def intersectionUtil(self, first, second):
+        if not first or not second:
+            return None
+        left, right = second.left, second.right
+        smaller, found, larger = self.splitUtil(first, second.data)
+        smaller = self.intersectionUtil(smaller, left)
+        larger = self.intersectionUtil(larger, right)
+        if found:
+            return self.joinUtil(smaller, second, larger)
+        return self.joinTwo(smaller, larger)
+
+    def differenceUtil(self, first, second):
+        if not first or not second:
+            return first
+        left, right = second.left, second.right
+        smaller, found, larger = self.splitUtil(first, second.data)
+        return self.joinTwo(self.differenceUtil(smaller, left), self.differenceUtil(larger, right))
+
+    def checkOrderStatistics(self):
+        if not self.orderStatistics:
+            raise RuntimeError("order statistics are not enabled, use AVLTree(orderStatistics=True)")
+
+    def rank(self, key):
+        """
+        Number of keys smaller than key, in O(log n).
+        """
+        return self.countBelow(key, False)
+
+    def countBelow(self, key, inclusive):
+        """
+        Number of keys smaller than key (or equal to
+        it when inclusive), adding up the sizes of the
+        left subtrees passed on the way down.
+        """
+        self.checkOrderStatistics()
+        count = 0
+        root = self.root
+        while root:
+            if root.data < key or (inclusive and root.data == key):
+                count += 1 + self.getSize(root.left)
+                root = root.right
+            else:
+                root = root.left
+        return count
+
+    def select(self, k):
+        """
+        The k-th smallest key, counting from 0, in
+        O(log n). Raises IndexError when k is out of
+        range.
+        """
+        self.checkOrderStatistics()
+        if not 0 <= k < self.getSize(self.root):
+            raise IndexError("select index out of range")
+        root = self.root
+        while True:
+            leftSize = self.getSize(root.left)
+            if k < leftSize:
+                root = root.left
+            elif k == leftSize:
+                return root.data
+            else:
+                k -= leftSize + 1
+                root = root.right
+
+    def countRange(self, lo, hi):
+        """
+        Number of keys with lo <= key <= hi.
+        """
+        if hi < lo:
+            return 0
+        return self.countBelow(hi, True) - self.countBelow(lo, False)
+
+    def median(self):
+        """
+        Median key; the lower one of the two middle keys
+        when the tree has an even number of keys.
+        """
+        self.checkOrderStatistics()
+        if not self.root:
+            raise IndexError("median of an empty tree")
+        return self.select((self.root.size - 1) // 2)
+
     def printInOrder(self):
         """
         Printing Inorder representation of the
@@ -0,0 +1,179 @@
+from array import array
+
+
+class CompactAVLTree:
+    """
+    AVL Tree stored as a struct of arrays.
+
+    Node i is keys[i], left[i], right[i] and depth[i];
+    children are integer indices instead of object
+    references and index 0 is the empty tree (depth 0).
+    Freed indices are reused by later inserts.
+
+    keyType is an array typecode for the keys ('q' for
+    64-bit integers, 'd' for floats) or None to keep
+    arbitrary comparable keys in a list.
+
+    Bytes per key, 64-bit CPython 3.11, measured with
+    tracemalloc at 10^5 keys (see README):
+      AVLTree, Node with __slots__   ~ 72 + key object
+      CompactAVLTree('q')            ~ 17.4, keys inline
+      CompactAVLTree(None)           ~ 17.2 + key object
+
+    Only insert, delete, search, height and len are
+    offered, it is not a drop-in replacement for
+    AVLTree.
+    """
+
+    def __init__(self, keyType="q"):
+        self.keys = array(keyType, [0]) if keyType else [None]
+        self.left = array("i", [0])
+        self.right = array("i", [0])
+        self.depth = array("b", [0])
+        self.root = 0
+        self.free = []
+        self.count = 0
+        self.changed = False
+        self.listKeys = not keyType
+
+    def __len__(self):
+        return self.count
+
+    def newNode(self, key):
+        """
+        Returns the index of a new leaf holding key,
+        reusing a freed slot when there is one.
+        """
+        if self.free:
+            node = self.free.pop()
+            self.keys[node] = key
+            self.left[node] = 0
+            self.right[node] = 0
+            self.depth[node] = 1
+            return node
+        self.keys.append(key)
+        self.left.append(0)
+        self.right.append(0)
+        self.depth.append(1)
+        return len(self.depth) - 1
+
+    def freeNode(self, node):
+        """
+        Puts node on the free list. In list mode the
+        key is dropped too, so a freed slot does not keep
+        the deleted key object alive until it is reused.
+        """
+        if self.listKeys:
+            self.keys[node] = None
+        self.free.append(node)
+
+    def search(self, key):
+        """
+        True if key is in the tree. Iterative descent.
+        """
+        keys = self.keys
+        node = self.root
+        while node:
+            nodeKey = keys[node]
+            if key == nodeKey:
+                return True
+            node = self.left[node] if key < nodeKey else self.right[node]
+        return False
+
+    def height(self):
+        return self.depth[self.root]
+
+    def updateDepth(self, node):
+        depth = self.depth
+        depth[node] = 1 + max(depth[self.left[node]], depth[self.right[node]])
+
+    def getBalance(self, node):
+        return self.depth[self.left[node]] - self.depth[self.right[node]]
+
+    def rightRotate(self, node):
+        newRoot = self.left[node]
+        self.left[node] = self.right[newRoot]
+        self.right[newRoot] = node
+        self.updateDepth(node)
+        self.updateDepth(newRoot)
+        return newRoot
+
+    def leftRotate(self, node):
+        newRoot = self.right[node]
+        self.right[node] = self.left[newRoot]
+        self.left[newRoot] = node
+        self.updateDepth(node)
+        self.updateDepth(newRoot)
+        return newRoot
+
+    def rebalance(self, node):
+        """
+        Updates the depth of node and applies the single
+        or double rotation its balance factor asks for.
+        Used after both insert and delete.
+        """
+        self.updateDepth(node)
+        balance = self.getBalance(node)
+        if balance > 1:
+            if self.getBalance(self.left[node]) < 0:
+                self.left[node] = self.leftRotate(self.left[node])
+            return self.rightRotate(node)
+        if balance < -1:
+            if self.getBalance(self.right[node]) > 0:
+                self.right[node] = self.rightRotate(self.right[node])
+            return self.leftRotate(node)
+        return node
+
+    def insert(self, key):
+        """
+        Inserts key, returns False if it already exists.
+        """
+        self.changed = False
+        self.root = self.insertUtil(self.root, key)
+        if self.changed:
+            self.count += 1
+        return self.changed
+
+    def insertUtil(self, node, key):
+        if not node:
+            self.changed = True
+            return self.newNode(key)
+        nodeKey = self.keys[node]
+        if key < nodeKey:
+            self.left[node] = self.insertUtil(self.left[node], key)
+        elif key > nodeKey:
+            self.right[node] = self.insertUtil(self.right[node], key)
+        else:
+            return node
+        return self.rebalance(node) if self.changed else node
+
+    def delete(self, key):
+        """
+        Removes key, returns False if it was not found.
+        """
+        self.changed = False
+        self.root = self.deleteUtil(self.root, key)
+        if self.changed:
+            self.count -= 1
+        return self.changed
+
+    def deleteUtil(self, node, key):
+        if not node:
+            return node
+        nodeKey = self.keys[node]
+        if key < nodeKey:
+            self.left[node] = self.deleteUtil(self.left[node], key)
+        elif key > nodeKey:
+            self.right[node] = self.deleteUtil(self.right[node], key)
+        else:
+            self.changed = True
+            if not self.left[node] or not self.right[node]:
+                child = self.left[node] or self.right[node]
+                self.freeNode(node)
+                return child
+            successor = self.right[node]
+            while self.left[successor]:
+                successor = self.left[successor]
+            self.keys[node] = self.keys[successor]
+            self.right[node] = self.deleteUtil(self.right[node], self.keys[successor])
+        return self.rebalance(node)
@@ -1,4 +1,12 @@
 class Node:
+    """
+    AVL tree node. __slots__ keeps the fields in the
+    object itself instead of a per-instance __dict__.
+    size is the number of nodes in the subtree, only
+    kept up to date by trees with order statistics.
+    """
+    __slots__ = ("data", "left", "right", "depth", "size")
+
     def __init__(self, dataIn):
         """
         Constructor for the Node.
@@ -10,6 +18,7 @@ class Node:
         self.left = None
         self.right = None
         self.depth = 1
+        self.size = 1
 
     def updateDepth(self, depth):
         """
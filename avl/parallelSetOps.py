@@ -0,0 +1,146 @@
+"""
+Set operations on AVL trees fanned out over a process pool.
+
+Both trees are split at the same pivot keys into pieces that cover
+disjoint key ranges, every pair of pieces is combined in a worker and
+the results are joined back together around the pivots. Splitting and
+joining cost O(log n) per piece, so the parent does O(pieces * log n)
+tree work besides pickling.
+
+The pivots are the keys in the top levels of the larger tree, which
+in a balanced tree are close to evenly spaced in rank.
+
+Only the splitting and joining is join-based. Pieces travel to the
+workers and back as sorted key lists, which pickle far faster than
+graphs of nodes; a worker merges its two lists and the parent rebuilds
+every result piece balanced. That is a bulk rebuild, O(n + m) for
+sizes m <= n, not the O(m log(n/m + 1)) of AVLTree.union, and the
+inputs' nodes are not reused. It only pays off for large trees of
+similar size and more than one CPU: small inputs, inputs whose depths
+differ by more than MAX_DEPTH_GAP and workers=1 run the join-based
+operation in this process.
+
+Usage:
+from avl.parallelSetOps import parallelUnion
+merged = parallelUnion(first, second, workers=8)
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from avl.avl import AVLTree
+
+UNION = "union"
+INTERSECTION = "intersection"
+DIFFERENCE = "difference"
+
+MIN_PARALLEL_DEPTH = 17
+# past a depth gap of 4 the smaller tree has roughly 1/16 of the keys
+# or fewer, where m log(n/m + 1) beats shipping n + m keys.
+MAX_DEPTH_GAP = 4
+PIECES_PER_WORKER = 4
+
+
+def pivotKeys(root, count):
+    """
+    Returns at least count keys (or every key) from the
+    top levels of the subtree, in ascending order.
+    """
+    keys = []
+    level = [root] if root else []
+    while level and len(keys) < count:
+        keys.extend(node.data for node in level)
+        level = [child for node in level for child in (node.left, node.right) if child]
+    return sorted(keys)
+
+
+def splitAt(tree, root, pivots):
+    """
+    Splits the subtree at every pivot. Returns the
+    len(pivots) + 1 pieces and, for every pivot, the node
+    that held it or None.
+    """
+    pieces = []
+    found = []
+    for pivot in pivots:
+        piece, node, root = tree.splitUtil(root, pivot)
+        pieces.append(piece)
+        found.append(node)
+    pieces.append(root)
+    return pieces, found
+
+
+def keepPivot(operation, first, second):
+    if operation == UNION:
+        return first or second
+    if operation == INTERSECTION:
+        return first if first and second else None
+    return first if first and not second else None
+
+
+def _combinePiece(args):
+    operation, first, second = args
+    if operation == UNION:
+        return sorted(set(first).union(second))
+    if operation == INTERSECTION:
+        second = set(second)
+        return [key for key in first if key in second]
+    second = set(second)
+    return [key for key in first if key not in second]
+
+
+def pieceKeys(tree, root):
+    return tree.withRoot(root).keysInOrder()
+
+
+def parallelSetOperation(operation, first, second, workers=None, executor=None):
+    """
+    Returns first <operation> second as a new AVLTree,
+    operation being UNION, INTERSECTION or DIFFERENCE.
+    Both trees are left empty. The pieces are rebuilt
+    from key lists, see the module docstring. An existing
+    ProcessPoolExecutor can be passed to avoid starting
+    workers on every call.
+    """
+    if operation not in (UNION, INTERSECTION, DIFFERENCE):
+        raise ValueError("Unknown set operation %r" % (operation,))
+    workers = workers or os.cpu_count() or 1
+    depths = first.getDepth(first.root), second.getDepth(second.root)
+    if workers == 1 or max(depths) < MIN_PARALLEL_DEPTH or max(depths) - min(depths) > MAX_DEPTH_GAP:
+        return getattr(first, operation)(second)
+
+    tree = AVLTree(first.orderStatistics)
+    firstRoot, secondRoot = tree.takeRoots(first, second)
+    larger = firstRoot if tree.getDepth(firstRoot) >= tree.getDepth(secondRoot) else secondRoot
+    pivots = pivotKeys(larger, workers * PIECES_PER_WORKER - 1)
+    firstPieces, firstFound = splitAt(tree, firstRoot, pivots)
+    secondPieces, secondFound = splitAt(tree, secondRoot, pivots)
+
+    tasks = [(operation, pieceKeys(tree, a), pieceKeys(tree, b)) for a, b in zip(firstPieces, secondPieces)]
+    if executor is not None:
+        keyLists = executor.map(_combinePiece, tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            keyLists = list(pool.map(_combinePiece, tasks))
+    results = [tree.buildBalanced(keys, 0, len(keys)) for keys in keyLists]
+
+    root = results[0]
+    for i, pivot in enumerate(pivots):
+        node = keepPivot(operation, firstFound[i], secondFound[i])
+        if node:
+            root = tree.joinUtil(root, node, results[i + 1])
+        else:
+            root = tree.joinTwo(root, results[i + 1])
+    tree.root = root
+    return tree
+
+
+def parallelUnion(first, second, workers=None, executor=None):
+    return parallelSetOperation(UNION, first, second, workers, executor)
+
+
+def parallelIntersection(first, second, workers=None, executor=None):
+    return parallelSetOperation(INTERSECTION, first, second, workers, executor)
+
+
+def parallelDifference(first, second, workers=None, executor=None):
+    return parallelSetOperation(DIFFERENCE, first, second, workers, executor)
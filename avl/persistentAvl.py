@@ -0,0 +1,253 @@
+import threading
+
+from avl.avl import AVLTree
+from avl.node import Node
+
+
+class PersistentAVLTree:
+    """
+    Persistent AVL Tree. Nodes are never modified once
+    a tree has been returned: insert and delete copy the
+    O(log n) nodes on the path to the key, share every
+    other node with the old tree and return a new tree.
+    The old tree stays valid, so a reader holding it
+    sees a consistent snapshot for as long as it likes
+    without any locking.
+
+    Every node keeps its subtree size, so len, rank and
+    select are O(1) and O(log n).
+    """
+    __slots__ = ("root",)
+
+    def __init__(self, root=None):
+        self.root = root
+
+    @classmethod
+    def fromSorted(cls, keys):
+        """
+        Builds a balanced tree from keys in ascending
+        order in O(n). As for AVLTree.fromSorted, equal
+        neighbours are kept once and a descending pair
+        raises ValueError.
+        """
+        keys = AVLTree.uniqueSorted(keys)
+        return cls(cls.buildBalanced(keys, 0, len(keys)))
+
+    @classmethod
+    def buildBalanced(cls, keys, lo, hi):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        return makeNode(keys[mid], cls.buildBalanced(keys, lo, mid), cls.buildBalanced(keys, mid + 1, hi))
+
+    def __len__(self):
+        return getSize(self.root)
+
+    def __contains__(self, key):
+        return self.search(key)
+
+    def __iter__(self):
+        stack = []
+        node = self.root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.data
+            node = node.right
+
+    def height(self):
+        return getDepth(self.root)
+
+    def search(self, key):
+        node = self.root
+        while node:
+            if key == node.data:
+                return True
+            node = node.left if key < node.data else node.right
+        return False
+
+    def rank(self, key):
+        """
+        Number of keys smaller than key.
+        """
+        count = 0
+        node = self.root
+        while node:
+            if node.data < key:
+                count += 1 + getSize(node.left)
+                node = node.right
+            else:
+                node = node.left
+        return count
+
+    def select(self, k):
+        """
+        The k-th smallest key, counting from 0.
+        """
+        if not 0 <= k < len(self):
+            raise IndexError("select index out of range")
+        node = self.root
+        while True:
+            leftSize = getSize(node.left)
+            if k < leftSize:
+                node = node.left
+            elif k == leftSize:
+                return node.data
+            else:
+                k -= leftSize + 1
+                node = node.right
+
+    def insert(self, key):
+        """
+        Returns a tree that also holds key. Returns this
+        tree itself when key is already present.
+        """
+        root = insertUtil(self.root, key)
+        return self if root is self.root else PersistentAVLTree(root)
+
+    def delete(self, key):
+        """
+        Returns a tree without key. Returns this tree
+        itself when key is not present.
+        """
+        root = deleteUtil(self.root, key)
+        return self if root is self.root else PersistentAVLTree(root)
+
+
+def getDepth(node):
+    return node.depth if node else 0
+
+
+def getSize(node):
+    return node.size if node else 0
+
+
+def makeNode(key, left, right):
+    """
+    New node with its depth and size computed; the only
+    place nodes are written to.
+    """
+    node = Node(key)
+    node.left = left
+    node.right = right
+    node.depth = 1 + max(getDepth(left), getDepth(right))
+    node.size = 1 + getSize(left) + getSize(right)
+    return node
+
+
+def balance(key, left, right):
+    """
+    New node for key over left and right, with the
+    single or double rotation the depths ask for done
+    by building new nodes instead of relinking old ones.
+    """
+    if getDepth(left) > getDepth(right) + 1:
+        if getDepth(left.left) >= getDepth(left.right):
+            return makeNode(left.data, left.left, makeNode(key, left.right, right))
+        pivot = left.right
+        return makeNode(pivot.data, makeNode(left.data, left.left, pivot.left), makeNode(key, pivot.right, right))
+    if getDepth(right) > getDepth(left) + 1:
+        if getDepth(right.right) >= getDepth(right.left):
+            return makeNode(right.data, makeNode(key, left, right.left), right.right)
+        pivot = right.left
+        return makeNode(pivot.data, makeNode(key, left, pivot.left), makeNode(right.data, pivot.right, right.right))
+    return makeNode(key, left, right)
+
+
+def insertUtil(root, key):
+    if root is None:
+        return makeNode(key, None, None)
+    if key < root.data:
+        left = insertUtil(root.left, key)
+        return root if left is root.left else balance(root.data, left, root.right)
+    if key > root.data:
+        right = insertUtil(root.right, key)
+        return root if right is root.right else balance(root.data, root.left, right)
+    return root
+
+
+def deleteUtil(root, key):
+    if root is None:
+        return None
+    if key < root.data:
+        left = deleteUtil(root.left, key)
+        return root if left is root.left else balance(root.data, left, root.right)
+    if key > root.data:
+        right = deleteUtil(root.right, key)
+        return root if right is root.right else balance(root.data, root.left, right)
+    if not root.left:
+        return root.right
+    if not root.right:
+        return root.left
+    right, successor = deleteMin(root.right)
+    return balance(successor, root.left, right)
+
+
+def deleteMin(root):
+    """
+    Returns (subtree without its smallest key, that key).
+    """
+    if not root.left:
+        return root.right, root.data
+    left, smallest = deleteMin(root.left)
+    return balance(root.data, left, root.right), smallest
+
+
+class VersionedAVLTree:
+    """
+    Publishes versions of a PersistentAVLTree. Readers
+    call snapshot() and never block; writers are
+    serialized by a lock, build the next version off to
+    the side and publish it with a single assignment, so
+    a reader sees either the old or the new version and
+    never a half applied change. The version number is
+    published in the same assignment, so it always
+    belongs to the tree it comes with.
+    """
+
+    def __init__(self, tree=None):
+        self.published = (0, tree if tree is not None else PersistentAVLTree())
+        self.writeLock = threading.Lock()
+
+    def snapshot(self):
+        return self.published[1]
+
+    def versioned(self):
+        """
+        (version, tree) of the same publication. Use this
+        rather than two separate reads when both are
+        needed.
+        """
+        return self.published
+
+    def update(self, change):
+        """
+        Publishes change(current tree) as the next version
+        and returns it. change must return a
+        PersistentAVLTree.
+        """
+        with self.writeLock:
+            version, current = self.published
+            tree = change(current)
+            if tree is not current:
+                self.published = (version + 1, tree)
+            return tree
+
+    def insert(self, key):
+        return self.update(lambda tree: tree.insert(key))
+
+    def delete(self, key):
+        return self.update(lambda tree: tree.delete(key))
+
+    def insertMany(self, keys):
+        """
+        Applies all inserts under one lock acquisition
+        and publishes a single version.
+        """
+        def change(tree):
+            for key in keys:
+                tree = tree.insert(key)
+            return tree
+        return self.update(change)
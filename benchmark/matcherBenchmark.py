@@ -0,0 +1,299 @@
+"""
+KMP vs Boyer Moore vs Shift-Or benchmark.
+
+Runs the matchers over generated corpora (binary, DNA, English,
+random bytes and a highly periodic worst case) for a range of
+pattern lengths and reports throughput, character comparisons per
+text byte and preprocessing time. Every corpus is 8-bit so one
+character is one byte.
+
+Usage:
+python3 -m benchmark.matcherBenchmark --output matchers.json
+python3 -m benchmark.matcherBenchmark --baseline matchers.json
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from benchmark.treeBenchmark import git_commit
+from boyerMoore.boyerMooreSearch import BoyerMooreSearch
+from caseFold.caseFold import SENSITIVE
+from kmp.kmp import KMP
+from shiftOr.shiftOr import ShiftOrSearch
+
+DEFAULT_TEXT_SIZES = [10 ** 5]
+DEFAULT_PATTERN_LENGTHS = [1, 4, 16, 64, 256, 1024, 10 ** 4]
+DEFAULT_SEED = 575
+DEFAULT_THRESHOLD = 0.10
+
+WORDS = (
+    "the of and to in is that it was for on are as with his they at be this from have or by one had not "
+    "but what all were when we there can an your which their said if do will each about how up out them "
+    "then she many some so these would other into has more her two like him see time could no make than "
+    "first been its who now people my made over did down only way find use may water long little very "
+    "after words called just where most know get through back much before go good new write our used me "
+    "man too any day same right look think also around another came come work three word must because "
+    "does part even place well such here take why things help put years different away again off went old "
+    "number great tell men say small every found still between name should home big give air line set own "
+    "under read last never us left end along while might next sound below saw something thought both few"
+).split()
+
+
+# ------ start: corpora
+# Every corpus takes (size, rng) and returns a text of size characters.
+
+def binary_corpus(size, rng):
+    return "".join(rng.choice("01") for _ in range(size))
+
+
+def dna_corpus(size, rng):
+    return "".join(rng.choice("ACGT") for _ in range(size))
+
+
+def english_corpus(size, rng):
+    words = []
+    length = 0
+    while length <= size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+
+def random_bytes_corpus(size, rng):
+    return "".join(map(chr, rng.randbytes(size)))
+
+
+def periodic_corpus(size, rng):
+    """
+    A single repeated character. Paired with a pattern that
+    only differs in its last character this forces the longest
+    partial matches for both engines.
+    """
+    return "a" * size
+
+
+CORPORA = {
+    "binary": binary_corpus,
+    "dna": dna_corpus,
+    "english": english_corpus,
+    "random_bytes": random_bytes_corpus,
+    "periodic": periodic_corpus,
+}
+# ------ end: corpora
+
+
+def make_pattern(corpus_name, text, length, rng):
+    """
+    Picks a pattern of the requested length. Patterns are cut
+    out of the text so that there is at least one match, except
+    for the periodic corpus which uses the worst case a..ab.
+    """
+    if corpus_name == "periodic":
+        return "a" * (length - 1) + "b"
+    start = rng.randrange(len(text) - length + 1)
+    return text[start:start + length]
+
+
+# ------ start: engines
+# Every engine exposes prepare(pattern) -> timed preprocessing,
+# scan(prepared, pattern, text) -> timed scan returning the match count and
+# comparisons(pattern, text) -> character comparisons of one scan, taken
+# from the profiling scan of the engine (see matchStats), None when the
+# engine does not compare characters.
+
+class BoyerMooreEngine:
+    name = "boyer_moore"
+
+    @staticmethod
+    def prepare(pattern):
+        return BoyerMooreSearch(pattern)
+
+    @staticmethod
+    def scan(prepared, pattern, text):
+        return prepared.count(text)
+
+    @staticmethod
+    def comparisons(pattern, text):
+        return BoyerMooreSearch(pattern).profile(text).comparisons
+
+
+class KMPEngine:
+    name = "kmp"
+
+    @staticmethod
+    def prepare(pattern):
+        return KMP.myLCSTable(pattern, len(pattern))
+
+    @staticmethod
+    def scan(prepared, pattern, text):
+        # exact scan with the prepared LCS table, case-sensitive
+        # like the other engines.
+        return sum(1 for _ in KMP.kmpScan(pattern, prepared, text))
+
+    @staticmethod
+    def comparisons(pattern, text):
+        return KMP().kmpProfile(pattern, text, case=SENSITIVE).comparisons
+
+
+class ShiftOrEngine:
+    name = "shift_or"
+
+    @staticmethod
+    def prepare(pattern):
+        return ShiftOrSearch(pattern)
+
+    @staticmethod
+    def scan(prepared, pattern, text):
+        return prepared.count(text)
+
+    @staticmethod
+    def comparisons(pattern, text):
+        # one mask lookup per text character, whatever the pattern
+        return None
+
+
+ENGINES = {
+    BoyerMooreEngine.name: BoyerMooreEngine,
+    KMPEngine.name: KMPEngine,
+    ShiftOrEngine.name: ShiftOrEngine,
+}
+# ------ end: engines
+
+
+def run_case(engine, corpus_name, text, pattern, repeat, count_comparisons=True):
+    """
+    Runs one (engine, corpus, pattern) combination, keeping the
+    best of repeat runs, and returns the result record.
+    """
+    clock = time.perf_counter
+    best_prep = best_scan = None
+    for _ in range(repeat):
+        start = clock()
+        prepared = engine.prepare(pattern)
+        prep = clock() - start
+
+        start = clock()
+        matches = engine.scan(prepared, pattern, text)
+        scan = clock() - start
+
+        best_prep = prep if best_prep is None else min(best_prep, prep)
+        best_scan = scan if best_scan is None else min(best_scan, scan)
+
+    comparisons = engine.comparisons(pattern, text) if count_comparisons else None
+
+    return {
+        "engine": engine.name,
+        "corpus": corpus_name,
+        "text_size": len(text),
+        "pattern_length": len(pattern),
+        "matches": matches,
+        "preprocess_seconds": round(best_prep, 9),
+        "scan_seconds": round(best_scan, 9),
+        "mb_per_sec": round(len(text) / 1e6 / best_scan, 3) if best_scan else None,
+        "comparisons_per_byte": round(comparisons / len(text), 4) if comparisons is not None else None,
+    }
+
+
+def case_key(record):
+    return record["engine"], record["corpus"], record["text_size"], record["pattern_length"]
+
+
+def compare_with_baseline(results, baseline, threshold):
+    """
+    Returns the list of (record, baseline record) pairs whose
+    throughput dropped by more than threshold (a fraction).
+    """
+    previous = {case_key(r): r for r in baseline["results"]}
+    regressions = []
+    for record in results:
+        old = previous.get(case_key(record))
+        if not old or not old["mb_per_sec"] or not record["mb_per_sec"]:
+            continue
+        if record["mb_per_sec"] < old["mb_per_sec"] * (1 - threshold):
+            regressions.append((record, old))
+    return regressions
+
+
+def print_table(results):
+    header = "%-12s %-13s %9s %8s %12s %12s %10s" % (
+        "engine", "corpus", "text", "pattern", "prep(ms)", "MB/s", "cmp/byte")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print("%-12s %-13s %9d %8d %12.3f %12s %10s" % (
+            r["engine"], r["corpus"], r["text_size"], r["pattern_length"], r["preprocess_seconds"] * 1000,
+            r["mb_per_sec"], r["comparisons_per_byte"]))
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Compare KMP, Boyer Moore and Shift-Or on generated corpora.")
+    parser.add_argument("--text-sizes", type=int, nargs="+", default=DEFAULT_TEXT_SIZES)
+    parser.add_argument("--pattern-lengths", type=int, nargs="+", default=DEFAULT_PATTERN_LENGTHS)
+    parser.add_argument("--corpora", nargs="+", choices=sorted(CORPORA), default=list(CORPORA))
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=list(ENGINES))
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case, the best is kept")
+    parser.add_argument("--no-comparisons", action="store_true", help="skip the comparison counting pass")
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to check for regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed MB/s drop against the baseline as a fraction (default: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rng = random.Random(args.seed)
+    results = []
+    for text_size in args.text_sizes:
+        for corpus_name in args.corpora:
+            text = CORPORA[corpus_name](text_size, rng)
+            for length in args.pattern_lengths:
+                if length < 1 or length > len(text):
+                    continue
+                pattern = make_pattern(corpus_name, text, length, rng)
+                for engine_name in args.engines:
+                    results.append(run_case(ENGINES[engine_name], corpus_name, text, pattern, args.repeat,
+                                            count_comparisons=not args.no_comparisons))
+    print_table(results)
+
+    if args.output:
+        report = {
+            "benchmark": "matchers",
+            "meta": {
+                "seed": args.seed,
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print("Results written to", args.output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        if not regressions:
+            print("No regressions against", args.baseline)
+            return 0
+        print("REGRESSIONS against", args.baseline)
+        for record, old in regressions:
+            print("  %s %s text=%d pattern=%d: %.3f MB/s -> %.3f MB/s" % (
+                record["engine"], record["corpus"], record["text_size"], record["pattern_length"],
+                old["mb_per_sec"], record["mb_per_sec"]))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,398 @@
+"""
+AVL vs Red Black Tree benchmark.
+
+Drives AVLTree and RedBlackTree through the same seeded workloads and
+reports throughput, p50/p99 latency, peak memory and final height.
+Results are written as JSON so runs can be diffed across commits.
+
+Usage:
+python3 -m benchmark.treeBenchmark --sizes 1000 10000 --output trees.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from avl.avl import AVLTree
+from avl.compactAvl import CompactAVLTree
+from redBlackTree.compactRedBlackTree import CompactRedBlackTree
+from redBlackTree.redBlackTree import RedBlackTree
+
+DEFAULT_SIZES = [10 ** 3, 10 ** 4, 10 ** 5]
+DEFAULT_SEED = 575
+
+INSERT = "insert"
+DELETE = "delete"
+SEARCH = "search"
+
+
+class AVLAdapter:
+    """
+    Benchmark adapter for AVLTree. Uses the recursive
+    utilities directly so that the user facing messages
+    of insert() and delete() are not part of the timing.
+    """
+    name = "avl"
+
+    def __init__(self):
+        self.tree = AVLTree()
+
+    def insert(self, key):
+        if self.tree.findNode(key):
+            return False
+        self.tree.root = self.tree.insertUtil(self.tree.root, key)
+        return True
+
+    def delete(self, key):
+        if not self.tree.findNode(key):
+            return False
+        self.tree.root = self.tree.deleteUtil(self.tree.root, key)
+        return True
+
+    def search(self, key):
+        return self.tree.search(key)[1] is not None
+
+    def height(self):
+        return self.tree.getDepth(self.tree.root)
+
+    def enable_stats(self):
+        self.tree.enableStats()
+
+    def stats_snapshot(self):
+        return self.tree.statsSnapshot()
+
+
+class RedBlackAdapter:
+    """
+    Benchmark adapter for RedBlackTree.
+    """
+    name = "redblack"
+
+    def __init__(self):
+        self.tree = RedBlackTree(quiet=True)
+
+    def insert(self, key):
+        return self.tree.insert(key)
+
+    def delete(self, key):
+        return self.tree.delete_node(key)
+
+    def search(self, key):
+        return self.tree.search_red_black_tree(key) != self.tree.Tree_Node_NULL
+
+    def height(self):
+        return self.tree.height()
+
+    def enable_stats(self):
+        self.tree.enable_stats()
+
+    def stats_snapshot(self):
+        return self.tree.stats_snapshot()
+
+
+class CompactAVLAdapter:
+    """
+    Benchmark adapter for the struct of arrays AVL tree.
+    """
+    name = "avl_compact"
+
+    def __init__(self):
+        self.tree = CompactAVLTree()
+        self.insert = self.tree.insert
+        self.delete = self.tree.delete
+        self.search = self.tree.search
+        self.height = self.tree.height
+
+
+class CompactRedBlackAdapter:
+    """
+    Benchmark adapter for the struct of arrays Red Black tree.
+    """
+    name = "redblack_compact"
+
+    def __init__(self):
+        self.tree = CompactRedBlackTree()
+        self.insert = self.tree.insert
+        self.delete = self.tree.delete_node
+        self.search = self.tree.search
+        self.height = self.tree.height
+
+
+ADAPTERS = {
+    AVLAdapter.name: AVLAdapter,
+    RedBlackAdapter.name: RedBlackAdapter,
+    CompactAVLAdapter.name: CompactAVLAdapter,
+    CompactRedBlackAdapter.name: CompactRedBlackAdapter,
+}
+
+
+# ------ start: workloads
+# Every workload takes (size, rng) and returns (preload, ops) where
+# preload is a list of keys inserted before timing starts and ops is
+# a list of (operation, key) tuples that are timed one by one.
+
+def sequential_workload(size, rng):
+    """
+    Ascending inserts followed by a search for every key.
+    This is the worst case for an unbalanced BST.
+    """
+    ops = [(INSERT, key) for key in range(size)]
+    ops += [(SEARCH, key) for key in range(size)]
+    return [], ops
+
+
+def random_workload(size, rng):
+    """
+    Inserts distinct random keys and then searches them
+    in a different random order.
+    """
+    keys = rng.sample(range(size * 10), size)
+    ops = [(INSERT, key) for key in keys]
+    rng.shuffle(keys)
+    ops += [(SEARCH, key) for key in keys]
+    return [], ops
+
+
+def zipfian_workload(size, rng, exponent=1.0):
+    """
+    Preloads the tree and issues searches whose keys follow
+    a Zipf distribution, so a few hot keys dominate.
+    """
+    keys = rng.sample(range(size * 10), size)
+    weights = []
+    total = 0.0
+    for rank in range(1, size + 1):
+        total += 1.0 / rank ** exponent
+        weights.append(total)
+    ops = [(SEARCH, key) for key in rng.choices(keys, cum_weights=weights, k=size)]
+    return keys, ops
+
+
+def _mixed_ops(size, rng, preload_size, ratios):
+    """
+    Builds a workload of size operations drawn according to
+    ratios (insert, delete, search). Inserts use fresh keys,
+    deletes and searches target live keys.
+    """
+    keys = rng.sample(range(size * 10), preload_size + size)
+    preload = keys[:preload_size]
+    fresh = keys[preload_size:]
+    live = list(preload)
+    ops = []
+    for op in rng.choices((INSERT, DELETE, SEARCH), weights=ratios, k=size):
+        if op == INSERT or not live:
+            key = fresh.pop()
+            live.append(key)
+            ops.append((INSERT, key))
+        elif op == DELETE:
+            index = rng.randrange(len(live))
+            live[index], live[-1] = live[-1], live[index]
+            ops.append((DELETE, live.pop()))
+        else:
+            ops.append((SEARCH, live[rng.randrange(len(live))]))
+    return preload, ops
+
+
+def insert_heavy_workload(size, rng):
+    return _mixed_ops(size, rng, size // 2, (90, 5, 5))
+
+
+def delete_heavy_workload(size, rng):
+    return _mixed_ops(size, rng, size, (5, 90, 5))
+
+
+def search_heavy_workload(size, rng):
+    return _mixed_ops(size, rng, size, (5, 5, 90))
+
+
+def mixed_workload(size, rng):
+    return _mixed_ops(size, rng, size // 2, (1, 1, 1))
+
+
+WORKLOADS = {
+    "sequential": sequential_workload,
+    "random": random_workload,
+    "zipfian": zipfian_workload,
+    "insert_heavy": insert_heavy_workload,
+    "delete_heavy": delete_heavy_workload,
+    "search_heavy": search_heavy_workload,
+    "mixed": mixed_workload,
+}
+# ------ end: workloads
+
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def run_ops(adapter, preload, ops, timed=True):
+    """
+    Loads the preload keys and runs the operations. Returns
+    the per operation latencies in nanoseconds when timed.
+    """
+    for key in preload:
+        adapter.insert(key)
+    handlers = {INSERT: adapter.insert, DELETE: adapter.delete, SEARCH: adapter.search}
+    latencies = []
+    clock = time.perf_counter_ns
+    for op, key in ops:
+        handler = handlers[op]
+        if timed:
+            start = clock()
+            handler(key)
+            latencies.append(clock() - start)
+        else:
+            handler(key)
+    return latencies
+
+
+def count_ops(adapter_class, preload, ops):
+    """
+    Runs the operations once more with the tree counters
+    on, after the preload, and returns their snapshot.
+    """
+    adapter = adapter_class()
+    run_ops(adapter, preload, [], timed=False)
+    adapter.enable_stats()
+    run_ops(adapter, [], ops, timed=False)
+    return adapter.stats_snapshot()
+
+
+def run_case(tree_name, workload_name, size, seed, measure_memory=True, collect_stats=False):
+    """
+    Runs one (tree, workload, size) combination and returns
+    the result record. With collect_stats, trees that have
+    operation counters get a "stats" entry.
+    """
+    adapter_class = ADAPTERS[tree_name]
+    preload, ops = WORKLOADS[workload_name](size, random.Random(seed))
+
+    adapter = adapter_class()
+    wall_start = time.perf_counter()
+    latencies = run_ops(adapter, preload, ops)
+    wall = time.perf_counter() - wall_start
+    height = adapter.height()
+
+    peak = None
+    if measure_memory:
+        # separate pass: tracemalloc slows allocation down and
+        # would distort the latency figures above.
+        tracemalloc.start()
+        run_ops(adapter_class(), preload, ops, timed=False)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    stats = None
+    if collect_stats and hasattr(adapter_class, "enable_stats"):
+        stats = count_ops(adapter_class, preload, ops)
+
+    latencies.sort()
+    op_seconds = sum(latencies) / 1e9
+    return {
+        "tree": tree_name,
+        "workload": workload_name,
+        "size": size,
+        "preload": len(preload),
+        "ops": len(ops),
+        "wall_seconds": round(wall, 6),
+        "ops_per_sec": round(len(ops) / op_seconds, 2) if op_seconds else None,
+        "p50_us": round(percentile(latencies, 0.50) / 1000, 3),
+        "p99_us": round(percentile(latencies, 0.99) / 1000, 3),
+        "peak_memory_bytes": peak,
+        "height": height,
+        "stats": stats,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results):
+    header = "%-16s %-13s %9s %13s %10s %10s %14s %6s" % (
+        "tree", "workload", "size", "ops/sec", "p50(us)", "p99(us)", "peak mem(B)", "height")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print("%-16s %-13s %9d %13s %10.3f %10.3f %14s %6d" % (
+            r["tree"], r["workload"], r["size"], r["ops_per_sec"], r["p50_us"], r["p99_us"],
+            r["peak_memory_bytes"], r["height"]))
+
+
+def print_stats(results):
+    header = "%-16s %-13s %9s %12s %9s %8s %9s %13s" % (
+        "tree", "workload", "size", "comparisons", "rotations", "double", "recolors", "visits/search")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        stats = r["stats"]
+        if stats is None:
+            continue
+        print("%-16s %-13s %9d %12d %9d %8d %9d %13.2f" % (
+            r["tree"], r["workload"], r["size"], stats["comparisons"], stats["rotations"],
+            stats["double_rotations"], stats["recolorings"], stats["visited_per_search"]))
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Compare AVLTree and RedBlackTree on seeded workloads.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="number of keys per workload (default: %(default)s)")
+    parser.add_argument("--workloads", nargs="+", choices=sorted(WORKLOADS), default=list(WORKLOADS))
+    parser.add_argument("--trees", nargs="+", choices=sorted(ADAPTERS), default=[AVLAdapter.name, RedBlackAdapter.name])
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak memory pass")
+    parser.add_argument("--stats", action="store_true",
+                        help="count comparisons, rotations and recolorings in an extra untimed pass")
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = []
+    for size in args.sizes:
+        for workload_name in args.workloads:
+            for tree_name in args.trees:
+                results.append(run_case(tree_name, workload_name, size, args.seed,
+                                        measure_memory=not args.no_memory, collect_stats=args.stats))
+    print_table(results)
+    if args.stats:
+        print()
+        print_stats(results)
+
+    if args.output:
+        report = {
+            "benchmark": "trees",
+            "meta": {
+                "seed": args.seed,
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print("Results written to", args.output)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
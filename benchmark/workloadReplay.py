@@ -0,0 +1,213 @@
+"""
+Replays a recorded stream of operations against the trees and matchers.
+
+Reads one operation per line from a file, or from stdin when the file
+is -, runs it without printing anything per operation and reports the
+count, throughput and p50/p90/p99/max latency of every operation type.
+Blank lines and lines starting with # are skipped.
+
+avl insert 42
+redblack delete 42
+avl search 7
+boyer_moore search needle "a haystack with a needle"
+kmp search needle "text to search"
+
+Tree keys are integers; there is one AVLTree and one RedBlackTree per
+run, so operations on the same tree see each other. Matcher lines take
+a pattern and a text, quoted like a shell command when they contain
+spaces, and count every occurrence with a compiled pattern.
+
+Each matcher uses the case mode of its interactive search, so kmp
+folds case with unicode rules and the others are case sensitive;
+--case sets one mode for all of them.
+
+Malformed lines and operations that raise are reported with their line
+number and skipped; the run then exits with status 1.
+
+Usage:
+python3 main.py OPS_FILE [--output replay.json] [--case unicode]
+python3 -m benchmark.workloadReplay - < ops.txt
+"""
+import argparse
+import json
+import shlex
+import sys
+import time
+
+from benchmark.treeBenchmark import DELETE, INSERT, SEARCH, AVLAdapter, RedBlackAdapter, percentile
+from caseFold.caseFold import CASE_MODES, SENSITIVE, UNICODE
+from matcher.matcher import ENGINES, KMP_ENGINE, compile
+
+TREES = {
+    AVLAdapter.name: AVLAdapter,
+    RedBlackAdapter.name: RedBlackAdapter,
+}
+
+# the defaults of kmpSearch, BoyerMooreSearch and ShiftOrSearch
+DEFAULT_CASE = {KMP_ENGINE: UNICODE}
+
+MAX_REPORTED_ERRORS = 20
+
+
+class Replay:
+    """
+    Executes parsed operations and keeps the latencies
+    in nanoseconds per (target, operation). case is the
+    case mode of every matcher, None for the default of
+    each engine.
+    """
+
+    def __init__(self, case=None):
+        adapters = {name: adapter_class() for name, adapter_class in TREES.items()}
+        self.handlers = {}
+        for name, adapter in adapters.items():
+            self.handlers[(name, INSERT)] = adapter.insert
+            self.handlers[(name, DELETE)] = adapter.delete
+            self.handlers[(name, SEARCH)] = adapter.search
+        for engine in ENGINES:
+            self.handlers[(engine, SEARCH)] = self._matcher(engine, case or DEFAULT_CASE.get(engine, SENSITIVE))
+        self.latencies = {}
+        self.hits = {}
+        self.errors = []
+        self.error_count = 0
+
+    @staticmethod
+    def _matcher(engine, case):
+        def search(pattern, text):
+            return compile(pattern, engine, case).count(text)
+        return search
+
+    def parse(self, line):
+        """
+        Returns (target, operation, args) for one line,
+        raising ValueError when it is malformed.
+        """
+        fields = shlex.split(line)
+        if len(fields) < 2:
+            raise ValueError("expected TARGET OPERATION ARGS")
+        target, operation, args = fields[0], fields[1], fields[2:]
+        if (target, operation) not in self.handlers:
+            raise ValueError("unknown operation %r for %r" % (operation, target))
+        if target in TREES:
+            if len(args) != 1:
+                raise ValueError("%s %s takes one integer key" % (target, operation))
+            try:
+                args = [int(args[0])]
+            except ValueError:
+                raise ValueError("key %r is not an integer" % (args[0],)) from None
+        elif len(args) != 2:
+            raise ValueError("%s %s takes a pattern and a text" % (target, operation))
+        return target, operation, args
+
+    def error(self, number, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append("line %d: %s" % (number, message))
+
+    def run(self, lines):
+        clock = time.perf_counter_ns
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                op = self.parse(line)
+            except ValueError as e:
+                self.error(number, e)
+                continue
+            handler = self.handlers[op[:2]]
+            start = clock()
+            try:
+                result = handler(*op[2])
+            except Exception as e:
+                self.error(number, "%s raised %r" % (" ".join(op[:2]), e))
+                continue
+            elapsed = clock() - start
+            self.latencies.setdefault(op[:2], []).append(elapsed)
+            if result:
+                self.hits[op[:2]] = self.hits.get(op[:2], 0) + 1
+
+    def results(self):
+        """
+        One record per (target, operation) in the order they
+        first appeared. hits counts operations that returned
+        something true: successful inserts and deletes, found
+        keys, texts with at least one match.
+        """
+        results = []
+        for (target, operation), latencies in self.latencies.items():
+            latencies.sort()
+            seconds = sum(latencies) / 1e9
+            results.append({
+                "target": target,
+                "operation": operation,
+                "count": len(latencies),
+                "hits": self.hits.get((target, operation), 0),
+                "total_seconds": round(seconds, 6),
+                "ops_per_sec": round(len(latencies) / seconds, 2) if seconds else None,
+                "mean_us": round(sum(latencies) / len(latencies) / 1000, 3),
+                "p50_us": round(percentile(latencies, 0.50) / 1000, 3),
+                "p90_us": round(percentile(latencies, 0.90) / 1000, 3),
+                "p99_us": round(percentile(latencies, 0.99) / 1000, 3),
+                "max_us": round(latencies[-1] / 1000, 3),
+            })
+        return results
+
+
+def print_table(results):
+    header = "%-12s %-8s %9s %9s %13s %10s %10s %10s %10s" % (
+        "target", "op", "count", "hits", "ops/sec", "p50(us)", "p90(us)", "p99(us)", "max(us)")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print("%-12s %-8s %9d %9d %13s %10.3f %10.3f %10.3f %10.3f" % (
+            r["target"], r["operation"], r["count"], r["hits"], r["ops_per_sec"],
+            r["p50_us"], r["p90_us"], r["p99_us"], r["max_us"]))
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Replay a file of tree and matcher operations.")
+    parser.add_argument("ops", help="operations file, - for stdin")
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    parser.add_argument("--case", choices=CASE_MODES,
+                        help="case mode of every matcher (default: unicode for kmp, sensitive otherwise)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    replay = Replay(args.case)
+    wall_start = time.perf_counter()
+    if args.ops == "-":
+        replay.run(sys.stdin)
+    else:
+        with open(args.ops) as f:
+            replay.run(f)
+    wall = time.perf_counter() - wall_start
+    results = replay.results()
+
+    print_table(results)
+    print("%d operations in %.3fs" % (sum(r["count"] for r in results), wall))
+    if replay.error_count:
+        print("%d lines skipped" % replay.error_count, file=sys.stderr)
+        for error in replay.errors:
+            print("  " + error, file=sys.stderr)
+
+    if args.output:
+        report = {
+            "benchmark": "replay",
+            "source": args.ops,
+            "wall_seconds": round(wall, 6),
+            "skipped": replay.error_count,
+            "case": args.case,
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print("Results written to", args.output)
+    return 1 if replay.error_count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
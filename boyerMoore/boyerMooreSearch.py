@@ -2,31 +2,52 @@
 # References:
 # https://dl.acm.org/doi/pdf/10.1145/359842.359859
 # https://www.cs.jhu.edu/~langmea/resources/lecture_notes/strings_matching_boyer_moore.pdf
+import time
+
+from caseFold.caseFold import SENSITIVE, check_mode, fold_pattern, fold_text, map_matches
+from matchStats.matchStats import MatchProfile
+
+BINARY_TYPES = (bytes, bytearray, memoryview)
+
+
 class BoyerMooreSearch:
-    def __init__(self, pattern=None):
+    def __init__(self, pattern=None, case=SENSITIVE):
         """
         Constructor for the Boyer Moore Search
         Sets the pattern and creates delta tables
         in case search is required in more than one
         text.
+
+        The pattern can be a str (any unicode text)
+        or bytes-like. It can only be searched in a
+        text of the same kind.
+
+        case is one of the caseFold modes (sensitive,
+        ascii, unicode). The pattern is folded once
+        when it is set and each text once per search.
         """
+        check_mode(case)
+        self.case = case
         self.pattern = pattern
         if self.pattern:
-            self.delta1 = self.generate_delta_1(self.pattern)
-            self.prefix_suffix_table = self.preprocess_prefix_suffix(self.pattern)
-            self.delta2_case1 = self.good_suffix_rule_case_1(self.pattern)
-            self.delta2_case2 = self.good_suffix_rule_case_2(self.pattern)
+            self.set_pattern(self.pattern)
 
     def set_pattern(self, pattern):
         """
         Sets the pattern in the object if
         not done during initialization.
+        The stored pattern is the folded one.
         """
-        self.pattern = pattern
+        start = time.perf_counter()
+        if isinstance(pattern, (bytearray, memoryview)):
+            pattern = bytes(pattern)
+        self.pattern = fold_pattern(pattern, self.case)
+        self.binary = isinstance(pattern, bytes)
         self.delta1 = self.generate_delta_1(self.pattern)
         self.prefix_suffix_table = self.preprocess_prefix_suffix(self.pattern)
         self.delta2_case1 = self.good_suffix_rule_case_1(self.pattern)
         self.delta2_case2 = self.good_suffix_rule_case_2(self.pattern)
+        self.preprocess_seconds = time.perf_counter() - start
 
     def generate_delta_1(self, pattern):
         """
@@ -47,14 +68,25 @@ class BoyerMooreSearch:
         pattern, we want to align the mismatched character
         in text to the character in pattern, thus the distance
         from the end to the index is the shift required.
+
+        The table layout depends on the alphabet:
+        - bytes patterns use a dense list of 256 entries
+          indexed by the byte value.
+        - str patterns use a dict keyed by the character
+          holding only the characters of the pattern, every
+          other character shifts by patlen. This works for
+          the whole unicode range and looking up a
+          character in a dict costs about as much as
+          list[ord(char)].
         """
         patlen = len(pattern)
-        delta1 = [patlen] * 256
+        if isinstance(pattern, BINARY_TYPES):
+            delta1 = [patlen] * 256
+        else:
+            delta1 = {}
 
         for i in range(patlen - 1):
-            if ord(pattern[i])>256:
-                print(pattern[i], ord(pattern[i]))
-            delta1[ord(pattern[i])] = patlen - i - 1
+            delta1[pattern[i]] = patlen - i - 1
 
         return delta1
 
@@ -117,21 +149,29 @@ class BoyerMooreSearch:
 
         We check the preceding characters using the below
         condition and if they are not same, we calculate shift.
+        Every border in the chain i -> prefix_suffix_table[i]
+        -> prefix_suffix_table[prefix_suffix_table[i]] ...
+        has to be checked, not only the first one, otherwise
+        shorter suffixes are left without a shift and case 2
+        skips real occurrences.
 
-        pattern[self.prefix_suffix_table[i]-1] != pattern[i-1]
+        pattern[j - 1] != pattern[i - 1]
 
         We try to shift to the right most occurrence of the
         suffix incase we have multiple occurrences. Therefore,
         incase we have a non-zero delta present for the index,
         we don't change it. Below condition ensures it.
 
-        good_suffix_table[self.prefix_suffix_table[i]] == 0
+        good_suffix_table[j] == 0
         """
         m = len(pattern)
         good_suffix_table = [0] * (m + 1)
-        for i in range(len(good_suffix_table) - 2, -1, -1):
-            if pattern[self.prefix_suffix_table[i] - 1] != pattern[i - 1] and good_suffix_table[self.prefix_suffix_table[i]] == 0:
-                good_suffix_table[self.prefix_suffix_table[i]] = self.prefix_suffix_table[i] - i
+        for i in range(m, 0, -1):
+            j = self.prefix_suffix_table[i]
+            while j <= m and pattern[j - 1] != pattern[i - 1]:
+                if good_suffix_table[j] == 0:
+                    good_suffix_table[j] = j - i
+                j = self.prefix_suffix_table[j]
         return good_suffix_table
 
     def good_suffix_rule_case_2(self, pattern):
@@ -169,8 +209,9 @@ class BoyerMooreSearch:
 
     def search(self, text, pattern=None):
         """
-        Searches the pattern in text in
-        case-sensitive manner.
+        Searches the pattern in text in the
+        case mode given to the constructor
+        (case-sensitive by default).
         Incase, pattern has been set already,
         We can search using the text only.
         """
@@ -181,6 +222,84 @@ class BoyerMooreSearch:
         self.search_util(text, self.pattern)
 
     def search_util(self, text, pat):
+        """
+        Runs the search using delta1 and delta2
+        and prints all the occurances of the pattern
+        in the text. See finditer() for the search
+        itself.
+        """
+        flag = False
+        for s in self._matches(text, pat):
+            print("pattern occurs at location = %d" % s)
+            flag = True
+
+        if not flag:
+            print("Pattern not found anywhere in string.")
+
+    def _use_pattern(self, pattern):
+        """
+        Sets the pattern if one is passed, otherwise
+        the pattern set earlier is used.
+        """
+        if pattern:
+            self.set_pattern(pattern)
+        elif not self.pattern:
+            raise ValueError("Set Pattern or Pass pattern")
+        return self.pattern
+
+    def finditer(self, text, pattern=None):
+        """
+        Generator yielding the offset of every
+        occurrence of the pattern in text, lazily
+        and in increasing order. The scan stops as
+        soon as the caller stops consuming.
+        """
+        return self._matches(text, self._use_pattern(pattern))
+
+    def findall(self, text, pattern=None):
+        """
+        Returns the list of offsets of all the
+        occurrences of the pattern in text.
+        """
+        return list(self.finditer(text, pattern))
+
+    def count(self, text, pattern=None):
+        """
+        Returns the number of occurrences of the
+        pattern in text.
+        """
+        occurrences = 0
+        for _ in self.finditer(text, pattern):
+            occurrences += 1
+        return occurrences
+
+    def find_first(self, text, pattern=None):
+        """
+        Returns the offset of the first occurrence
+        of the pattern in text, or -1 if there is
+        none. Stops scanning at the first match.
+        """
+        for s in self.finditer(text, pattern):
+            return s
+        return -1
+
+    def contains(self, text, pattern=None):
+        """
+        True if the pattern occurs in text.
+        """
+        return self.find_first(text, pattern) >= 0
+
+    def _matches(self, text, pat):
+        """
+        Folds the text as per the case mode, scans it
+        and maps the offsets back to the original text.
+        """
+        if self.case == SENSITIVE:
+            return self._scan(text, pat)
+        folded, offsets = fold_text(text, self.case)
+        return map_matches(self._scan(folded, pat), offsets, len(pat))
+
+    def _scan(self, text, pat):
         """
         Runs the search using delta1 and delta2
         delta1 is the bad character while delta2
@@ -188,15 +307,20 @@ class BoyerMooreSearch:
         of delta1 and delta2 cases in different
         scenarios.
 
-        It finds all the occurances of the pattern
+        Yields all the occurances of the pattern
         in the text.
         """
         s = 0
         patlen = len(pat)
         n = len(text)
-        flag = False
+        binary = self.binary
+        if binary != isinstance(text, BINARY_TYPES):
+            raise TypeError("pattern and text must both be str or both be bytes-like")
         # Generate tables for delta1, delta2 case 1 & 2
+        # bytes use the dense delta1 list, str the sparse
+        # dict where missing characters shift by patlen.
         delta1 = self.delta1
+        delta1_get = None if binary else delta1.get
         delta2_1 = self.delta2_case1
         delta2_2 = self.delta2_case2
 
@@ -207,11 +331,10 @@ class BoyerMooreSearch:
 
             # if j<0, means pattern matched
             if j < 0:
-                print("pattern occurs at location = %d" % s)
-                flag = True
+                yield s
                 if s + patlen < n:
                     next_char = text[s + patlen]
-                    s = s + delta1[ord(next_char)]
+                    s = s + (delta1[next_char] if binary else delta1_get(next_char, patlen))
                 else:
                     s += delta2_2[0]
             else:
@@ -219,20 +342,80 @@ class BoyerMooreSearch:
                 # use bad character table
                 if j + 1 == patlen:
                     bad_char = text[s + j]
-                    #print(bad_char,ord(bad_char))
-                    bad_char_occ = delta1[ord(bad_char)] - (patlen - j)
+                    bad_char_occ = (delta1[bad_char] if binary else delta1_get(bad_char, patlen)) - (patlen - j)
                     s += max(1, bad_char_occ)
                 elif delta2_1[j + 1] != 0:
                     # Incase we have reoccurrence with preceding
                     # character different, we take max from bad char
                     # and delta2 case 1
                     bad_char = text[s + j]
-                    bad_char_occ = delta1[ord(bad_char)] - (patlen - j)
+                    bad_char_occ = (delta1[bad_char] if binary else delta1_get(bad_char, patlen)) - (patlen - j)
                     s += max(delta2_1[j + 1], bad_char_occ)
                 else:
                     # Incase delta2 case 1 was not applicable
                     # we use detla2 case 2.
                     s += delta2_2[j + 1]
 
-        if not flag:
-            print("Pattern not found anywhere in string.")
\ No newline at end of file
+    def profile(self, text, pattern=None):
+        """
+        Searches text like count() but with the profiling
+        scan, and returns a MatchProfile of comparisons,
+        shift lengths and the rule behind every shift.
+        Profiling is slower than a normal search.
+        """
+        pat = self._use_pattern(pattern)
+        profile = MatchProfile("boyer_moore")
+        profile.preprocess_seconds = self.preprocess_seconds
+        start = time.perf_counter()
+        folded, offsets = fold_text(text, self.case)
+        for _ in map_matches(self._profile_scan(folded, pat, profile), offsets, len(pat)):
+            profile.matches += 1
+        profile.scan_seconds = time.perf_counter() - start
+        profile.text_length = len(text)
+        return profile
+
+    def _profile_scan(self, text, pat, profile):
+        """
+        Same loop as _scan, recording into profile. When
+        both the bad character rule and good suffix case 1
+        apply, the rule giving the larger shift is credited.
+        """
+        s = 0
+        patlen = len(pat)
+        n = len(text)
+        binary = self.binary
+        if binary != isinstance(text, BINARY_TYPES):
+            raise TypeError("pattern and text must both be str or both be bytes-like")
+        delta1 = self.delta1
+        delta1_get = None if binary else delta1.get
+        delta2_1 = self.delta2_case1
+        delta2_2 = self.delta2_case2
+
+        while s <= n - patlen:
+            j = patlen - 1
+            while j >= 0 and pat[j] == text[s + j]:
+                j -= 1
+            # one comparison per matched character plus the mismatch
+            profile.comparisons += patlen - j if j >= 0 else patlen
+
+            if j < 0:
+                yield s
+                if s + patlen < n:
+                    next_char = text[s + patlen]
+                    shift = delta1[next_char] if binary else delta1_get(next_char, patlen)
+                else:
+                    shift = delta2_2[0]
+                profile.shift(shift, "after_match")
+            elif j + 1 == patlen:
+                bad_char = text[s + j]
+                shift = max(1, (delta1[bad_char] if binary else delta1_get(bad_char, patlen)) - (patlen - j))
+                profile.shift(shift, "bad_character")
+            elif delta2_1[j + 1] != 0:
+                bad_char = text[s + j]
+                bad_char_occ = (delta1[bad_char] if binary else delta1_get(bad_char, patlen)) - (patlen - j)
+                shift = max(delta2_1[j + 1], bad_char_occ)
+                profile.shift(shift, "good_suffix_1" if delta2_1[j + 1] >= bad_char_occ else "bad_character")
+            else:
+                shift = delta2_2[j + 1]
+                profile.shift(shift, "good_suffix_2")
+            s += shift
@@ -0,0 +1,86 @@
+"""
+Case folding shared by the matchers.
+
+Rather than comparing folded characters one at a time, the pattern
+is folded once when it is set and the text once per search; the
+engines then do exact matching on the folded strings.
+
+Modes:
+SENSITIVE - no folding.
+ASCII     - only A-Z are folded to a-z. Never changes lengths and
+            works for str and bytes.
+UNICODE   - str.casefold(), str only. A character can fold to
+            several characters (e.g. 'ß' -> 'ss'), in which case an
+            offset map from the folded text back to the original is
+            built and only matches starting and ending on original
+            character boundaries are reported.
+"""
+SENSITIVE = "sensitive"
+ASCII = "ascii"
+UNICODE = "unicode"
+CASE_MODES = (SENSITIVE, ASCII, UNICODE)
+
+BINARY_TYPES = (bytes, bytearray, memoryview)
+ASCII_LOWER = {c: c + 32 for c in range(ord("A"), ord("Z") + 1)}
+
+
+def check_mode(case):
+    if case not in CASE_MODES:
+        raise ValueError("Unknown case mode %r, expected one of %s" % (case, ", ".join(CASE_MODES)))
+
+
+def fold_pattern(pattern, case):
+    """
+    Folds a pattern. Unlike text, a pattern never needs an
+    offset map.
+    """
+    return fold_text(pattern, case)[0]
+
+
+def fold_text(text, case):
+    """
+    Returns (folded text, offsets). offsets is None when
+    folded offsets equal original offsets, otherwise
+    offsets[k] is the index of the original character
+    that produced folded character k.
+    """
+    check_mode(case)
+    if case == SENSITIVE:
+        return text, None
+    if isinstance(text, BINARY_TYPES):
+        if case == UNICODE:
+            raise TypeError("unicode case folding needs str input, decode the bytes or use ascii")
+        if not isinstance(text, (bytes, bytearray)):
+            text = bytes(text)
+        return text.lower(), None
+    if case == ASCII:
+        return text.translate(ASCII_LOWER), None
+
+    folded = text.casefold()
+    if len(folded) == len(text):
+        # casefold never shrinks a character, so equal
+        # lengths mean every character folded to one.
+        return folded, None
+    offsets = []
+    for i, c in enumerate(text):
+        offsets.extend([i] * len(c.casefold()))
+    return folded, offsets
+
+
+def map_matches(matches, offsets, patlen):
+    """
+    Maps match offsets in the folded text back to the
+    original text, dropping matches that start or end
+    inside the expansion of a single original character.
+    """
+    if offsets is None:
+        yield from matches
+        return
+    end_of_text = len(offsets)
+    for k in matches:
+        if k > 0 and offsets[k - 1] == offsets[k]:
+            continue
+        end = k + patlen
+        if end < end_of_text and offsets[end - 1] == offsets[end]:
+            continue
+        yield offsets[k]
@@ -0,0 +1,292 @@
+"""
+Thread safe wrapper for AVLTree and RedBlackTree.
+
+ConcurrentTree guards a tree with a reader-writer lock: any number of
+threads can search at the same time, an insert or delete waits until
+the readers are done and runs alone. Waiting writers block new
+readers, so a steady stream of lookups cannot starve the writers.
+The lock is not reentrant: a thread holding it must not acquire it
+again, e.g. from a read() callback, which raises RuntimeError.
+
+Readers only read the tree. The two things a lookup can write, the
+sorted copy behind search_many and the counters of a tree with stats
+enabled, are guarded by locks of their own.
+
+Writes can be batched: apply() runs a list of operations under a
+single lock acquisition, and insert_later()/delete_later() buffer
+operations from any thread and apply them in batches of batch_size.
+Buffered operations are not visible to readers until they are
+flushed.
+
+Usage:
+from concurrentTree.concurrentTree import ConcurrentTree
+tree = ConcurrentTree(RedBlackTree(quiet=True))
+"""
+import threading
+from contextlib import contextmanager
+
+from avl.avl import AVLTree
+from bulkLookup.bulkLookup import search_many
+from redBlackTree.redBlackTree import RedBlackTree
+
+INSERT = "insert"
+DELETE = "delete"
+
+DEFAULT_BATCH_SIZE = 256
+
+
+class ReadWriteLock:
+    """
+    Many readers or one writer. Writers are preferred:
+    once a writer waits, new readers queue behind it.
+    Not reentrant: acquiring it again from the thread
+    that holds it raises RuntimeError instead of
+    deadlocking behind a waiting writer.
+    """
+
+    def __init__(self):
+        self._holder = threading.local()
+        lock = threading.Lock()
+        # separate conditions so that a release wakes one
+        # writer or all readers, not every waiting thread.
+        self._read_ready = threading.Condition(lock)
+        self._write_ready = threading.Condition(lock)
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def _enter(self):
+        if getattr(self._holder, "held", False):
+            raise RuntimeError("ReadWriteLock is not reentrant, this thread already holds it")
+        self._holder.held = True
+
+    def _exit(self):
+        self._holder.held = False
+
+    def acquire_read(self):
+        self._enter()
+        with self._read_ready:
+            while self._writer or self._waiting_writers:
+                self._read_ready.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._read_ready:
+            self._readers -= 1
+            if not self._readers and self._waiting_writers:
+                self._write_ready.notify()
+        self._exit()
+
+    def acquire_write(self):
+        self._enter()
+        with self._write_ready:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._write_ready.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._write_ready:
+            self._writer = False
+            if self._waiting_writers:
+                self._write_ready.notify()
+            else:
+                self._read_ready.notify_all()
+        self._exit()
+
+    def read_locked(self):
+        return _Held(self.acquire_read, self.release_read)
+
+    def write_locked(self):
+        return _Held(self.acquire_write, self.release_write)
+
+
+class _Held:
+    __slots__ = ("_acquire", "_release")
+
+    def __init__(self, acquire, release):
+        self._acquire = acquire
+        self._release = release
+
+    def __enter__(self):
+        self._acquire()
+
+    def __exit__(self, *exc_info):
+        self._release()
+
+
+class _AVLBackend:
+    """
+    Quiet insert/delete/search for AVLTree; the public
+    insert() and delete() print messages.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.freeze = tree.freezeKeys
+
+    def search(self, key):
+        return self.tree.search(key)[1] is not None
+
+    def insert(self, key):
+        if self.tree.findNode(key):
+            return False
+        self.tree.root = self.tree.insertUtil(self.tree.root, key)
+        return True
+
+    def delete(self, key):
+        if not self.tree.findNode(key):
+            return False
+        self.tree.root = self.tree.deleteUtil(self.tree.root, key)
+        return True
+
+
+class _RedBlackBackend:
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.insert = tree.insert
+        self.delete = tree.delete_node
+        self.freeze = tree.freeze_values
+
+    def search(self, key):
+        return self.tree.search_red_black_tree(key) != self.tree.Tree_Node_NULL
+
+
+class ConcurrentTree:
+    """
+    Reader-writer locked AVLTree or RedBlackTree. The
+    wrapped tree must not be used directly while it is
+    shared.
+    """
+
+    def __init__(self, tree, batch_size=DEFAULT_BATCH_SIZE):
+        if isinstance(tree, AVLTree):
+            self._backend = _AVLBackend(tree)
+        elif isinstance(tree, RedBlackTree):
+            self._backend = _RedBlackBackend(tree)
+        else:
+            raise TypeError("expected an AVLTree or a RedBlackTree, got %s" % type(tree).__name__)
+        self.tree = tree
+        self.lock = ReadWriteLock()
+        self.batch_size = batch_size
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        # taken while still holding _pending_lock, so batches are
+        # applied in the order they were swapped out.
+        self._apply_order = threading.Lock()
+        self._freeze_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    @contextmanager
+    def _reading(self):
+        """
+        The read lock, and the stats lock as well while
+        the tree counts: the counters are plain ints that
+        concurrent readers would update with lost writes.
+        """
+        with self.lock.read_locked():
+            if self.tree.stats is None:
+                yield
+            else:
+                with self._stats_lock:
+                    yield
+
+    def search(self, key):
+        with self._reading():
+            return self._backend.search(key)
+
+    def __contains__(self, key):
+        return self.search(key)
+
+    def search_many(self, keys, positions=False):
+        """
+        Batch lookup under the read lock, see bulkLookup.
+        The sorted copy of the keys is made by one reader
+        at a time, the others wait for it.
+        """
+        with self.lock.read_locked():
+            with self._freeze_lock:
+                frozen = self._backend.freeze()
+            return search_many(frozen, keys, positions)
+
+    def read(self, reader):
+        """
+        Calls reader(tree) under the read lock and returns
+        its result, for queries that need several calls to
+        see the same tree, e.g. lambda t: list(t.range(a, b)).
+        reader must only read and must not call back into
+        this ConcurrentTree, the lock is not reentrant.
+        """
+        with self._reading():
+            return reader(self.tree)
+
+    def insert(self, key):
+        with self.lock.write_locked():
+            return self._backend.insert(key)
+
+    def delete(self, key):
+        with self.lock.write_locked():
+            return self._backend.delete(key)
+
+    def apply(self, operations):
+        """
+        Runs (INSERT or DELETE, key) pairs in order under a
+        single write lock. Returns the list of results,
+        False for duplicate inserts and missing deletes.
+        """
+        backend = self._backend
+        with self.lock.write_locked():
+            results = []
+            for operation, key in operations:
+                if operation == INSERT:
+                    results.append(backend.insert(key))
+                elif operation == DELETE:
+                    results.append(backend.delete(key))
+                else:
+                    raise ValueError("Unknown operation %r" % (operation,))
+            return results
+
+    def insert_later(self, key):
+        self._buffer(INSERT, key)
+
+    def delete_later(self, key):
+        self._buffer(DELETE, key)
+
+    def _buffer(self, operation, key):
+        with self._pending_lock:
+            self._pending.append((operation, key))
+            if len(self._pending) < self.batch_size:
+                return
+            batch = self._take_pending()
+        self._apply_taken(batch)
+
+    def flush(self):
+        """
+        Applies every buffered operation now. Batches are
+        applied outside the buffer lock, so other threads
+        keep buffering meanwhile, but in the order they
+        were taken: when flush returns every operation
+        buffered before it is visible.
+        """
+        with self._pending_lock:
+            batch = self._take_pending()
+        self._apply_taken(batch)
+
+    def _take_pending(self):
+        """
+        Swaps out the buffer, called with _pending_lock
+        held. Also takes _apply_order, which the previous
+        batch holds until it is applied.
+        """
+        batch, self._pending = self._pending, []
+        self._apply_order.acquire()
+        return batch
+
+    def _apply_taken(self, batch):
+        try:
+            if batch:
+                self.apply(batch)
+        finally:
+            self._apply_order.release()
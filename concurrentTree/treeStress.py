@@ -0,0 +1,215 @@
+"""
+Stress driver for ConcurrentTree.
+
+Hammers an AVLTree and a RedBlackTree wrapped in ConcurrentTree from
+many threads at once: writers insert and delete random keys, single
+and batched, readers search and take consistent range scans under the
+read lock. The tree invariants (key order, AVL balance and depths,
+red black colours and black heights, parent links) are checked
+periodically under the read lock and once more at the end against the
+set of keys every writer should have left behind.
+
+Exits with status 1 if any check failed.
+
+Usage:
+python3 -m concurrentTree.treeStress [--threads 8] [--ops 5000] [--trees avl redblack]
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+
+from avl.avl import AVLTree
+from concurrentTree.concurrentTree import DELETE, INSERT, ConcurrentTree
+from redBlackTree.redBlackTree import NodeColor, RedBlackTree
+
+TREES = {
+    "avl": AVLTree,
+    "redblack": lambda: RedBlackTree(quiet=True),
+}
+
+
+def check_avl(tree):
+    """
+    Returns the keys in order, raising AssertionError
+    when order, balance or stored depths are wrong.
+    """
+    keys = []
+
+    def walk(node):
+        if not node:
+            return 0
+        left = walk(node.left)
+        if keys and keys[-1] >= node.data:
+            raise AssertionError("avl keys out of order at %r" % (node.data,))
+        keys.append(node.data)
+        right = walk(node.right)
+        if abs(left - right) > 1:
+            raise AssertionError("avl node %r unbalanced" % (node.data,))
+        if node.depth != 1 + max(left, right):
+            raise AssertionError("avl node %r has a stale depth" % (node.data,))
+        return node.depth
+
+    walk(tree.root)
+    return keys
+
+
+def check_red_black(tree):
+    """
+    Returns the keys in order, raising AssertionError
+    when order, colours, black heights or parent links
+    are wrong.
+    """
+    null = tree.Tree_Node_NULL
+    keys = []
+
+    def walk(node, parent):
+        if node == null:
+            return 1
+        if node.parent is not parent:
+            raise AssertionError("red black node %r has a wrong parent" % (node.value,))
+        if node.color == NodeColor.RED and (node.left.color == NodeColor.RED or node.right.color == NodeColor.RED):
+            raise AssertionError("red black node %r is red with a red child" % (node.value,))
+        left = walk(node.left, node)
+        if keys and keys[-1] >= node.value:
+            raise AssertionError("red black keys out of order at %r" % (node.value,))
+        keys.append(node.value)
+        right = walk(node.right, node)
+        if left != right:
+            raise AssertionError("red black node %r has unequal black heights" % (node.value,))
+        return left + (node.color == NodeColor.BLACK)
+
+    if tree.root != null and tree.root.color != NodeColor.BLACK:
+        raise AssertionError("red black root is red")
+    walk(tree.root, None)
+    return keys
+
+
+CHECKS = {
+    "avl": check_avl,
+    "redblack": check_red_black,
+}
+
+
+def writer(shared, check, thread_id, ops, key_space, seed, failures):
+    """
+    Writes only keys k with k % threads == thread_id so
+    that the expected final set of every writer is known
+    without coordinating with the others.
+    """
+    rnd = random.Random(seed)
+    threads = shared.threads
+    expected = set()
+    try:
+        for i in range(ops):
+            key = rnd.randrange(key_space // threads) * threads + thread_id
+            roll = rnd.random()
+            if roll < 0.45:
+                if shared.tree.insert(key) != (key not in expected):
+                    failures.append("insert %r returned the wrong status" % key)
+                expected.add(key)
+            elif roll < 0.8:
+                if shared.tree.delete(key) != (key in expected):
+                    failures.append("delete %r returned the wrong status" % key)
+                expected.discard(key)
+            else:
+                batch = []
+                for _ in range(16):
+                    key = rnd.randrange(key_space // threads) * threads + thread_id
+                    operation = INSERT if rnd.random() < 0.6 else DELETE
+                    batch.append((operation, key))
+                    if operation == INSERT:
+                        expected.add(key)
+                    else:
+                        expected.discard(key)
+                shared.tree.apply(batch)
+            if i % 500 == 0:
+                shared.tree.read(check)
+    except Exception as e:
+        failures.append("writer %d: %r" % (thread_id, e))
+    shared.expected[thread_id] = expected
+
+
+def reader(shared, seed, stop, failures):
+    rnd = random.Random(seed)
+    try:
+        while not stop.is_set():
+            shared.tree.search(rnd.randrange(shared.key_space))
+            low = rnd.randrange(shared.key_space)
+            window = shared.tree.read(lambda tree: list(tree.range(low, low + 64)))
+            if window != sorted(set(window)):
+                failures.append("range scan returned %r" % (window,))
+            # give the GIL away, with one CPU busy readers
+            # otherwise leave writers a fraction of a slice.
+            time.sleep(0)
+    except Exception as e:
+        failures.append("reader: %r" % (e,))
+
+
+class Shared:
+    def __init__(self, tree, threads, key_space):
+        self.tree = tree
+        self.threads = threads
+        self.key_space = key_space
+        self.expected = {}
+
+
+def stress(name, threads, ops, key_space, seed):
+    """
+    Runs one tree, returns (seconds, failures).
+    """
+    check = CHECKS[name]
+    shared = Shared(ConcurrentTree(TREES[name]()), threads, key_space)
+    failures = []
+    stop = threading.Event()
+    writers = [threading.Thread(target=writer, args=(shared, check, i, ops, key_space, seed + i, failures))
+               for i in range(threads)]
+    readers = [threading.Thread(target=reader, args=(shared, seed + threads + i, stop, failures))
+               for i in range(threads)]
+    start = time.perf_counter()
+    for thread in writers + readers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    try:
+        keys = shared.tree.read(check)
+    except AssertionError as e:
+        failures.append(str(e))
+    else:
+        expected = sorted(set().union(*shared.expected.values()))
+        if keys != expected:
+            failures.append("final keys differ from the expected set: %d vs %d keys" % (len(keys), len(expected)))
+    return elapsed, failures
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Stress ConcurrentTree from many threads.")
+    parser.add_argument("--trees", nargs="+", choices=sorted(TREES), default=sorted(TREES))
+    parser.add_argument("--threads", type=int, default=8, help="writer threads, and as many readers")
+    parser.add_argument("--ops", type=int, default=5000, help="operations per writer")
+    parser.add_argument("--key-space", type=int, default=1 << 16)
+    parser.add_argument("--seed", type=int, default=575)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    failed = False
+    for name in args.trees:
+        elapsed, failures = stress(name, args.threads, args.ops, args.key_space, args.seed)
+        print("%-10s %d threads x %d ops  %.2fs  %s" % (
+            name, args.threads, args.ops, elapsed, "ok" if not failures else "FAILED"))
+        for failure in failures[:20]:
+            print("  " + failure)
+        failed = failed or bool(failures)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
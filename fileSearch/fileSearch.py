@@ -0,0 +1,87 @@
+"""
+Memory-mapped file search.
+
+Maps a file into memory and runs Boyer Moore or KMP directly over
+the mapped bytes through a memoryview, so the file is neither read
+into a string nor decoded. Offsets are byte offsets into the file.
+
+Usage:
+python3 -m fileSearch.fileSearch PATTERN FILE [--engine kmp] [--ignore-case] [--count]
+"""
+import argparse
+import contextlib
+import mmap
+import sys
+
+from caseFold.caseFold import ASCII, SENSITIVE
+from matcher.matcher import BOYER_MOORE, ENGINES, compile
+
+
+@contextlib.contextmanager
+def map_file(path):
+    """
+    Context manager yielding a read-only memoryview over the
+    whole file. Empty files give an empty view since mmap
+    cannot map zero bytes.
+    """
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            yield memoryview(b"")
+            return
+        with mapped:
+            view = memoryview(mapped)
+            try:
+                yield view
+            finally:
+                view.release()
+
+
+def _as_bytes(pattern):
+    if isinstance(pattern, str):
+        return pattern.encode("utf-8")
+    return bytes(pattern)
+
+
+def finditer_file(path, pattern, engine=BOYER_MOORE, case=SENSITIVE):
+    """
+    Generator yielding the byte offset of every occurrence of
+    pattern in the file at path. str patterns are encoded as
+    UTF-8. The file stays mapped until the generator is
+    exhausted or closed.
+    case can be sensitive or ascii; ascii folding has to make
+    a lowered copy of the file.
+    """
+    compiled = compile(_as_bytes(pattern), engine, case)
+    with map_file(path) as view:
+        yield from compiled.finditer(view)
+
+
+def search_file(path, pattern, engine=BOYER_MOORE, case=SENSITIVE):
+    """
+    Returns the list of byte offsets of pattern in the file.
+    """
+    return list(finditer_file(path, pattern, engine, case))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search a file without reading it into memory.")
+    parser.add_argument("pattern")
+    parser.add_argument("file")
+    parser.add_argument("--engine", choices=ENGINES, default=BOYER_MOORE)
+    parser.add_argument("--ignore-case", action="store_true", help="fold ASCII letters")
+    parser.add_argument("--count", action="store_true", help="only print the number of matches")
+    args = parser.parse_args(argv)
+
+    case = ASCII if args.ignore_case else SENSITIVE
+    if args.count:
+        print(sum(1 for _ in finditer_file(args.file, args.pattern, args.engine, case)))
+    else:
+        for offset in finditer_file(args.file, args.pattern, args.engine, case):
+            print(offset)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
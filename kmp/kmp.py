@@ -2,6 +2,10 @@
 References:
 https://www.cs.princeton.edu/~wayne/cs423/lectures/stringsearch-4up.pdf
 """
+import time
+
+from caseFold.caseFold import UNICODE, fold_pattern, fold_text, map_matches
+from matchStats.matchStats import MatchProfile
 
 
 class KMP:
@@ -88,52 +92,158 @@ class KMP:
                 i = i + 1
         return lcsTable
 
-    def kmpSearch(self, pattern, string):
-        """
-        To check for length of the text and pattern
-        respective variables: sizeOfPattern and string
-        """
+    def kmpSearch(self, pattern, string, case=UNICODE):
+        """
+        Returns the list of positions of pattern in string.
+        case is one of the caseFold modes (sensitive, ascii,
+        unicode). The default casefold() makes sure the
+        strings are case-insensitive
+        For ex: DATA structure = data structure
+        Pattern and text are folded once up front, so the
+        search loop compares plain characters.
+        """
+        pattern = fold_pattern(pattern, case)
+        string, offsets = fold_text(string, case)
         sizeOfPattern = len(pattern)
-        sizeOfString = len(string)
 
         """
         Invokes the LCS table to store pattern along
         with length of the pattern computed
         """
         lcsTable = self.myLCSTable(pattern, sizeOfPattern)
+        return list(map_matches(self.kmpScan(pattern, lcsTable, string), offsets, sizeOfPattern))
+
+    @staticmethod
+    def kmpScan(pattern, lcsTable, string, j=0):
         """
-        Pointer for string text as i
-        and pointer for pattern as j
+        Generator yielding the offsets of the exact
+        (case-sensitive) occurrences of pattern in string
+        using an LCS table built earlier with myLCSTable,
+        so the table can be shared between searches.
+        Works on str and bytes-like input.
+
+        j is the length of a partial match carried over
+        from text before string, matches that began there
+        get negative offsets. The generator returns the
+        final j, so KMPStream can carry it to the next
+        chunk.
         """
-        patternPos = []
-        i = 0
-        j = 0
+        sizeOfPattern = len(pattern)
+        for i, c in enumerate(string):
+            while j != 0 and c != pattern[j]:
+                j = lcsTable[j - 1]
+            if c == pattern[j]:
+                j = j + 1
+                if j == sizeOfPattern:
+                    yield i - sizeOfPattern + 1
+                    j = lcsTable[j - 1]
+        return j
 
-        while i != sizeOfString:
-            """
-            casefold() makes sure the strings are case-insensitive
-            For ex: DATA structure = data structure 
-            """
-            if string[i].casefold() == pattern[j].casefold():
-                i = i + 1
+    def kmpProfile(self, pattern, string, case=UNICODE):
+        """
+        Runs kmpSearch with a profiling scan and returns a
+        MatchProfile: comparisons, LCS table fallbacks and
+        how far the pattern moved along the text at each
+        step. Slower than kmpSearch.
+        """
+        profile = MatchProfile("kmp")
+        start = time.perf_counter()
+        pattern = fold_pattern(pattern, case)
+        sizeOfPattern = len(pattern)
+        lcsTable = self.myLCSTable(pattern, sizeOfPattern)
+        profile.preprocess_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        folded, offsets = fold_text(string, case)
+        for _ in map_matches(self.kmpProfileScan(pattern, lcsTable, folded, profile), offsets, sizeOfPattern):
+            profile.matches += 1
+        profile.scan_seconds = time.perf_counter() - start
+        profile.text_length = len(string)
+        return profile
+
+    @staticmethod
+    def kmpProfileScan(pattern, lcsTable, string, profile):
+        """
+        Same loop as kmpScan, recording into profile.
+        A fallback from j to lcsTable[j - 1] moves the
+        pattern by the difference, a mismatch at j = 0
+        and a full match move it as well.
+        """
+        sizeOfPattern = len(pattern)
+        j = 0
+        for i, c in enumerate(string):
+            while j != 0 and c != pattern[j]:
+                profile.comparisons += 1
+                profile.fallbacks += 1
+                profile.shift(j - lcsTable[j - 1], "fallback")
+                j = lcsTable[j - 1]
+            profile.comparisons += 1
+            if c == pattern[j]:
                 j = j + 1
+                if j == sizeOfPattern:
+                    yield i - sizeOfPattern + 1
+                    profile.shift(j - lcsTable[j - 1], "after_match")
+                    j = lcsTable[j - 1]
             else:
-                """
-                Pattern not found, 
-                decrement j in the table
-                """
-                j = lcsTable[j - 1]
-                """
-                if reached the end of the pattern j=sizeofPattern
-                print index i-j
-                """
-            if j == sizeOfPattern:
-                patternPos.append(i - j)
-                j = lcsTable[j - 1]
-                """
-                Reached the end of string 
-                """
-            elif j == 0:
-                i += 1
+                profile.shift(1, "advance")
+
+
+class KMPStream:
+    """
+     Streaming KMP matcher. Text is fed chunk by chunk
+     (from a file, pipe or socket) and the partial match
+     index j is kept between calls, so matches straddling
+     chunk boundaries are found and only the pattern and
+     its LCS table are held in memory.
+     Offsets are absolute, counted from the first chunk.
+     Matching is case-sensitive; pattern and chunks must
+     both be str or both be bytes-like.
+    """
 
+    def __init__(self, pattern):
+        if len(pattern) == 0:
+            raise ValueError("Empty Pattern")
+        self.pattern = pattern
+        self.sizeOfPattern = len(pattern)
+        self.lcsTable = KMP.myLCSTable(pattern, self.sizeOfPattern)
+        self.reset()
+
+    def reset(self):
+        """
+        Forget the partial match and start counting
+        offsets from 0 again.
+        """
+        self.j = 0
+        self.position = 0
+
+    def feed(self, chunk):
+        """
+        Scans the next chunk of the text and returns
+        the absolute offsets of the matches ending in it.
+        """
+        patternPos = [self.position + k for k in self._scan(chunk)]
+        self.position += len(chunk)
         return patternPos
+
+    def _scan(self, chunk):
+        """
+        kmpScan over the chunk starting from the carried
+        partial match, keeping the one it ends with.
+        Offsets are relative to the start of the chunk.
+        """
+        self.j = yield from KMP.kmpScan(self.pattern, self.lcsTable, chunk, self.j)
+
+    def matches(self, chunks):
+        """
+        Generator over an iterable of chunks yielding
+        every match offset as soon as it is found.
+        """
+        for chunk in chunks:
+            yield from self.feed(chunk)
+
+    def searchFile(self, fileObj, chunkSize=1 << 20):
+        """
+        Reads fileObj (binary or text mode) chunkSize at
+        a time and yields the match offsets. Memory use
+        does not depend on the size of the file.
+        """
+        return self.matches(iter(lambda: fileObj.read(chunkSize), fileObj.read(0)))
@@ -2,7 +2,7 @@ import sys
 from avl.avl import AVLTree
 from boyerMoore.boyerMooreSearch import BoyerMooreSearch
 from kmp.kmp import KMP
-from redBlackTree.redBlackTree import RedBlackTree
+from redBlackTree.redBlackTree import RedBlackTree, TreePrintObserver
 
 
 def main():
@@ -24,6 +24,7 @@ def main():
             kmp.myInput()
         elif choice == 2:
             rbt = RedBlackTree()
+            rbt.subscribe(TreePrintObserver())
             while True:
                 print("\n********************* WELCOME TO RED BLACK Tree *******************")
                 print("\nOperations to Perform on Tree:- ")
@@ -133,16 +134,6 @@ def main():
             boyerMoore = BoyerMooreSearch()
             string = input("Please enter the first input string ")
             pattern = input("Please enter the pattern to be matched ")
-            for i in string:
-                if ord(i)>256 or ord(i)<0:
-                    print("Character: "+i+" Encoding: "+str(ord(i))+" Please provide input with correct encoding. Our program accepts 256 character encoding.")
-                    print("EXITING NOW...")
-                    sys.exit(1)
-            for i in pattern:
-                if ord(i)>256 or ord(i)<0:
-                    print("Character: "+i+" Encoding: "+str(ord(i))+" Please provide input with correct encoding. Our program accepts 256 character encoding.")
-                    print("EXITING NOW...")
-                    sys.exit(1)
             if len(string) == 0 or len(pattern) == 0:
                 print("Empty String or Empty Pattern")
             else:
@@ -158,4 +149,8 @@ def main():
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # non-interactive: replay an operations file, see benchmark.workloadReplay
+        from benchmark.workloadReplay import main as replay
+        sys.exit(replay(sys.argv[1:]))
     main()
@@ -0,0 +1,83 @@
+"""
+Profiles of a single Boyer Moore or KMP search.
+
+The normal scans count nothing. Profiling runs a copy of the scan loop
+that records, for one text:
+
+comparisons          pattern/text character comparisons
+shifts               histogram {shift length: times}
+rules                which rule chose each shift; Boyer Moore:
+                     bad_character, good_suffix_1, good_suffix_2,
+                     after_match; KMP: advance, fallback, after_match
+fallbacks            KMP only, LCS table lookups after a mismatch
+preprocess_seconds   building delta1/delta2 or the LCS table
+scan_seconds         folding and scanning the text
+matches, text_length
+
+Use matcher.matcher.profile() for a one-off profile, or run
+python3 -m matchStats.matchStats PATTERN FILE [--engine kmp]
+"""
+import argparse
+import json
+import sys
+from collections import Counter
+
+
+class MatchProfile:
+    __slots__ = ("engine", "comparisons", "shifts", "rules", "fallbacks", "preprocess_seconds", "scan_seconds",
+                 "matches", "text_length")
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.comparisons = 0
+        self.shifts = Counter()
+        self.rules = Counter()
+        self.fallbacks = 0
+        self.preprocess_seconds = 0.0
+        self.scan_seconds = 0.0
+        self.matches = 0
+        self.text_length = 0
+
+    def shift(self, length, rule):
+        self.shifts[length] += 1
+        self.rules[rule] += 1
+
+    def as_dict(self):
+        steps = sum(self.shifts.values())
+        return {
+            "engine": self.engine,
+            "text_length": self.text_length,
+            "matches": self.matches,
+            "comparisons": self.comparisons,
+            "comparisons_per_char": self.comparisons / self.text_length if self.text_length else 0.0,
+            "mean_shift": sum(length * times for length, times in self.shifts.items()) / steps if steps else 0.0,
+            "shifts": dict(sorted(self.shifts.items())),
+            "rules": dict(self.rules),
+            "fallbacks": self.fallbacks,
+            "preprocess_seconds": self.preprocess_seconds,
+            "scan_seconds": self.scan_seconds,
+        }
+
+
+def main(argv=None):
+    # the engines import this module, import them late
+    from caseFold.caseFold import ASCII, SENSITIVE
+    from matcher.matcher import BOYER_MOORE, PROFILED_ENGINES, profile
+
+    parser = argparse.ArgumentParser(description="Profile one search of a file.")
+    parser.add_argument("pattern")
+    parser.add_argument("file")
+    parser.add_argument("--engine", choices=PROFILED_ENGINES, default=BOYER_MOORE)
+    parser.add_argument("--ignore-case", action="store_true", help="fold ASCII letters")
+    args = parser.parse_args(argv)
+
+    with open(args.file, "rb") as f:
+        text = f.read()
+    result = profile(args.pattern.encode("utf-8"), text, args.engine, ASCII if args.ignore_case else SENSITIVE)
+    json.dump(result.as_dict(), sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""
+Compiled patterns for Boyer Moore, KMP and Shift-Or.
+
+compile(pattern, engine) does the preprocessing of an engine once
+(delta1, prefix-suffix and good suffix tables for Boyer Moore, the
+LCS table for KMP, the character masks for Shift-Or) and returns an immutable CompiledPattern that can
+be searched any number of times. Compiled patterns are kept in a
+process wide LRU cache so that compiling the same pattern again is a
+dictionary lookup, much like re.compile.
+
+profile() runs a single search with the instrumented scan of Boyer
+Moore or KMP, see matchStats. Approximate matching is only offered
+by shiftOr.ShiftOrSearch.
+
+Usage:
+from matcher.matcher import compile
+compile("needle", engine="kmp").findall(text)
+"""
+import threading
+from collections import OrderedDict
+
+from boyerMoore.boyerMooreSearch import BoyerMooreSearch
+from caseFold.caseFold import SENSITIVE, check_mode, fold_pattern, fold_text, map_matches
+from kmp.kmp import KMP
+from shiftOr.shiftOr import ShiftOrSearch
+
+BOYER_MOORE = "boyer_moore"
+KMP_ENGINE = "kmp"
+SHIFT_OR = "shift_or"
+ENGINES = (BOYER_MOORE, KMP_ENGINE, SHIFT_OR)
+PROFILED_ENGINES = (BOYER_MOORE, KMP_ENGINE)
+
+DEFAULT_CACHE_SIZE = 512
+
+
+class CompiledPattern:
+    """
+    A pattern preprocessed for one engine. Instances are
+    immutable so they can be shared between threads and
+    handed out from the cache.
+    case is one of the caseFold modes; the pattern is
+    folded here once and every text once per search, so
+    both engines give the same answers in every mode.
+    """
+    __slots__ = ("pattern", "engine", "case", "_folded", "_searcher", "_lcs_table")
+
+    def __init__(self, pattern, engine=BOYER_MOORE, case=SENSITIVE):
+        if isinstance(pattern, (bytearray, memoryview)):
+            pattern = bytes(pattern)
+        if not pattern:
+            raise ValueError("Empty Pattern")
+        if engine not in ENGINES:
+            raise ValueError("Unknown engine %r, expected one of %s" % (engine, ", ".join(ENGINES)))
+        check_mode(case)
+        folded = fold_pattern(pattern, case)
+        object.__setattr__(self, "pattern", pattern)
+        object.__setattr__(self, "engine", engine)
+        object.__setattr__(self, "case", case)
+        object.__setattr__(self, "_folded", folded)
+        if engine == BOYER_MOORE:
+            object.__setattr__(self, "_searcher", BoyerMooreSearch(folded))
+            object.__setattr__(self, "_lcs_table", None)
+        elif engine == SHIFT_OR:
+            object.__setattr__(self, "_searcher", ShiftOrSearch(folded))
+            object.__setattr__(self, "_lcs_table", None)
+        else:
+            object.__setattr__(self, "_searcher", None)
+            object.__setattr__(self, "_lcs_table", tuple(KMP.myLCSTable(folded, len(folded))))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompiledPattern is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("CompiledPattern is immutable")
+
+    def __repr__(self):
+        return "CompiledPattern(%r, engine=%r, case=%r)" % (self.pattern, self.engine, self.case)
+
+    def finditer(self, text):
+        """
+        Generator yielding the offset of every occurrence
+        of the pattern in text, in increasing order.
+        """
+        if isinstance(self.pattern, bytes) != isinstance(text, (bytes, bytearray, memoryview)):
+            raise TypeError("pattern and text must both be str or both be bytes-like")
+        text, offsets = fold_text(text, self.case)
+        if self._searcher is not None:
+            matches = self._searcher.finditer(text)
+        else:
+            matches = KMP.kmpScan(self._folded, self._lcs_table, text)
+        return map_matches(matches, offsets, len(self._folded))
+
+    def findall(self, text):
+        return list(self.finditer(text))
+
+    def count(self, text):
+        occurrences = 0
+        for _ in self.finditer(text):
+            occurrences += 1
+        return occurrences
+
+    def find_first(self, text):
+        """
+        Offset of the first occurrence or -1, stops
+        scanning at the first match.
+        """
+        for offset in self.finditer(text):
+            return offset
+        return -1
+
+    def contains(self, text):
+        return self.find_first(text) >= 0
+
+
+class PatternCache:
+    """
+    Bounded LRU cache of compiled patterns with hit,
+    miss and eviction counters. Thread safe.
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        if maxsize < 0:
+            raise ValueError("maxsize must be >= 0")
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, pattern, engine, case=SENSITIVE):
+        if isinstance(pattern, (bytearray, memoryview)):
+            pattern = bytes(pattern)
+        key = (engine, case, type(pattern), pattern)
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+
+        # compile outside the lock, two threads racing on the
+        # same pattern both compile and the second one wins.
+        compiled = CompiledPattern(pattern, engine, case)
+        with self._lock:
+            if self.maxsize:
+                self._entries[key] = compiled
+                self._entries.move_to_end(key)
+                self._evict()
+        return compiled
+
+    def _evict(self):
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def resize(self, maxsize):
+        if maxsize < 0:
+            raise ValueError("maxsize must be >= 0")
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        """
+        Drops every entry and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+_cache = PatternCache()
+
+
+def compile(pattern, engine=BOYER_MOORE, case=SENSITIVE):
+    """
+    Returns the CompiledPattern for pattern, engine and
+    case mode, from the process wide cache when possible.
+    """
+    return _cache.get(pattern, engine, case)
+
+
+def cache_info():
+    """
+    hits, misses, evictions, size and maxsize of the
+    process wide cache.
+    """
+    return _cache.info()
+
+
+def set_cache_size(maxsize):
+    """
+    Changes the capacity of the process wide cache,
+    evicting the least recently used entries if needed.
+    0 disables caching.
+    """
+    _cache.resize(maxsize)
+
+
+def profile(pattern, text, engine=BOYER_MOORE, case=SENSITIVE):
+    """
+    Searches text once with the profiling scan of the
+    engine and returns its MatchProfile (see matchStats).
+    Preprocessing is redone and timed, the cache is not
+    used.
+    """
+    if engine not in PROFILED_ENGINES:
+        raise ValueError("No profiling scan for engine %r, expected one of %s" % (engine, ", ".join(PROFILED_ENGINES)))
+    if engine == BOYER_MOORE:
+        return BoyerMooreSearch(pattern, case).profile(text)
+    return KMP().kmpProfile(pattern, text, case)
+
+
+def purge():
+    """
+    Clears the process wide cache and its counters.
+    """
+    _cache.clear()
@@ -0,0 +1,148 @@
+"""
+Parallel chunked search.
+
+Splits a text (or a memory-mapped file) into chunks that overlap by
+the pattern length minus one, searches the chunks with Boyer Moore or
+KMP in a process pool and returns the offsets in order.
+
+Every match is reported by the chunk it starts in: a chunk owns the
+offsets [start, start + chunk size) and scans up to pattern length - 1
+characters past that, so a match straddling a boundary is found by the
+chunk on its left and dropped by the one on its right. No set of seen
+offsets is needed and the results concatenate in order.
+
+For files each worker maps the file itself and only the chunk
+boundaries travel between processes. For in-memory text every chunk
+has to be pickled to its worker.
+
+Usage:
+python3 -m parallelSearch.parallelSearch PATTERN FILE [--workers 8] [--engine kmp]
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from caseFold.caseFold import ASCII, SENSITIVE, fold_pattern
+from fileSearch.fileSearch import map_file
+from matcher.matcher import BOYER_MOORE, ENGINES, compile
+
+MIN_CHUNK_SIZE = 1 << 20
+CHUNKS_PER_WORKER = 4
+
+
+def plan_chunks(size, overlap, workers, chunk_size=None):
+    """
+    Returns the list of (start, end, owned_end) for a text of
+    size characters. Chunks own [start, owned_end) and are
+    scanned over [start, end) where end adds the overlap.
+    """
+    if chunk_size is None:
+        chunk_size = max(MIN_CHUNK_SIZE, -(-size // (workers * CHUNKS_PER_WORKER)))
+    chunks = []
+    for start in range(0, size, chunk_size):
+        owned_end = min(size, start + chunk_size)
+        chunks.append((start, min(size, owned_end + overlap), owned_end))
+    return chunks
+
+
+def _owned(compiled, chunk, start, owned_end):
+    return [start + k for k in compiled.finditer(chunk) if start + k < owned_end]
+
+
+def _search_text_chunk(args):
+    chunk, start, owned_end, pattern, engine, case = args
+    return _owned(compile(pattern, engine, case), chunk, start, owned_end)
+
+
+def _search_file_chunk(args):
+    path, start, end, owned_end, pattern, engine, case = args
+    compiled = compile(pattern, engine, case)
+    with map_file(path) as view:
+        chunk = view[start:end]
+        try:
+            return _owned(compiled, chunk, start, owned_end)
+        finally:
+            chunk.release()
+
+
+def _run(tasks, worker, workers, executor):
+    """
+    Runs worker over tasks, in this process when there is a
+    single task, and concatenates the results in order.
+    """
+    if len(tasks) <= 1 or workers == 1:
+        results = map(worker, tasks)
+    elif executor is not None:
+        results = executor.map(worker, tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(worker, tasks))
+    offsets = []
+    for chunk_offsets in results:
+        offsets.extend(chunk_offsets)
+    return offsets
+
+
+def _overlap(pattern, case):
+    # a match never covers more original characters than the
+    # folded pattern has, folding only ever expands characters.
+    return len(fold_pattern(pattern, case)) - 1
+
+
+def parallel_search(text, pattern, engine=BOYER_MOORE, case=SENSITIVE, workers=None, chunk_size=None,
+                    executor=None):
+    """
+    Returns the sorted offsets of pattern in text, searching
+    chunks of the text in a process pool. An existing
+    ProcessPoolExecutor can be passed to avoid starting
+    workers on every call.
+    """
+    compile(pattern, engine, case)  # validates the arguments up front
+    workers = workers or os.cpu_count() or 1
+    chunks = plan_chunks(len(text), _overlap(pattern, case), workers, chunk_size)
+    tasks = [(text[start:end], start, owned_end, pattern, engine, case) for start, end, owned_end in chunks]
+    return _run(tasks, _search_text_chunk, workers, executor)
+
+
+def parallel_search_file(path, pattern, engine=BOYER_MOORE, case=SENSITIVE, workers=None, chunk_size=None,
+                         executor=None):
+    """
+    Returns the sorted byte offsets of pattern in the file at
+    path. Every worker memory-maps the file and scans its own
+    chunk, nothing but offsets is sent between processes.
+    str patterns are encoded as UTF-8.
+    """
+    if isinstance(pattern, str):
+        pattern = pattern.encode("utf-8")
+    compile(pattern, engine, case)
+    workers = workers or os.cpu_count() or 1
+    size = os.path.getsize(path)
+    chunks = plan_chunks(size, _overlap(pattern, case), workers, chunk_size)
+    tasks = [(path, start, end, owned_end, pattern, engine, case) for start, end, owned_end in chunks]
+    return _run(tasks, _search_file_chunk, workers, executor)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search a file with a pool of processes.")
+    parser.add_argument("pattern")
+    parser.add_argument("file")
+    parser.add_argument("--engine", choices=ENGINES, default=BOYER_MOORE)
+    parser.add_argument("--workers", type=int, default=None, help="default: number of CPUs")
+    parser.add_argument("--chunk-size", type=int, default=None, help="bytes per chunk")
+    parser.add_argument("--ignore-case", action="store_true", help="fold ASCII letters")
+    parser.add_argument("--count", action="store_true", help="only print the number of matches")
+    args = parser.parse_args(argv)
+
+    offsets = parallel_search_file(args.file, args.pattern, args.engine, ASCII if args.ignore_case else SENSITIVE,
+                                   args.workers, args.chunk_size)
+    if args.count:
+        print(len(offsets))
+    else:
+        for offset in offsets:
+            print(offset)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
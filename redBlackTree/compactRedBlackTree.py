@@ -0,0 +1,285 @@
+from array import array
+
+RED = 1
+BLACK = 2
+
+
+class CompactRedBlackTree:
+    """
+        Red black tree stored as a struct of arrays.
+
+        Node i is keys[i], left[i], right[i], parent[i] and color[i]; links are integer indices
+        instead of object references. Index 0 plays the role of Tree_Node_NULL: it is black and
+        is the parent of the root. Freed indices are reused by later inserts.
+
+        key_type is an array typecode for the keys ('q' for 64-bit integers, 'd' for floats) or
+        None to keep arbitrary comparable keys in a list.
+
+        Bytes per key, 64-bit CPython 3.11, measured with tracemalloc at 10^5 keys (see README):
+          RedBlackTree, TreeNode with __slots__   ~ 80 + key object
+          CompactRedBlackTree('q')                ~ 21.5, keys inline
+          CompactRedBlackTree(None)               ~ 21.5 + key object
+
+        Only insert, delete_node, search, height and len are offered, it is not a drop-in
+        replacement for RedBlackTree.
+    """
+
+    def __init__(self, key_type='q'):
+        self.keys = array(key_type, [0]) if key_type else [None]
+        self.left = array('i', [0])
+        self.right = array('i', [0])
+        self.parent = array('i', [0])
+        self.color = bytearray([BLACK])
+        self.root = 0
+        self.free = []
+        self.count = 0
+        self.list_keys = not key_type
+
+    def __len__(self):
+        return self.count
+
+    # ------ start: helper functions
+    def new_node(self, node_value):
+        if self.free:
+            node = self.free.pop()
+            self.keys[node] = node_value
+            self.left[node] = self.right[node] = self.parent[node] = 0
+            self.color[node] = RED
+            return node
+        self.keys.append(node_value)
+        self.left.append(0)
+        self.right.append(0)
+        self.parent.append(0)
+        self.color.append(RED)
+        return len(self.color) - 1
+
+    def min(self, node):
+        while self.left[node]:
+            node = self.left[node]
+        return node
+
+    def height(self):
+        if not self.root:
+            return 0
+        height = 0
+        stack = [(self.root, 1)]
+        while stack:
+            node, level = stack.pop()
+            height = max(height, level)
+            if self.left[node]:
+                stack.append((self.left[node], level + 1))
+            if self.right[node]:
+                stack.append((self.right[node], level + 1))
+        return height
+
+    def left_rotate(self, node):
+        left, right, parent = self.left, self.right, self.parent
+        c_right_node = right[node]
+        right[node] = left[c_right_node]
+        if left[c_right_node]:
+            parent[left[c_right_node]] = node
+        parent[c_right_node] = parent[node]
+        if not parent[node]:
+            self.root = c_right_node
+        elif node == left[parent[node]]:
+            left[parent[node]] = c_right_node
+        else:
+            right[parent[node]] = c_right_node
+        left[c_right_node] = node
+        parent[node] = c_right_node
+
+    def right_rotate(self, node):
+        left, right, parent = self.left, self.right, self.parent
+        c_left_node = left[node]
+        left[node] = right[c_left_node]
+        if right[c_left_node]:
+            parent[right[c_left_node]] = node
+        parent[c_left_node] = parent[node]
+        if not parent[node]:
+            self.root = c_left_node
+        elif node == right[parent[node]]:
+            right[parent[node]] = c_left_node
+        else:
+            left[parent[node]] = c_left_node
+        right[c_left_node] = node
+        parent[node] = c_left_node
+    # ------ end: helper functions
+
+    def find(self, node_value):
+        """
+            Index of the node holding node_value, 0 if it is not in the tree.
+        """
+        keys = self.keys
+        node = self.root
+        while node:
+            key = keys[node]
+            if node_value == key:
+                return node
+            node = self.left[node] if node_value < key else self.right[node]
+        return 0
+
+    def search(self, node_value):
+        return self.find(node_value) != 0
+
+    # ------ start: inserting new node
+    def insert(self, node_value):
+        """
+            Insert like a BST and re-balance. Returns False if the value already exists.
+        """
+        keys = self.keys
+        new_node_parent = 0
+        current_node = self.root
+        while current_node:
+            new_node_parent = current_node
+            key = keys[current_node]
+            if node_value == key:
+                return False
+            current_node = self.left[current_node] if node_value < key else self.right[current_node]
+
+        new_node = self.new_node(node_value)
+        self.parent[new_node] = new_node_parent
+        if not new_node_parent:
+            self.root = new_node
+        elif node_value < keys[new_node_parent]:
+            self.left[new_node_parent] = new_node
+        else:
+            self.right[new_node_parent] = new_node
+        self.count += 1
+        self.balance_tree_after_insert(new_node)
+        return True
+
+    def balance_tree_after_insert(self, node):
+        left, right, parent, color = self.left, self.right, self.parent, self.color
+        while color[parent[node]] == RED:
+            grandparent = parent[parent[node]]
+            if parent[node] == right[grandparent]:
+                uncle = left[grandparent]
+                if color[uncle] == RED:
+                    color[uncle] = BLACK
+                    color[parent[node]] = BLACK
+                    color[grandparent] = RED
+                    node = grandparent
+                else:
+                    if node == left[parent[node]]:
+                        node = parent[node]
+                        self.right_rotate(node)
+                    color[parent[node]] = BLACK
+                    color[parent[parent[node]]] = RED
+                    self.left_rotate(parent[parent[node]])
+            else:
+                uncle = right[grandparent]
+                if color[uncle] == RED:
+                    color[uncle] = BLACK
+                    color[parent[node]] = BLACK
+                    color[grandparent] = RED
+                    node = grandparent
+                else:
+                    if node == right[parent[node]]:
+                        node = parent[node]
+                        self.left_rotate(node)
+                    color[parent[node]] = BLACK
+                    color[parent[parent[node]]] = RED
+                    self.right_rotate(parent[parent[node]])
+        color[self.root] = BLACK
+    # ------ end: inserting new node
+
+    # ------ start: deleting a node
+    def replace_node(self, node_to_be_deleted, node_to_be_replaced_with):
+        parent = self.parent
+        node_parent = parent[node_to_be_deleted]
+        if not node_parent:
+            self.root = node_to_be_replaced_with
+        elif node_to_be_deleted == self.left[node_parent]:
+            self.left[node_parent] = node_to_be_replaced_with
+        else:
+            self.right[node_parent] = node_to_be_replaced_with
+        # index 0 gets a parent too, balance_after_delete walks up from it
+        parent[node_to_be_replaced_with] = node_parent
+
+    def delete_node(self, node_value):
+        """
+            Delete node_value from the tree. Returns True if it was found and removed.
+        """
+        left, right, parent, color = self.left, self.right, self.parent, self.color
+        node = self.find(node_value)
+        if not node:
+            return False
+
+        original_color = color[node]
+        if not right[node]:
+            replace_node = left[node]
+            self.replace_node(node, replace_node)
+        elif not left[node]:
+            replace_node = right[node]
+            self.replace_node(node, replace_node)
+        else:
+            successor = self.min(right[node])
+            original_color = color[successor]
+            replace_node = right[successor]
+            if parent[successor] == node:
+                parent[replace_node] = successor
+            else:
+                self.replace_node(successor, replace_node)
+                right[successor] = right[node]
+                parent[right[successor]] = successor
+            self.replace_node(node, successor)
+            left[successor] = left[node]
+            parent[left[successor]] = successor
+            color[successor] = color[node]
+
+        if original_color == BLACK:
+            self.balance_after_delete(replace_node)
+        if self.list_keys:
+            # drop the key, a freed slot must not keep it alive until reused
+            self.keys[node] = None
+        self.free.append(node)
+        self.count -= 1
+        return True
+
+    def balance_after_delete(self, node):
+        left, right, parent, color = self.left, self.right, self.parent, self.color
+        while node != self.root and color[node] == BLACK:
+            if node == left[parent[node]]:
+                sibling = right[parent[node]]
+                if color[sibling] == RED:
+                    color[sibling] = BLACK
+                    color[parent[node]] = RED
+                    self.left_rotate(parent[node])
+                    sibling = right[parent[node]]
+                if color[left[sibling]] == BLACK and color[right[sibling]] == BLACK:
+                    color[sibling] = RED
+                    node = parent[node]
+                else:
+                    if color[right[sibling]] == BLACK:
+                        color[left[sibling]] = BLACK
+                        color[sibling] = RED
+                        self.right_rotate(sibling)
+                        sibling = right[parent[node]]
+                    color[sibling] = color[parent[node]]
+                    color[parent[node]] = BLACK
+                    color[right[sibling]] = BLACK
+                    self.left_rotate(parent[node])
+                    node = self.root
+            else:
+                sibling = left[parent[node]]
+                if color[sibling] == RED:
+                    color[sibling] = BLACK
+                    color[parent[node]] = RED
+                    self.right_rotate(parent[node])
+                    sibling = left[parent[node]]
+                if color[right[sibling]] == BLACK and color[left[sibling]] == BLACK:
+                    color[sibling] = RED
+                    node = parent[node]
+                else:
+                    if color[left[sibling]] == BLACK:
+                        color[right[sibling]] = BLACK
+                        color[sibling] = RED
+                        self.left_rotate(sibling)
+                        sibling = left[parent[node]]
+                    color[sibling] = color[parent[node]]
+                    color[parent[node]] = BLACK
+                    color[left[sibling]] = BLACK
+                    self.right_rotate(parent[node])
+                    node = self.root
+        color[node] = BLACK
+    # ------ end: deleting a node
@@ -1,5 +1,8 @@
 import sys
 
+# treeStats, treeSnapshot and bulkLookup are imported by the methods that use them, so importing
+# the tree does not load them.
+
 
 class NodeColor:
     """
@@ -19,13 +22,18 @@ class NodeColor:
 class TreeNode:
     """
         This class represents a single node in red black tree
+        __slots__ keeps the fields in the object itself instead of a per-instance __dict__.
+        size is the number of nodes in the subtree, only kept up to date by trees with order statistics.
     """
+    __slots__ = ('value', 'parent', 'left', 'right', 'color', 'size')
+
     def __init__(self, node_value):
         self.value = node_value
         self.parent = None
         self.left = None
         self.right = None
         self.color = NodeColor.RED
+        self.size = 1
 
     def __str__(self):
         if self.value == (-sys.maxsize - 1):
@@ -34,20 +42,146 @@ class TreeNode:
             return 'node found in the tree: value: ' + str(self.value) + ', color: ' + NodeColor.get_color(self.color) + '\n'
 
 
+class RedBlackTreeObserver:
+    """
+        Base class for objects that want to follow what the tree does. Subclass it and override the
+        events of interest, then register the instance with RedBlackTree.subscribe().
+        Every event receives the tree first so a single observer can follow several trees.
+    """
+    def on_rotate(self, tree, node, direction):
+        """ node is the node rotated around, direction is 'left' or 'right' """
+
+    def on_recolor(self, tree, node, color):
+        """ node has just been given color (NodeColor.RED or NodeColor.BLACK) """
+
+    def on_insert(self, tree, node_value, inserted):
+        """ inserted is False when node_value already existed """
+
+    def on_delete(self, tree, node_value, deleted):
+        """ deleted is False when node_value was not in the tree """
+
+
+class TreePrintObserver(RedBlackTreeObserver):
+    """
+        Prints the whole tree after every rotation, insert and delete. This walks the entire tree
+        so it is meant for the interactive menu and debugging only.
+    """
+    def on_rotate(self, tree, node, direction):
+        tree.print_tree(tree.root)
+        print('\n')
+
+    def on_insert(self, tree, node_value, inserted):
+        if inserted:
+            print('Insert completed, final tree ')
+            tree.print_tree(tree.root)
+            print('\n')
+
+    def on_delete(self, tree, node_value, deleted):
+        if deleted:
+            print('Delete completed, final tree ')
+            tree.print_tree(tree.root)
+
+
 class RedBlackTree:
-    def __init__(self):
+    def __init__(self, quiet=False, order_statistics=False):
+        """
+            quiet=True sets log_level to 0, the tree then performs no I/O at all.
+            Diagnostics are available through observers, see subscribe().
+            order_statistics=True keeps the size of every subtree in its root, which enables rank(),
+            select(), count_range() and median() in O(log n) for O(log n) extra work per update.
+        """
         self.Tree_Node_NULL = TreeNode(-sys.maxsize - 1)
         self.Tree_Node_NULL.color = NodeColor.BLACK
+        self.Tree_Node_NULL.size = 0
         self.Tree_Node_NULL.left = None
         self.Tree_Node_NULL.right = None
         self.root = self.Tree_Node_NULL
-        self.log_level = 1
+        # number of values in the tree, kept by _attach, _remove_node and _build_from_sorted
+        self.count = 0
+        self.log_level = 0 if quiet else 1
+        self.observers = []
+        self.order_statistics = order_statistics
+        self.stats = None
+        # sorted values for search_many, None once the values change
+        self._frozen_values = None
+
+    def __len__(self):
+        return self.count
 
     # ------ start: helper functions
     def log(self, log_string):
         if self.log_level > 0:
             print(log_string)
 
+    def subscribe(self, observer):
+        """
+            Register a RedBlackTreeObserver to be notified of rotations, recolorings,
+            inserts and deletes.
+        """
+        self.observers.append(observer)
+
+    def unsubscribe(self, observer):
+        self.observers.remove(observer)
+
+    def notify(self, event, *args):
+        for observer in self.observers:
+            getattr(observer, event)(self, *args)
+
+    def recolor(self, node, color):
+        """
+            Set the colour of node. Only actual changes are counted and notified, repainting a node
+            with the colour it already has is a no-op.
+        """
+        if node.color == color:
+            return
+        node.color = color
+        if self.stats is not None:
+            self.stats.recolorings += 1
+        if self.observers:
+            self.notify('on_recolor', node, color)
+
+    def enable_stats(self):
+        """
+            Start counting comparisons, rotations, recolorings and search visits, see treeStats.
+            Returns the TreeStats being updated.
+        """
+        from treeStats.treeStats import TreeStats
+        if self.stats is None:
+            self.stats = TreeStats()
+        return self.stats
+
+    def disable_stats(self):
+        self.stats = None
+
+    def reset_stats(self):
+        if self.stats is not None:
+            self.stats.reset()
+
+    def stats_snapshot(self):
+        """
+            Counters and current height as a dict, None when stats are not enabled.
+        """
+        if self.stats is None:
+            return None
+        return self.stats.snapshot(self.height())
+
+    def height(self):
+        """
+            Number of nodes on the longest path from the root, 0 for an empty tree.
+        """
+        if self.root == self.Tree_Node_NULL:
+            return 0
+        height = 0
+        stack = [(self.root, 1)]
+        while stack:
+            current_node, level = stack.pop()
+            height = max(height, level)
+            if current_node.left != self.Tree_Node_NULL:
+                stack.append((current_node.left, level + 1))
+            if current_node.right != self.Tree_Node_NULL:
+                stack.append((current_node.right, level + 1))
+        return height
+
     def print_tree(self, current_node, level=1):
         """
             Print the tree rotated 90 degrees to the left. So we will have right nodes at the top and
@@ -76,7 +210,10 @@ class RedBlackTree:
         """
             Here we perform left rotation around the nodes provided.
         """
-        self.log('Left rotating - [' + str(current_node.value) + ']')
+        if self.log_level > 0:
+            self.log('Left rotating - [' + str(current_node.value) + ']')
+        if self.stats is not None:
+            self.stats.rotations += 1
         c_right_node = current_node.right
         current_node.right = c_right_node.left
         if c_right_node.left != self.Tree_Node_NULL:
@@ -91,15 +228,21 @@ class RedBlackTree:
             current_node.parent.right = c_right_node
         c_right_node.left = current_node
         current_node.parent = c_right_node
+        if self.order_statistics:
+            c_right_node.size = current_node.size
+            current_node.size = 1 + current_node.left.size + current_node.right.size
 
-        self.print_tree(self.root)
-        print('\n')
+        if self.observers:
+            self.notify('on_rotate', current_node, 'left')
 
     def right_rotate(self, current_node):
         """
             Here we perform right rotation around the nodes provided.
         """
-        self.log('Right rotating - [' + str(current_node.value) + ']')
+        if self.log_level > 0:
+            self.log('Right rotating - [' + str(current_node.value) + ']')
+        if self.stats is not None:
+            self.stats.rotations += 1
         c_left_node = current_node.left
         current_node.left = c_left_node.right
         if c_left_node.right != self.Tree_Node_NULL:
@@ -114,15 +257,23 @@ class RedBlackTree:
             current_node.parent.left = c_left_node
         c_left_node.right = current_node
         current_node.parent = c_left_node
+        if self.order_statistics:
+            c_left_node.size = current_node.size
+            current_node.size = 1 + current_node.left.size + current_node.right.size
 
-        self.print_tree(self.root)
-        print('\n')
+        if self.observers:
+            self.notify('on_rotate', current_node, 'right')
     # ------ end: helper functions
 
     # ------ start: searching a node
     # Search the red black tree
     def _search_red_black_tree(self, search_node, node_value):
-        if search_node == self.Tree_Node_NULL or node_value == search_node.value:
+        if search_node == self.Tree_Node_NULL:
+            return search_node
+        if self.stats is not None:
+            self.stats.nodes_visited += 1
+            self.stats.comparisons += 1 if node_value == search_node.value else 2
+        if node_value == search_node.value:
             return search_node
 
         if node_value < search_node.value:
@@ -130,8 +281,30 @@ class RedBlackTree:
 
         return self._search_red_black_tree(search_node.right, node_value)
 
+    def search_many(self, node_values, positions=False):
+        """
+            Look up a batch of values at once, see bulkLookup. Returns for every value whether it is in
+            the tree, or with positions=True its index in ascending order and -1 when absent. The sorted
+            values are copied on the first call and reused until the tree changes.
+        """
+        from bulkLookup.bulkLookup import search_many
+        return search_many(self.freeze_values(), node_values, positions)
+
+    def freeze_values(self):
+        """
+            The sorted copy of the values used by search_many, made now if the tree changed since the
+            last one.
+        """
+        if self._frozen_values is None:
+            from bulkLookup.bulkLookup import freeze
+            self._frozen_values = freeze(self.ascending())
+        return self._frozen_values
+
     def search_red_black_tree(self, node_value):
-        self.log('Searching for node - [' + str(node_value) + '] in the tree')
+        if self.log_level > 0:
+            self.log('Searching for node - [' + str(node_value) + '] in the tree')
+        if self.stats is not None:
+            self.stats.searches += 1
         return self._search_red_black_tree(self.root, node_value)
     # ------ end: searching a node
 
@@ -153,50 +326,54 @@ class RedBlackTree:
             if c_node == c_node.parent.left:
                 sibling = c_node.parent.right
                 if sibling.color == NodeColor.RED:
-                    sibling.color = NodeColor.BLACK
-                    c_node.parent.color = NodeColor.RED
+                    self.recolor(sibling, NodeColor.BLACK)
+                    self.recolor(c_node.parent, NodeColor.RED)
                     self.left_rotate(c_node.parent)
                     sibling = c_node.parent.right
 
                 if sibling.left.color == NodeColor.BLACK and sibling.right.color == NodeColor.BLACK:
-                    sibling.color = NodeColor.RED
+                    self.recolor(sibling, NodeColor.RED)
                     c_node = c_node.parent
                 else:
                     if sibling.right.color == NodeColor.BLACK:
-                        sibling.left.color = NodeColor.BLACK
-                        sibling.color = NodeColor.RED
+                        if self.stats is not None:
+                            self.stats.double_rotations += 1
+                        self.recolor(sibling.left, NodeColor.BLACK)
+                        self.recolor(sibling, NodeColor.RED)
                         self.right_rotate(sibling)
                         sibling = c_node.parent.right
 
-                    sibling.color = c_node.parent.color
-                    c_node.parent.color = NodeColor.BLACK
-                    sibling.right.color = NodeColor.BLACK
+                    self.recolor(sibling, c_node.parent.color)
+                    self.recolor(c_node.parent, NodeColor.BLACK)
+                    self.recolor(sibling.right, NodeColor.BLACK)
                     self.left_rotate(c_node.parent)
                     c_node = self.root
             else:
                 sibling = c_node.parent.left
                 if sibling.color == NodeColor.RED:
-                    sibling.color = NodeColor.BLACK
-                    c_node.parent.color = NodeColor.RED
+                    self.recolor(sibling, NodeColor.BLACK)
+                    self.recolor(c_node.parent, NodeColor.RED)
                     self.right_rotate(c_node.parent)
                     sibling = c_node.parent.left
 
                 if sibling.right.color == NodeColor.BLACK and sibling.left.color == NodeColor.BLACK:
-                    sibling.color = NodeColor.RED
+                    self.recolor(sibling, NodeColor.RED)
                     c_node = c_node.parent
                 else:
                     if sibling.left.color == NodeColor.BLACK:
-                        sibling.right.color = NodeColor.BLACK
-                        sibling.color = NodeColor.RED
+                        if self.stats is not None:
+                            self.stats.double_rotations += 1
+                        self.recolor(sibling.right, NodeColor.BLACK)
+                        self.recolor(sibling, NodeColor.RED)
                         self.left_rotate(sibling)
                         sibling = c_node.parent.left
 
-                    sibling.color = c_node.parent.color
-                    c_node.parent.color = NodeColor.BLACK
-                    sibling.left.color = NodeColor.BLACK
+                    self.recolor(sibling, c_node.parent.color)
+                    self.recolor(c_node.parent, NodeColor.BLACK)
+                    self.recolor(sibling.left, NodeColor.BLACK)
                     self.right_rotate(c_node.parent)
                     c_node = self.root
-        c_node.color = NodeColor.BLACK
+        self.recolor(c_node, NodeColor.BLACK)
 
     # this is the transplant function in the BST
     def replace_node(self, node_to_be_deleted, node_to_be_replaced_with):
@@ -212,7 +389,6 @@ class RedBlackTree:
             node_to_be_deleted.parent.right = node_to_be_replaced_with
 
         node_to_be_replaced_with.parent = node_to_be_deleted.parent
-        self.print_tree(self.root)
 
     # Node deletion
     def _delete_node(self, current_node, node_value):
@@ -225,6 +401,8 @@ class RedBlackTree:
 
         # search the node to be deleted
         while current_node != self.Tree_Node_NULL:
+            if self.stats is not None:
+                self.stats.comparisons += 2
             if current_node.value == node_value:
                 node_to_be_deleted = current_node
 
@@ -234,24 +412,44 @@ class RedBlackTree:
                 current_node = current_node.left
 
         if node_to_be_deleted == self.Tree_Node_NULL:
-            print('Delete operation: Cannot find node [' + str(node_value) + '] in the tree')
-            return
+            if self.log_level > 0:
+                self.log('Delete operation: Cannot find node [' + str(node_value) + '] in the tree')
+            return False
+        self._remove_node(node_to_be_deleted)
+        return True
+
+    def _remove_node(self, node_to_be_deleted):
+        """
+            Unlink a node that is in the tree and re-balance.
+        """
+        self._frozen_values = None
+        self.count -= 1
+        if self.order_statistics:
+            # the node physically unlinked is the successor when there are two children, every
+            # node above it loses one descendant. Done before the links change.
+            if node_to_be_deleted.left != self.Tree_Node_NULL and node_to_be_deleted.right != self.Tree_Node_NULL:
+                self._add_to_sizes(self.min(node_to_be_deleted.right).parent, -1)
+            else:
+                self._add_to_sizes(node_to_be_deleted.parent, -1)
 
         t_node_to_be_deleted = node_to_be_deleted
         t_node_to_be_deleted_original_color = t_node_to_be_deleted.color
 
         if node_to_be_deleted.right == self.Tree_Node_NULL:
             replace_node = node_to_be_deleted.left
-            print('Delete operation: replacing with left node of [' + str(node_to_be_deleted.value) + ']')
+            if self.log_level > 0:
+                self.log('Delete operation: replacing with left node of [' + str(node_to_be_deleted.value) + ']')
             self.replace_node(node_to_be_deleted, node_to_be_deleted.left)
         elif node_to_be_deleted.left == self.Tree_Node_NULL:
             replace_node = node_to_be_deleted.right
-            print('Delete operation: replacing with right node of [' + str(node_to_be_deleted.value) + ']')
+            if self.log_level > 0:
+                self.log('Delete operation: replacing with right node of [' + str(node_to_be_deleted.value) + ']')
             self.replace_node(node_to_be_deleted, node_to_be_deleted.right)
         else:
             # find the successor to replace the node
             t_node_to_be_deleted = self.min(node_to_be_deleted.right)
-            print('Delete operation: replacing node [' + str(node_to_be_deleted.value) + '] with successor node [' + str(t_node_to_be_deleted.value) + ']')
+            if self.log_level > 0:
+                self.log('Delete operation: replacing node [' + str(node_to_be_deleted.value) + '] with successor node [' + str(t_node_to_be_deleted.value) + ']')
             t_node_to_be_deleted_original_color = t_node_to_be_deleted.color
             replace_node = t_node_to_be_deleted.right
             if t_node_to_be_deleted.parent == node_to_be_deleted:
@@ -264,16 +462,22 @@ class RedBlackTree:
             self.replace_node(node_to_be_deleted, t_node_to_be_deleted)
             t_node_to_be_deleted.left = node_to_be_deleted.left
             t_node_to_be_deleted.left.parent = t_node_to_be_deleted
-            t_node_to_be_deleted.color = node_to_be_deleted.color
+            t_node_to_be_deleted.size = node_to_be_deleted.size
+            self.recolor(t_node_to_be_deleted, node_to_be_deleted.color)
 
         if t_node_to_be_deleted_original_color == NodeColor.BLACK:
             self.balance_after_delete(replace_node)
 
     def delete_node(self, node_value):
-        self.log('Deleting node - [' + str(node_value) + ']')
-        self._delete_node(self.root, node_value)
-        print('Delete completed, final tree ')
-        self.print_tree(self.root)
+        """
+            Delete node_value from the tree. Returns True if it was found and removed.
+        """
+        if self.log_level > 0:
+            self.log('Deleting node - [' + str(node_value) + ']')
+        deleted = self._delete_node(self.root, node_value)
+        if self.observers:
+            self.notify('on_delete', node_value, deleted)
+        return deleted
     # ------ end: deleting new node
 
     # ------ start: inserting new node
@@ -293,17 +497,19 @@ class RedBlackTree:
                 uncle = current_node.parent.parent.left
                 # if uncle color is RED
                 if uncle.color == NodeColor.RED:
-                    uncle.color = NodeColor.BLACK
-                    current_node.parent.color = NodeColor.BLACK
-                    current_node.parent.parent.color = NodeColor.RED
+                    self.recolor(uncle, NodeColor.BLACK)
+                    self.recolor(current_node.parent, NodeColor.BLACK)
+                    self.recolor(current_node.parent.parent, NodeColor.RED)
                     current_node = current_node.parent.parent
                 # if uncle color is BLACK
                 else:
                     if current_node == current_node.parent.left:
+                        if self.stats is not None:
+                            self.stats.double_rotations += 1
                         current_node = current_node.parent
                         self.right_rotate(current_node)
-                    current_node.parent.color = NodeColor.BLACK
-                    current_node.parent.parent.color = NodeColor.RED
+                    self.recolor(current_node.parent, NodeColor.BLACK)
+                    self.recolor(current_node.parent.parent, NodeColor.RED)
                     self.left_rotate(current_node.parent.parent)
             # if parent is left child of grandparent
             else:
@@ -311,50 +517,67 @@ class RedBlackTree:
 
                 # if uncle color is RED
                 if uncle.color == NodeColor.RED:
-                    uncle.color = NodeColor.BLACK
-                    current_node.parent.color = NodeColor.BLACK
-                    current_node.parent.parent.color = NodeColor.RED
+                    self.recolor(uncle, NodeColor.BLACK)
+                    self.recolor(current_node.parent, NodeColor.BLACK)
+                    self.recolor(current_node.parent.parent, NodeColor.RED)
                     current_node = current_node.parent.parent
                 # if uncle color is RED
                 else:
                     if current_node == current_node.parent.right:
+                        if self.stats is not None:
+                            self.stats.double_rotations += 1
                         current_node = current_node.parent
                         self.left_rotate(current_node)
-                    current_node.parent.color = NodeColor.BLACK
-                    current_node.parent.parent.color = NodeColor.RED
+                    self.recolor(current_node.parent, NodeColor.BLACK)
+                    self.recolor(current_node.parent.parent, NodeColor.RED)
                     self.right_rotate(current_node.parent.parent)
 
             if current_node == self.root:
                 break
 
-        self.root.color = NodeColor.BLACK
+        self.recolor(self.root, NodeColor.BLACK)
 
     # insert a new node to the red black tree
     def insert(self, node_value):
         """
-            Insert a node like BST and call re-balancing
+            Insert a node like BST and call re-balancing.
+            Returns False if the value already exists in the tree.
         """
-        self.log('Inserting node - [' + str(node_value) + ']')
-        new_node = TreeNode(node_value)
-        new_node.parent = None
-        new_node.value = node_value
-        new_node.left = self.Tree_Node_NULL
-        new_node.right = self.Tree_Node_NULL
-        new_node.color = NodeColor.RED
-
+        if self.log_level > 0:
+            self.log('Inserting node - [' + str(node_value) + ']')
         new_node_parent = None
         current_node = self.root
 
         while current_node != self.Tree_Node_NULL:
             new_node_parent = current_node
-            if new_node.value == current_node.value:
-                print('The node with value [' + str(node_value) + '] already exists in the tree')
-                return
-            elif new_node.value < current_node.value:
+            if self.stats is not None:
+                self.stats.comparisons += 1 if node_value == current_node.value else 2
+            if node_value == current_node.value:
+                if self.log_level > 0:
+                    self.log('The node with value [' + str(node_value) + '] already exists in the tree')
+                if self.observers:
+                    self.notify('on_insert', node_value, False)
+                return False
+            elif node_value < current_node.value:
                 current_node = current_node.left
             else:
                 current_node = current_node.right
 
+        self._attach(new_node_parent, node_value)
+        if self.observers:
+            self.notify('on_insert', node_value, True)
+        return True
+
+    def _attach(self, new_node_parent, node_value):
+        """
+            Hang a new red node holding node_value under new_node_parent (None for an empty tree),
+            re-balance and return the new node.
+        """
+        self._frozen_values = None
+        self.count += 1
+        new_node = TreeNode(node_value)
+        new_node.left = self.Tree_Node_NULL
+        new_node.right = self.Tree_Node_NULL
         new_node.parent = new_node_parent
         if new_node_parent is None:
             self.root = new_node
@@ -362,17 +585,380 @@ class RedBlackTree:
             new_node_parent.left = new_node
         else:
             new_node_parent.right = new_node
-
-        self.print_tree(self.root)
-        print('\n\n')
+        if self.order_statistics:
+            self._add_to_sizes(new_node_parent, 1)
 
         if new_node.parent is None:
-            new_node.color = NodeColor.BLACK
-            return
+            self.recolor(new_node, NodeColor.BLACK)
+        elif new_node.parent.parent is not None:
+            self.balance_tree_after_insert(new_node)
+        return new_node
 
-        if new_node.parent.parent is None:
-            return
+    # ------ end: inserting new node
 
-        self.balance_tree_after_insert(new_node)
+    # ------ start: batch operations
+    def _finger_start(self, finger, node_value):
+        """
+            Node to start the descent for node_value from, given a finger node with a smaller value.
+            Every subtree containing the finger only holds values above some lower bound smaller than
+            node_value, so it is enough to climb until the subtree is also bounded above by node_value.
+            For values close to the finger this stops after a few steps instead of at the root.
+        """
+        if finger is None:
+            return self.root
+        while finger.parent is not None:
+            if finger == finger.parent.left:
+                if self.stats is not None:
+                    self.stats.comparisons += 1
+                if node_value < finger.parent.value:
+                    break
+            finger = finger.parent
+        return finger
+
+    def _sorted_batch(self, node_values):
+        """
+            Positions of node_values sorted by value, so results can be reported in input order.
+        """
+        return sorted(range(len(node_values)), key=node_values.__getitem__)
 
-    # ------ end: inserting new node
+    def insert_many(self, node_values):
+        """
+            Insert a batch of values. Returns one bool per value, in input order, False when the value
+            was already in the tree or earlier in the batch. Nothing is printed.
+            The batch is sorted and every descent starts from the previous insertion point rather
+            than the root. A batch at least as large as the tree is merged with the values already in
+            the tree and the tree is rebuilt in linear time instead.
+        """
+        node_values = list(node_values)
+        inserted = [False] * len(node_values)
+        order = self._sorted_batch(node_values)
+        if len(node_values) >= self.count:
+            present = set(self.ascending())
+            for i in order:
+                if node_values[i] not in present:
+                    present.add(node_values[i])
+                    inserted[i] = True
+            self._build_from_sorted(sorted(present))
+        else:
+            finger = None
+            for i in order:
+                node_value = node_values[i]
+                new_node_parent = None
+                current_node = self._finger_start(finger, node_value)
+                while current_node != self.Tree_Node_NULL:
+                    new_node_parent = current_node
+                    if self.stats is not None:
+                        self.stats.comparisons += 1 if node_value == current_node.value else 2
+                    if node_value == current_node.value:
+                        break
+                    current_node = current_node.left if node_value < current_node.value else current_node.right
+                if current_node != self.Tree_Node_NULL:
+                    finger = current_node
+                    continue
+                finger = self._attach(new_node_parent, node_value)
+                inserted[i] = True
+        if self.observers:
+            for node_value, status in zip(node_values, inserted):
+                self.notify('on_insert', node_value, status)
+        return inserted
+
+    def delete_many(self, node_values):
+        """
+            Delete a batch of values. Returns one bool per value, in input order, False when the value
+            was not in the tree or already deleted earlier in the batch. Nothing is printed.
+            Like insert_many the batch is sorted and every search starts near the previous deletion:
+            the in-order predecessor of a deleted node survives the deletion and is the finger.
+        """
+        node_values = list(node_values)
+        deleted = [False] * len(node_values)
+        finger = None
+        for i in self._sorted_batch(node_values):
+            node_value = node_values[i]
+            current_node = self._finger_start(finger, node_value)
+            while current_node != self.Tree_Node_NULL:
+                if self.stats is not None:
+                    self.stats.comparisons += 1 if node_value == current_node.value else 2
+                if node_value == current_node.value:
+                    break
+                current_node = current_node.left if node_value < current_node.value else current_node.right
+            if current_node == self.Tree_Node_NULL:
+                continue
+            finger = self._predecessor_node(current_node)
+            self._remove_node(current_node)
+            deleted[i] = True
+        if self.observers:
+            for node_value, status in zip(node_values, deleted):
+                self.notify('on_delete', node_value, status)
+        return deleted
+
+    def _predecessor_node(self, current_node):
+        if current_node.left != self.Tree_Node_NULL:
+            return self.maximum(current_node.left)
+        while current_node.parent is not None and current_node == current_node.parent.left:
+            current_node = current_node.parent
+        return current_node.parent
+    # ------ end: batch operations
+
+    # ------ start: traversal
+    def __iter__(self):
+        return self.ascending()
+
+    def ascending(self):
+        """
+            Generator over the values in ascending order. Uses an explicit stack of O(log n) nodes
+            instead of recursion. The tree must not be modified while the generator is in use.
+        """
+        stack = []
+        current_node = self.root
+        while stack or current_node != self.Tree_Node_NULL:
+            while current_node != self.Tree_Node_NULL:
+                stack.append(current_node)
+                current_node = current_node.left
+            current_node = stack.pop()
+            yield current_node.value
+            current_node = current_node.right
+
+    def descending(self):
+        """
+            Generator over the values in descending order.
+        """
+        stack = []
+        current_node = self.root
+        while stack or current_node != self.Tree_Node_NULL:
+            while current_node != self.Tree_Node_NULL:
+                stack.append(current_node)
+                current_node = current_node.right
+            current_node = stack.pop()
+            yield current_node.value
+            current_node = current_node.left
+
+    def range(self, low, high):
+        """
+            Generator over the values with low <= value <= high in ascending order. The descent to
+            low is O(log n), so a scan yielding k values costs O(log n + k).
+        """
+        stack = []
+        current_node = self.root
+        while current_node != self.Tree_Node_NULL:
+            if current_node.value < low:
+                current_node = current_node.right
+            else:
+                stack.append(current_node)
+                current_node = current_node.left
+        while stack:
+            current_node = stack.pop()
+            if current_node.value > high:
+                return
+            yield current_node.value
+            current_node = current_node.right
+            while current_node != self.Tree_Node_NULL:
+                stack.append(current_node)
+                current_node = current_node.left
+
+    def floor(self, node_value):
+        """
+            Largest value <= node_value, None if there is none.
+        """
+        found = None
+        current_node = self.root
+        while current_node != self.Tree_Node_NULL:
+            if current_node.value == node_value:
+                return current_node.value
+            if current_node.value < node_value:
+                found = current_node.value
+                current_node = current_node.right
+            else:
+                current_node = current_node.left
+        return found
+
+    def ceiling(self, node_value):
+        """
+            Smallest value >= node_value, None if there is none.
+        """
+        found = None
+        current_node = self.root
+        while current_node != self.Tree_Node_NULL:
+            if current_node.value == node_value:
+                return current_node.value
+            if current_node.value > node_value:
+                found = current_node.value
+                current_node = current_node.left
+            else:
+                current_node = current_node.right
+        return found
+
+    def predecessor(self, node_value):
+        """
+            Largest value < node_value, None if there is none. node_value does not have to be in the tree.
+        """
+        found = None
+        current_node = self.root
+        while current_node != self.Tree_Node_NULL:
+            if current_node.value < node_value:
+                found = current_node.value
+                current_node = current_node.right
+            else:
+                current_node = current_node.left
+        return found
+
+    def successor(self, node_value):
+        """
+            Smallest value > node_value, None if there is none. node_value does not have to be in the tree.
+        """
+        found = None
+        current_node = self.root
+        while current_node != self.Tree_Node_NULL:
+            if current_node.value > node_value:
+                found = current_node.value
+                current_node = current_node.left
+            else:
+                current_node = current_node.right
+        return found
+    # ------ end: traversal
+
+    # ------ start: bulk loading
+    @classmethod
+    def from_sorted(cls, node_values, quiet=False, order_statistics=False):
+        """
+            Build a tree from values in ascending order in O(n) without any rotation.
+            Equal neighbours are kept once, a descending pair raises ValueError.
+        """
+        tree = cls(quiet=quiet, order_statistics=order_statistics)
+        tree._build_from_sorted(tree._unique_sorted(node_values))
+        return tree
+
+    def bulk_load(self, node_values):
+        """
+            Add values in any order by sorting them together with the values already in the tree
+            and rebuilding it.
+        """
+        merged = set(node_values)
+        merged.update(self.ascending())
+        self._build_from_sorted(sorted(merged))
+
+    def save(self, path, key_type=None):
+        """
+            Write the values to a binary snapshot, see treeSnapshot. key_type is 'q' or 'd', by default
+            it is picked from the values.
+        """
+        from treeSnapshot.treeSnapshot import write_snapshot
+        write_snapshot(path, list(self.ascending()), key_type)
+
+    @classmethod
+    def load(cls, path, quiet=False, order_statistics=False):
+        """
+            Build a tree from a snapshot in linear time, reading the values through a memory map.
+            Raises ValueError if the values in the file are not sorted and unique.
+        """
+        from treeSnapshot.treeSnapshot import SnapshotView
+        tree = cls(quiet=quiet, order_statistics=order_statistics)
+        with SnapshotView(path) as view:
+            view.validate()
+            tree._build_from_sorted(view.keys)
+        return tree
+
+    @staticmethod
+    def _unique_sorted(node_values):
+        unique = []
+        for node_value in node_values:
+            if unique and node_value <= unique[-1]:
+                if node_value == unique[-1]:
+                    continue
+                raise ValueError('values are not sorted: ' + str(node_value) + ' after ' + str(unique[-1]))
+            unique.append(node_value)
+        return unique
+
+    def _build_from_sorted(self, node_values):
+        """
+            The middle value becomes the root, recursively, so every path to a leaf has the same
+            length give or take one. With height h = len(node_values).bit_length(), colouring the nodes
+            at depth h red and every other node black gives each path h - 1 black nodes and no red
+            node a red child.
+        """
+        self._frozen_values = None
+        self.count = len(node_values)
+        height = len(node_values).bit_length()
+        self.root = self._build_subtree(node_values, 0, len(node_values), None, 1, height)
+        if self.root != self.Tree_Node_NULL:
+            self.root.color = NodeColor.BLACK
+
+    def _build_subtree(self, node_values, lo, hi, parent, depth, height):
+        if lo >= hi:
+            return self.Tree_Node_NULL
+        mid = (lo + hi) // 2
+        new_node = TreeNode(node_values[mid])
+        new_node.parent = parent
+        new_node.color = NodeColor.RED if depth == height else NodeColor.BLACK
+        new_node.size = hi - lo
+        new_node.left = self._build_subtree(node_values, lo, mid, new_node, depth + 1, height)
+        new_node.right = self._build_subtree(node_values, mid + 1, hi, new_node, depth + 1, height)
+        return new_node
+    # ------ end: bulk loading
+
+    # ------ start: order statistics
+    def _add_to_sizes(self, current_node, delta):
+        while current_node is not None:
+            current_node.size += delta
+            current_node = current_node.parent
+
+    def _check_order_statistics(self):
+        if not self.order_statistics:
+            raise RuntimeError('order statistics are not enabled, use RedBlackTree(order_statistics=True)')
+
+    def _count_below(self, node_value, inclusive):
+        """
+            Number of values smaller than node_value (or equal to it when inclusive), adding up the
+            sizes of the left subtrees passed on the way down.
+        """
+        self._check_order_statistics()
+        count = 0
+        current_node = self.root
+        while current_node != self.Tree_Node_NULL:
+            if current_node.value < node_value or (inclusive and current_node.value == node_value):
+                count += 1 + current_node.left.size
+                current_node = current_node.right
+            else:
+                current_node = current_node.left
+        return count
+
+    def rank(self, node_value):
+        """
+            Number of values in the tree smaller than node_value.
+        """
+        return self._count_below(node_value, False)
+
+    def select(self, k):
+        """
+            The k-th smallest value, counting from 0. Raises IndexError when k is out of range.
+        """
+        self._check_order_statistics()
+        if not 0 <= k < self.root.size:
+            raise IndexError('select index out of range')
+        current_node = self.root
+        while True:
+            left_size = current_node.left.size
+            if k < left_size:
+                current_node = current_node.left
+            elif k == left_size:
+                return current_node.value
+            else:
+                k -= left_size + 1
+                current_node = current_node.right
+
+    def count_range(self, low, high):
+        """
+            Number of values with low <= value <= high.
+        """
+        if high < low:
+            return 0
+        return self._count_below(high, True) - self._count_below(low, False)
+
+    def median(self):
+        """
+            Median value, the lower one of the two middle values when the size is even.
+        """
+        self._check_order_statistics()
+        if self.root == self.Tree_Node_NULL:
+            raise IndexError('median of an empty tree')
+        return self.select((self.root.size - 1) // 2)
+    # ------ end: order statistics
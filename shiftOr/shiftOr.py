@@ -0,0 +1,200 @@
+# Bit-parallel (Shift-Or / Bitap) search with approximate matching
+# References:
+# https://dl.acm.org/doi/10.1145/135239.135243 (Baeza-Yates, Gonnet)
+# https://dl.acm.org/doi/10.1145/135239.135244 (Wu, Manber)
+from caseFold.caseFold import SENSITIVE, check_mode, fold_pattern, fold_text, map_matches
+
+BINARY_TYPES = (bytes, bytearray, memoryview)
+
+
+class ShiftOrSearch:
+    def __init__(self, pattern=None, case=SENSITIVE):
+        """
+        Constructor for the bit-parallel search.
+        Keeps one bit per pattern position: bit j of
+        the state is set when pattern[0..j] matches
+        the text ending at the current character, so
+        a whole column of comparisons is one shift,
+        one or and one and per text character.
+
+        Python ints have no fixed width, so patterns
+        longer than a machine word need no special
+        case. This is the Shift-And form of Shift-Or:
+        with unbounded ints the complemented states of
+        Shift-Or would grow by a bit per character
+        unless masked on every step.
+
+        The pattern can be a str or bytes-like and
+        case is one of the caseFold modes, as for
+        BoyerMooreSearch.
+        """
+        check_mode(case)
+        self.case = case
+        self.pattern = pattern
+        if self.pattern:
+            self.set_pattern(self.pattern)
+
+    def set_pattern(self, pattern):
+        """
+        Sets the pattern and builds the character
+        masks. The stored pattern is the folded one.
+        """
+        if isinstance(pattern, (bytearray, memoryview)):
+            pattern = bytes(pattern)
+        self.pattern = fold_pattern(pattern, self.case)
+        self.binary = isinstance(pattern, bytes)
+        self.masks = self.generate_masks(self.pattern)
+
+    def generate_masks(self, pattern):
+        """
+        mask[c] has bit j set when pattern[j] == c.
+        bytes patterns use a dense list of 256 masks
+        indexed by the byte value, str patterns a dict
+        holding only the characters of the pattern,
+        every other character has the mask 0.
+        """
+        if isinstance(pattern, bytes):
+            masks = [0] * 256
+        else:
+            masks = {}
+            for c in pattern:
+                masks[c] = 0
+        for j, c in enumerate(pattern):
+            masks[c] |= 1 << j
+        return masks
+
+    def _use_pattern(self, pattern):
+        if pattern:
+            self.set_pattern(pattern)
+        elif not self.pattern:
+            raise ValueError("Set Pattern or Pass pattern")
+        return self.pattern
+
+    def _check_text(self, text):
+        if self.binary != isinstance(text, BINARY_TYPES):
+            raise TypeError("pattern and text must both be str or both be bytes-like")
+
+    def finditer(self, text, pattern=None):
+        """
+        Generator yielding the offset of every exact
+        occurrence of the pattern in text, in
+        increasing order.
+        """
+        pat = self._use_pattern(pattern)
+        if self.case == SENSITIVE:
+            return self._scan(text, pat)
+        folded, offsets = fold_text(text, self.case)
+        return map_matches(self._scan(folded, pat), offsets, len(pat))
+
+    def findall(self, text, pattern=None):
+        return list(self.finditer(text, pattern))
+
+    def count(self, text, pattern=None):
+        occurrences = 0
+        for _ in self.finditer(text, pattern):
+            occurrences += 1
+        return occurrences
+
+    def find_first(self, text, pattern=None):
+        """
+        Offset of the first occurrence or -1, stops
+        scanning at the first match.
+        """
+        for s in self.finditer(text, pattern):
+            return s
+        return -1
+
+    def contains(self, text, pattern=None):
+        return self.find_first(text, pattern) >= 0
+
+    def _scan(self, text, pat):
+        self._check_text(text)
+        masks = self.masks
+        patlen = len(pat)
+        found = 1 << (patlen - 1)
+        state = 0
+        # two copies of the loop, so the bytes one indexes the
+        # dense list and the str one makes a single dict call.
+        if self.binary:
+            for i, c in enumerate(text):
+                state = ((state << 1) | 1) & masks[c]
+                if state & found:
+                    yield i - patlen + 1
+        else:
+            get = masks.get
+            for i, c in enumerate(text):
+                state = ((state << 1) | 1) & get(c, 0)
+                if state & found:
+                    yield i - patlen + 1
+
+    def finditer_approximate(self, text, max_errors, pattern=None):
+        """
+        Generator yielding (end, errors) for every
+        position where an occurrence of the pattern
+        with at most max_errors substitutions,
+        insertions or deletions ends. end is the
+        offset just past the occurrence and errors the
+        fewest edits of any occurrence ending there.
+        With indels the start is not unique, so only
+        ends are reported, like agrep.
+
+        Wu-Manber: one state per error count, state d
+        holds the prefixes matching with at most d
+        edits, each built from states d and d - 1 of
+        the previous character and state d - 1 of
+        this one. O(n * (max_errors + 1)) big-int
+        operations.
+        """
+        pat = self._use_pattern(pattern)
+        if not 0 <= max_errors < len(pat):
+            raise ValueError("max_errors must be between 0 and len(pattern) - 1")
+        if self.case == SENSITIVE:
+            return self._scan_approximate(text, pat, max_errors)
+        folded, offsets = fold_text(text, self.case)
+        return self._map_ends(self._scan_approximate(folded, pat, max_errors), offsets)
+
+    def findall_approximate(self, text, max_errors, pattern=None):
+        return list(self.finditer_approximate(text, max_errors, pattern))
+
+    @staticmethod
+    def _map_ends(matches, offsets):
+        """
+        Maps ends in the folded text back to the
+        original text, dropping ends that fall inside
+        the expansion of a single character.
+        """
+        if offsets is None:
+            yield from matches
+            return
+        end_of_text = len(offsets)
+        for end, errors in matches:
+            if end < end_of_text and offsets[end - 1] == offsets[end]:
+                continue
+            yield offsets[end - 1] + 1, errors
+
+    def _scan_approximate(self, text, pat, max_errors):
+        self._check_text(text)
+        masks = self.masks
+        binary = self.binary
+        get = None if binary else masks.get
+        found = 1 << (len(pat) - 1)
+        # before any text, the first d pattern characters
+        # match the empty string with d deletions.
+        states = [(1 << d) - 1 for d in range(max_errors + 1)]
+        levels = range(1, max_errors + 1)
+        for i, c in enumerate(text):
+            mask = masks[c] if binary else get(c, 0)
+            previous = states[0]
+            states[0] = ((previous << 1) | 1) & mask
+            for d in levels:
+                current = states[d]
+                # match | insertion | substitution and deletion.
+                # Bits past the pattern length can appear but
+                # are never shifted back down and never tested.
+                states[d] = (((current << 1) | 1) & mask) | previous | ((previous | states[d - 1]) << 1) | 1
+                previous = current
+            if states[max_errors] & found:
+                errors = 0
+                while not states[errors] & found:
+                    errors += 1
+                yield i + 1, errors
@@ -0,0 +1,111 @@
+"""
+Shared inputs and reference implementations for the tests: a naive
+search with random and periodic texts for the matchers, and adapters
+giving AVLTree and RedBlackTree the same quiet interface with a check
+of their invariants.
+"""
+import random
+
+from avl.avl import AVLTree
+from concurrentTree.treeStress import check_avl, check_red_black
+from redBlackTree.redBlackTree import RedBlackTree
+
+
+def naive(pattern, text):
+    return [i for i in range(len(text) - len(pattern) + 1) if text[i:i + len(pattern)] == pattern]
+
+
+def random_cases(seed, count=1500):
+    rnd = random.Random(seed)
+    for _ in range(count):
+        alphabet = rnd.choice(["a", "ab", "abc", "acgt"])
+        text = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 40)))
+        pattern = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(1, 6)))
+        yield pattern, text
+
+
+def periodic_cases():
+    for period in ["a", "ab", "aab", "abaab"]:
+        text = period * (60 // len(period))
+        for length in range(1, 12):
+            yield text[:length], text
+            yield text[:length - 1] + "b", text
+            yield text[1:length + 1], text + "b"
+
+
+CASES = list(random_cases(575)) + list(periodic_cases())
+
+
+class AVL:
+    name = "avl"
+
+    @staticmethod
+    def make(keys=(), stats=True):
+        tree = AVLTree(orderStatistics=stats)
+        for key in keys:
+            AVL.insert(tree, key)
+        return tree
+
+    @staticmethod
+    def insert(tree, key):
+        # insert() prints, use the utilities like the benchmark
+        if not tree.findNode(key):
+            tree.root = tree.insertUtil(tree.root, key)
+
+    @staticmethod
+    def delete(tree, key):
+        if tree.findNode(key):
+            tree.root = tree.deleteUtil(tree.root, key)
+
+    from_sorted = staticmethod(lambda keys: AVLTree.fromSorted(keys, orderStatistics=True))
+    bulk_load = staticmethod(lambda tree, keys: tree.bulkLoad(keys))
+    count_range = staticmethod(lambda tree, lo, hi: tree.countRange(lo, hi))
+
+    @staticmethod
+    def check(tree):
+        keys = check_avl(tree)
+
+        def size(node):
+            if not node:
+                return 0
+            total = 1 + size(node.left) + size(node.right)
+            assert node.size == total
+            return total
+
+        size(tree.root)
+        return keys
+
+
+class RedBlack:
+    name = "redblack"
+
+    @staticmethod
+    def make(keys=(), stats=True):
+        tree = RedBlackTree(quiet=True, order_statistics=stats)
+        for key in keys:
+            tree.insert(key)
+        return tree
+
+    insert = staticmethod(lambda tree, key: tree.insert(key))
+    delete = staticmethod(lambda tree, key: tree.delete_node(key))
+    from_sorted = staticmethod(lambda keys: RedBlackTree.from_sorted(keys, quiet=True, order_statistics=True))
+    bulk_load = staticmethod(lambda tree, keys: tree.bulk_load(keys))
+    count_range = staticmethod(lambda tree, lo, hi: tree.count_range(lo, hi))
+
+    @staticmethod
+    def check(tree):
+        keys = check_red_black(tree)
+        null = tree.Tree_Node_NULL
+
+        def size(node):
+            if node == null:
+                return 0
+            total = 1 + size(node.left) + size(node.right)
+            assert node.size == total
+            return total
+
+        size(tree.root)
+        return keys
+
+
+TREES = [AVL, RedBlack]
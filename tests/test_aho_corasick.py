@@ -0,0 +1,81 @@
+"""
+AhoCorasick in both layouts against a naive scan for every pattern,
+with overlapping patterns and patterns that are suffixes or prefixes
+of others.
+"""
+import random
+
+import pytest
+
+from ahoCorasick.ahoCorasick import AhoCorasick
+
+
+def naive(patterns, text):
+    """
+    (pattern id, offset) of every occurrence, ordered by
+    end position, then longer patterns first.
+    """
+    matches = []
+    for pattern_id, pattern in enumerate(patterns):
+        for i in range(len(text) - len(pattern) + 1):
+            if text[i:i + len(pattern)] == pattern:
+                matches.append((i + len(pattern), -len(pattern), pattern_id, i))
+    return [(pattern_id, i) for _, _, pattern_id, i in sorted(matches)]
+
+
+def automata(patterns):
+    return [AhoCorasick(patterns), AhoCorasick(patterns, compact=True)]
+
+
+EXAMPLES = [
+    (["he", "she", "his", "hers"], "ushers ahishers"),
+    # every pattern is a suffix of the next
+    (["a", "aa", "aaa"], "aaaaa"),
+    (["c", "bc", "abc", "xabc"], "xabcabc"),
+    # prefixes of each other and overlapping occurrences
+    (["ab", "abab", "bab"], "abababab"),
+    # the same pattern twice reports both ids
+    (["ana", "ana", "nan"], "bananana"),
+    (["é", "😀é", "中"], "a😀é中é"),
+]
+
+
+@pytest.mark.parametrize("patterns, text", EXAMPLES)
+def test_examples(patterns, text):
+    expected = naive(patterns, text)
+    for automaton in automata(patterns):
+        assert automaton.findall(text) == expected
+
+
+def test_random():
+    rnd = random.Random(8)
+    for _ in range(400):
+        alphabet = rnd.choice(["ab", "abc", "acgt"])
+        patterns = ["".join(rnd.choice(alphabet) for _ in range(rnd.randint(1, 5)))
+                    for _ in range(rnd.randint(1, 8))]
+        text = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 60)))
+        expected = naive(patterns, text)
+        trie, packed = automata(patterns)
+        assert trie.findall(text) == expected, (patterns, text)
+        assert packed.findall(text) == expected, (patterns, text)
+        assert packed.state_count() == trie.state_count()
+
+
+def test_bytes():
+    patterns = [b"he", bytearray(b"she"), memoryview(b"hers")]
+    text = b"ushers"
+    expected = naive([bytes(p) for p in patterns], text)
+    for automaton in automata(patterns):
+        assert automaton.findall(text) == expected
+        assert automaton.findall(bytearray(text)) == expected
+        with pytest.raises(TypeError):
+            automaton.findall("ushers")
+
+
+def test_invalid_patterns():
+    with pytest.raises(ValueError):
+        AhoCorasick([])
+    with pytest.raises(ValueError):
+        AhoCorasick(["a", ""])
+    with pytest.raises(TypeError):
+        AhoCorasick(["a", b"b"])
@@ -0,0 +1,28 @@
+"""
+BoyerMooreSearch against a naive search, on random texts over small
+alphabets (many partial matches) and on periodic texts.
+"""
+import pytest
+
+from boyerMoore.boyerMooreSearch import BoyerMooreSearch
+from tests.helpers import CASES, naive
+
+# inputs that used to fail
+BOYER_MOORE_REGRESSIONS = [
+    # good suffix case 1 left shorter suffixes without a shift (user-004)
+    ("baaa", "aaabbbbbaabbaaabbab"),
+]
+
+
+@pytest.mark.parametrize("pattern, text", BOYER_MOORE_REGRESSIONS)
+def test_regressions(pattern, text):
+    assert BoyerMooreSearch(pattern).findall(text) == naive(pattern, text)
+
+
+def test_boyer_moore_findall():
+    for pattern, text in CASES:
+        expected = naive(pattern, text)
+        searcher = BoyerMooreSearch(pattern)
+        assert searcher.findall(text) == expected, (pattern, text)
+        assert searcher.count(text) == len(expected)
+        assert searcher.find_first(text) == (expected[0] if expected else -1)
@@ -0,0 +1,41 @@
+"""
+Boyer Moore over the whole unicode range and over bytes-like input.
+"""
+import random
+
+import pytest
+
+from boyerMoore.boyerMooreSearch import BoyerMooreSearch
+from tests.helpers import CASES, naive
+
+
+def test_bytes():
+    for pattern, text in CASES:
+        assert BoyerMooreSearch(pattern.encode()).findall(text.encode()) == naive(pattern, text)
+
+
+def test_bytes_like():
+    text = b"xxneedle needle"
+    for pattern in (b"needle", bytearray(b"needle"), memoryview(b"needle")):
+        searcher = BoyerMooreSearch(pattern)
+        assert searcher.findall(text) == [2, 9]
+        assert searcher.findall(bytearray(text)) == [2, 9]
+        assert searcher.findall(memoryview(text)) == [2, 9]
+
+
+def test_large_alphabet():
+    rnd = random.Random(5)
+    # characters from the BMP and beyond it, where a table indexed
+    # by ord() would need 0x110000 entries
+    alphabet = "aé中文ж😀𝄞\U0010fffd"
+    for _ in range(500):
+        text = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 40)))
+        pattern = "".join(rnd.choice(alphabet[:rnd.randint(1, len(alphabet))]) for _ in range(rnd.randint(1, 5)))
+        assert BoyerMooreSearch(pattern).findall(text) == naive(pattern, text), (pattern, text)
+
+
+def test_str_and_bytes_do_not_mix():
+    with pytest.raises(TypeError):
+        BoyerMooreSearch("needle").findall(b"needle")
+    with pytest.raises(TypeError):
+        BoyerMooreSearch(b"needle").findall("needle")
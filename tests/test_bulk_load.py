@@ -0,0 +1,40 @@
+"""
+Bulk loading of both trees from sorted input and merging unsorted
+batches into a tree, checked against a sorted list.
+"""
+import random
+
+import pytest
+
+from tests.helpers import TREES
+
+
+@pytest.mark.parametrize("kind", TREES, ids=lambda kind: kind.name)
+def test_from_sorted_and_bulk_load(kind):
+    rnd = random.Random(12)
+    for size in [0, 1, 2, 3, 7, 8, 100, 1000]:
+        keys = sorted(rnd.sample(range(10 * size + 1), size))
+        tree = kind.from_sorted(keys)
+        assert kind.check(tree) == keys
+        extra = [rnd.randrange(20 * size + 1) for _ in range(size)]
+        kind.bulk_load(tree, extra)
+        assert kind.check(tree) == sorted(set(keys).union(extra))
+    assert kind.check(kind.from_sorted([1, 1, 2])) == [1, 2]
+    with pytest.raises(ValueError):
+        kind.from_sorted([2, 1])
+
+
+@pytest.mark.parametrize("kind", TREES, ids=lambda kind: kind.name)
+def test_updates_after_bulk_load(kind):
+    rnd = random.Random(120)
+    keys = set(range(0, 3000, 3))
+    tree = kind.from_sorted(sorted(keys))
+    for _ in range(1500):
+        key = rnd.randrange(3000)
+        if rnd.random() < 0.5:
+            kind.insert(tree, key)
+            keys.add(key)
+        else:
+            kind.delete(tree, key)
+            keys.discard(key)
+    assert kind.check(tree) == sorted(keys)
@@ -0,0 +1,72 @@
+"""
+Batch lookups of both trees, on the dict fallback and, when NumPy is
+installed, on the ndarray path.
+"""
+import random
+
+import pytest
+
+from bulkLookup import bulkLookup
+from tests.helpers import AVL, RedBlack
+
+KINDS = [AVL, RedBlack]
+
+
+def search_many(tree, queries, positions=False):
+    if hasattr(tree, "searchMany"):
+        return tree.searchMany(queries, positions)
+    return tree.search_many(queries, positions)
+
+
+def expected(keys, queries, positions):
+    index = {key: i for i, key in enumerate(sorted(keys))}
+    if positions:
+        return [index.get(key, -1) for key in queries]
+    return [key in index for key in queries]
+
+
+def check_batches(kind):
+    rng = random.Random(24)
+    keys = set(rng.sample(range(2000), 600))
+    tree = kind.make(keys, stats=False)
+    queries = [rng.randrange(-10, 2010) for _ in range(5000)]
+    for positions in (False, True):
+        assert list(search_many(tree, queries, positions)) == expected(keys, queries, positions)
+
+    # the frozen copy is dropped by every update
+    for key in rng.sample(sorted(keys), 100):
+        kind.delete(tree, key)
+        keys.discard(key)
+    for key in range(2000, 2050):
+        kind.insert(tree, key)
+        keys.add(key)
+    assert list(search_many(tree, queries, True)) == expected(keys, queries, True)
+
+    # any iterable, not only sequences
+    assert list(search_many(tree, (key for key in queries))) == expected(keys, queries, False)
+    distinct = sorted(set(queries))
+    assert sorted(search_many(tree, set(queries), True)) == sorted(expected(keys, distinct, True))
+
+
+@pytest.mark.parametrize("kind", KINDS, ids=lambda k: k.name)
+def test_dict_fallback(kind, monkeypatch):
+    monkeypatch.setattr(bulkLookup, "numpy", None)
+    check_batches(kind)
+    assert search_many(kind.make(stats=False), [1, 2], True) == [-1, -1]
+
+
+@pytest.mark.parametrize("kind", KINDS, ids=lambda k: k.name)
+def test_numpy(kind):
+    numpy = pytest.importorskip("numpy")
+    check_batches(kind)
+
+    tree = kind.make([3, 1, 4, 5, 9, 2, 6], stats=False)
+    queries = numpy.array([[1, 7], [9, 0]])
+    found = search_many(tree, queries)
+    assert found.dtype == bool
+    assert found.tolist() == [[True, False], [True, False]]
+    assert search_many(tree, queries, True).tolist() == [[0, -1], [6, -1]]
+
+    empty = kind.make(stats=False)
+    assert search_many(empty, queries, True).tolist() == [[-1, -1], [-1, -1]]
+    assert not search_many(empty, queries).any()
@@ -0,0 +1,119 @@
+"""
+Case-insensitive modes of every engine against a naive search on the
+original characters, including characters whose case folding changes
+the length of the text (ß -> ss, İ -> i + combining dot).
+"""
+import random
+
+import pytest
+
+from boyerMoore.boyerMooreSearch import BoyerMooreSearch
+from caseFold.caseFold import ASCII, SENSITIVE, UNICODE, check_mode, fold_text, map_matches
+from kmp.kmp import KMP
+from matcher.matcher import ENGINES, compile
+from shiftOr.shiftOr import ShiftOrSearch
+
+
+def naive_unicode(pattern, text):
+    """
+    Offsets i such that some text[i:j] casefolds to the
+    folded pattern: matches start and end on original
+    characters.
+    """
+    folded = pattern.casefold()
+    return [i for i in range(len(text))
+            if any(text[i:j].casefold() == folded for j in range(i + 1, len(text) + 1))]
+
+
+def naive_ascii(pattern, text):
+    lower = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+    pattern, text = pattern.translate(lower), text.translate(lower)
+    return [i for i in range(len(text) - len(pattern) + 1) if text[i:i + len(pattern)] == pattern]
+
+
+def searchers(case):
+    yield lambda pattern, text: BoyerMooreSearch(pattern, case).findall(text)
+    yield lambda pattern, text: KMP().kmpSearch(pattern, text, case=case)
+    yield lambda pattern, text: ShiftOrSearch(pattern, case).findall(text)
+    for engine in ENGINES:
+        yield lambda pattern, text, engine=engine: compile(pattern, engine, case).findall(text)
+
+
+UNICODE_CASES = [
+    ("ss", "Straße"),
+    ("SS", "STRASSE straße"),
+    ("straße", "STRASSE"),
+    ("s", "ß"),
+    ("ßa", "ssa SSA ßA"),
+    ("i", "İstanbul"),
+    ("i̇", "İstanbul"),
+    ("İ", "i̇ İ"),
+    ("ﬁ", "FI fi ﬁ"),
+]
+
+
+@pytest.mark.parametrize("pattern, text", UNICODE_CASES)
+def test_unicode_expanding_characters(pattern, text):
+    expected = naive_unicode(pattern, text)
+    for search in searchers(UNICODE):
+        assert search(pattern, text) == expected
+
+
+def test_unicode_random():
+    rnd = random.Random(575)
+    alphabet = "aAsSßẞiIİ"
+    for _ in range(400):
+        text = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 12)))
+        pattern = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(1, 3)))
+        expected = naive_unicode(pattern, text)
+        for search in searchers(UNICODE):
+            assert search(pattern, text) == expected, (pattern, text)
+
+
+def test_ascii_folds_only_ascii_letters():
+    rnd = random.Random(3)
+    alphabet = "aAbBßİ"
+    for _ in range(400):
+        text = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 20)))
+        pattern = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(1, 3)))
+        expected = naive_ascii(pattern, text)
+        for search in searchers(ASCII):
+            assert search(pattern, text) == expected, (pattern, text)
+
+
+def test_ascii_bytes():
+    assert BoyerMooreSearch(b"NEEDLE", ASCII).findall(b"a needle, a NeEdLe") == [2, 12]
+    assert ShiftOrSearch(b"NEEDLE", ASCII).findall(b"a needle, a NeEdLe") == [2, 12]
+
+
+def test_sensitive_keeps_text():
+    assert fold_text("Straße", SENSITIVE) == ("Straße", None)
+    assert KMP().kmpSearch("ss", "Straße", case=SENSITIVE) == []
+
+
+def test_unicode_rejects_bytes():
+    with pytest.raises(TypeError):
+        BoyerMooreSearch(b"ss", UNICODE)
+
+
+def test_fold_text_offsets():
+    assert fold_text("aß", UNICODE) == ("ass", [0, 1, 1])
+    assert fold_text("AbC", ASCII) == ("abc", None)
+    assert fold_text(b"AbC", ASCII) == (b"abc", None)
+
+
+def test_map_matches_drops_partial_characters():
+    # "ßs" folds to "sss": "ss" covering the whole ß is a match,
+    # matches starting or ending inside it are not
+    folded, offsets = fold_text("ßs", UNICODE)
+    assert list(map_matches([0, 1, 2], offsets, 1)) == [1]
+    assert list(map_matches([0, 1], offsets, 2)) == [0]
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        check_mode("lower")
+    with pytest.raises(ValueError):
+        KMP().kmpSearch("a", "a", case="lower")
+    with pytest.raises(ValueError):
+        BoyerMooreSearch("a", "lower")
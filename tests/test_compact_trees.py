@@ -0,0 +1,125 @@
+"""
+The struct-of-arrays AVL and red black trees against a set, with their
+balance and colour invariants, for inline 'q' keys and for keys kept in
+a list.
+"""
+import random
+
+import pytest
+
+from avl.compactAvl import CompactAVLTree
+from redBlackTree.compactRedBlackTree import BLACK, RED, CompactRedBlackTree
+
+
+def check_avl(tree):
+    """
+    Returns the keys in order, checking the stored depths
+    and the balance of every reachable node.
+    """
+    keys = []
+
+    def walk(node):
+        if not node:
+            return 0
+        left = walk(tree.left[node])
+        keys.append(tree.keys[node])
+        right = walk(tree.right[node])
+        assert abs(left - right) <= 1
+        assert tree.depth[node] == 1 + max(left, right)
+        return tree.depth[node]
+
+    walk(tree.root)
+    assert keys == sorted(set(keys))
+    return keys
+
+
+def check_red_black(tree):
+    """
+    Returns the keys in order, checking the parent links,
+    that no red node has a red child and that every path
+    has the same number of black nodes.
+    """
+    keys = []
+
+    def walk(node, parent):
+        if not node:
+            return 1
+        assert tree.parent[node] == parent
+        if tree.color[node] == RED:
+            assert tree.color[tree.left[node]] == BLACK and tree.color[tree.right[node]] == BLACK
+        left = walk(tree.left[node], node)
+        keys.append(tree.keys[node])
+        right = walk(tree.right[node], node)
+        assert left == right
+        return left + (tree.color[node] == BLACK)
+
+    assert tree.color[tree.root] == BLACK
+    walk(tree.root, 0)
+    assert keys == sorted(set(keys))
+    return keys
+
+
+class AVL:
+    make = CompactAVLTree
+    check = staticmethod(check_avl)
+    delete = staticmethod(lambda tree, key: tree.delete(key))
+
+
+class RedBlack:
+    make = CompactRedBlackTree
+    check = staticmethod(check_red_black)
+    delete = staticmethod(lambda tree, key: tree.delete_node(key))
+
+
+KINDS = [AVL, RedBlack]
+
+
+@pytest.mark.parametrize("key_type", ["q", None])
+@pytest.mark.parametrize("kind", KINDS, ids=["avl", "redblack"])
+def test_random_updates(kind, key_type):
+    rnd = random.Random(13)
+    tree = kind.make(key_type)
+    expected = set()
+    for step in range(4000):
+        key = rnd.randrange(400)
+        if rnd.random() < 0.55:
+            assert tree.insert(key) == (key not in expected)
+            expected.add(key)
+        else:
+            assert kind.delete(tree, key) == (key in expected)
+            expected.discard(key)
+        if step % 200 == 0:
+            assert kind.check(tree) == sorted(expected)
+    assert kind.check(tree) == sorted(expected)
+    assert len(tree) == len(expected)
+    for key in range(-1, 401):
+        assert tree.search(key) == (key in expected)
+
+
+@pytest.mark.parametrize("kind", KINDS, ids=["avl", "redblack"])
+def test_list_keys(kind):
+    tree = kind.make(None)
+    words = ["pear", "apple", "fig", "kiwi", "plum"]
+    for word in words:
+        tree.insert(word)
+    assert kind.check(tree) == sorted(words)
+    assert tree.search("fig") and not tree.search("grape")
+
+
+@pytest.mark.parametrize("kind", KINDS, ids=["avl", "redblack"])
+def test_freed_slots(kind):
+    tree = kind.make(None)
+    keys = ["key%02d" % i for i in range(50)]
+    for key in keys:
+        tree.insert(key)
+    for key in keys[::2]:
+        kind.delete(tree, key)
+    # freed slots drop their keys in list mode and are reused
+    assert len(tree.free) == 25
+    assert all(tree.keys[slot] is None for slot in tree.free)
+    slots = len(tree.keys)
+    for key in keys[::2]:
+        tree.insert(key)
+    assert len(tree.keys) == slots and not tree.free
+    assert kind.check(tree) == keys
+
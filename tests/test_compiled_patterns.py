@@ -0,0 +1,77 @@
+"""
+Compiled patterns of every engine against a naive search, and the LRU
+pattern cache.
+"""
+import pytest
+
+from caseFold.caseFold import UNICODE
+from matcher.matcher import BOYER_MOORE, ENGINES, KMP_ENGINE, CompiledPattern, PatternCache, compile
+from tests.helpers import CASES, naive
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_compiled_engines(engine):
+    for pattern, text in CASES[:500]:
+        compiled = compile(pattern, engine)
+        expected = naive(pattern, text)
+        assert compiled.findall(text) == expected
+        assert compiled.count(text) == len(expected)
+        assert compiled.find_first(text) == (expected[0] if expected else -1)
+        assert compiled.contains(text) == bool(expected)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_compiled_bytes(engine):
+    compiled = compile(bytearray(b"aba"), engine)
+    assert compiled.findall(b"ababa") == [0, 2]
+    with pytest.raises(TypeError):
+        compiled.findall("ababa")
+
+
+def test_compiled_pattern_is_immutable():
+    compiled = CompiledPattern("abc")
+    with pytest.raises(AttributeError):
+        compiled.pattern = "xyz"
+    with pytest.raises(ValueError):
+        CompiledPattern("")
+    with pytest.raises(ValueError):
+        CompiledPattern("abc", engine="regex")
+
+
+def test_cache_hits_misses_and_evictions():
+    cache = PatternCache(maxsize=2)
+    first = cache.get("a", BOYER_MOORE)
+    assert cache.get("a", BOYER_MOORE) is first
+    # engine, case and str/bytes are part of the key
+    assert cache.get("a", KMP_ENGINE) is not first
+    assert cache.get("a", BOYER_MOORE, UNICODE) is not first
+    assert cache.get(b"a", BOYER_MOORE).pattern == b"a"
+    assert cache.info() == {"hits": 1, "misses": 4, "evictions": 2, "size": 2, "maxsize": 2}
+
+
+def test_cache_is_lru():
+    cache = PatternCache(maxsize=2)
+    a = cache.get("a", BOYER_MOORE)
+    cache.get("b", BOYER_MOORE)
+    assert cache.get("a", BOYER_MOORE) is a
+    cache.get("c", BOYER_MOORE)
+    # "b" was the least recently used
+    assert cache.get("a", BOYER_MOORE) is a
+    assert cache.info()["misses"] == 3
+    cache.get("b", BOYER_MOORE)
+    assert cache.info()["misses"] == 4
+
+
+def test_cache_resize_and_clear():
+    cache = PatternCache(maxsize=3)
+    for pattern in "abc":
+        cache.get(pattern, BOYER_MOORE)
+    cache.resize(1)
+    assert cache.info()["size"] == 1 and cache.info()["evictions"] == 2
+    cache.resize(0)
+    cache.get("d", BOYER_MOORE)
+    assert cache.info()["size"] == 0
+    cache.clear()
+    assert cache.info() == {"hits": 0, "misses": 0, "evictions": 0, "size": 0, "maxsize": 0}
+    with pytest.raises(ValueError):
+        PatternCache(-1)
@@ -0,0 +1,69 @@
+"""
+ConcurrentTree under threads, through the treeStress driver, and the
+invariant checks the driver relies on.
+"""
+import threading
+
+import pytest
+
+from concurrentTree.concurrentTree import ConcurrentTree
+from concurrentTree.treeStress import CHECKS, TREES, check_avl, check_red_black, main, stress
+from redBlackTree.redBlackTree import NodeColor
+from tests.helpers import AVL, RedBlack
+
+
+@pytest.mark.parametrize("name", sorted(TREES))
+def test_stress(name):
+    elapsed, failures = stress(name, threads=4, ops=1500, key_space=2048, seed=19)
+    assert failures == []
+
+
+def test_main_exit_status(capsys):
+    assert main(["--threads", "2", "--ops", "200", "--key-space", "512"]) == 0
+    assert "FAILED" not in capsys.readouterr().out
+
+
+def test_checks_catch_broken_trees():
+    tree = AVL.make(range(10), stats=False)
+    tree.root.depth += 1
+    with pytest.raises(AssertionError):
+        check_avl(tree)
+
+    tree = RedBlack.make(range(10), stats=False)
+    tree.root.color = NodeColor.RED
+    with pytest.raises(AssertionError):
+        check_red_black(tree)
+    tree.root.color = NodeColor.BLACK
+    tree.root.left.parent = None
+    with pytest.raises(AssertionError):
+        check_red_black(tree)
+
+
+@pytest.mark.parametrize("name", sorted(TREES))
+def test_buffered_writes_from_threads(name):
+    shared = ConcurrentTree(TREES[name](), batch_size=7)
+
+    def write(offset):
+        for key in range(offset, 1000, 4):
+            shared.insert_later(key)
+        for key in range(offset, 1000, 8):
+            shared.delete_later(key)
+
+    threads = [threading.Thread(target=write, args=(offset,)) for offset in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    shared.flush()
+    expected = [key for key in range(1000) if key % 8 >= 4]
+    assert shared.read(CHECKS[name]) == expected
+    assert list(shared.search_many([4, 8])) == [True, False]
+
+
+def test_read_lock_is_not_reentrant():
+    shared = ConcurrentTree(TREES["avl"]())
+    with pytest.raises(RuntimeError):
+        shared.read(lambda tree: shared.search(1))
+    # the lock is usable again afterwards
+    shared.insert(1)
+    assert shared.search(1)
@@ -0,0 +1,73 @@
+"""
+KMP and the streaming KMPStream against a naive search, with the text
+cut into chunks at random places.
+"""
+import io
+import random
+
+import pytest
+
+from caseFold.caseFold import SENSITIVE
+from kmp.kmp import KMP, KMPStream
+from tests.helpers import CASES, naive
+
+# inputs that used to fail
+REGRESSIONS = [
+    # the character after a mismatch with j > 0 was skipped
+    ("ab", "aab"),
+    # a mismatch at j == 0 read lcsTable[-1], giving offset -1
+    ("bab", "ab"),
+]
+
+
+def random_chunks(rnd, text, pieces=4):
+    cuts = sorted(rnd.randint(0, len(text)) for _ in range(pieces - 1))
+    return [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+
+
+@pytest.mark.parametrize("pattern, text", REGRESSIONS)
+def test_regressions(pattern, text):
+    expected = naive(pattern, text)
+    assert KMP().kmpSearch(pattern, text, case=SENSITIVE) == expected
+    assert KMPStream(pattern).feed(text) == expected
+
+
+def test_kmp_search():
+    for pattern, text in CASES:
+        assert KMP().kmpSearch(pattern, text, case=SENSITIVE) == naive(pattern, text), (pattern, text)
+
+
+def test_stream_chunks():
+    rnd = random.Random(7)
+    for pattern, text in CASES[:300]:
+        chunks = random_chunks(rnd, text)
+        assert list(KMPStream(pattern).matches(chunks)) == naive(pattern, text), (pattern, chunks)
+
+
+def test_stream_single_characters_and_reset():
+    stream = KMPStream("aba")
+    assert [stream.feed(c) for c in "ababa"] == [[], [], [0], [], [2]]
+    stream.reset()
+    assert stream.feed("xaba") == [1]
+
+
+def test_stream_file():
+    text = "abcab" * 1000
+    expected = naive("cabca", text)
+    assert list(KMPStream("cabca").searchFile(io.StringIO(text), chunkSize=7)) == expected
+    assert list(KMPStream(b"cabca").searchFile(io.BytesIO(text.encode()), chunkSize=7)) == expected
+
+
+def test_stream_rejects_empty_pattern():
+    with pytest.raises(ValueError):
+        KMPStream("")
+
+
+def test_scan_carries_partial_match():
+    table = KMP.myLCSTable("aba", 3)
+    scan = KMP.kmpScan("aba", table, "ba", 1)
+    assert next(scan) == -1
+    with pytest.raises(StopIteration) as done:
+        next(scan)
+    # "aba" matched, then "a" is still a partial match
+    assert done.value.value == 1
@@ -0,0 +1,58 @@
+"""
+rank, select, count_range and median of both trees against a sorted
+list, and the subtree sizes behind them after random updates.
+"""
+import bisect
+import random
+
+import pytest
+
+from tests.helpers import TREES
+
+
+@pytest.mark.parametrize("kind", TREES, ids=lambda kind: kind.name)
+def test_sizes_after_random_updates(kind):
+    rnd = random.Random(575)
+    tree = kind.make()
+    expected = set()
+    for step in range(3000):
+        key = rnd.randrange(300)
+        if rnd.random() < 0.55:
+            kind.insert(tree, key)
+            expected.add(key)
+        else:
+            kind.delete(tree, key)
+            expected.discard(key)
+        if step % 100 == 0:
+            assert kind.check(tree) == sorted(expected)
+    assert kind.check(tree) == sorted(expected)
+
+
+@pytest.mark.parametrize("kind", TREES, ids=lambda kind: kind.name)
+def test_order_statistics(kind):
+    rnd = random.Random(14)
+    keys = rnd.sample(range(2000), 500)
+    tree = kind.make(keys)
+    for key in rnd.sample(keys, 200):
+        kind.delete(tree, key)
+        keys.remove(key)
+    keys.sort()
+    kind.check(tree)
+    for k in range(len(keys)):
+        assert tree.select(k) == keys[k]
+    for probe in range(-1, 2001, 7):
+        assert tree.rank(probe) == bisect.bisect_left(keys, probe)
+        hi = probe + rnd.randrange(100)
+        assert kind.count_range(tree, probe, hi) == bisect.bisect_right(keys, hi) - bisect.bisect_left(keys, probe)
+    assert tree.median() == keys[(len(keys) - 1) // 2]
+    with pytest.raises(IndexError):
+        tree.select(len(keys))
+
+
+@pytest.mark.parametrize("kind", TREES, ids=lambda kind: kind.name)
+def test_needs_order_statistics(kind):
+    tree = kind.make([1, 2, 3], stats=False)
+    with pytest.raises(RuntimeError):
+        tree.rank(2)
+    with pytest.raises(RuntimeError):
+        tree.select(0)
@@ -0,0 +1,59 @@
+"""
+Chunked parallel search against a single-process scan, with chunks
+small enough that many matches straddle a chunk boundary.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from caseFold.caseFold import ASCII, UNICODE
+from matcher.matcher import ENGINES, compile
+from parallelSearch.parallelSearch import parallel_search, parallel_search_file, plan_chunks
+
+TEXTS = [
+    ("aaa", "a" * 50),
+    ("abab", "ab" * 30 + "a"),
+    ("needle", "xneedleneedlexxneedle" * 4),
+    ("aab", "aabaabaaab" * 6),
+]
+
+
+@pytest.fixture(scope="module")
+def executor():
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        yield pool
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_matches_across_boundaries_are_reported_once(engine, executor):
+    for pattern, text in TEXTS:
+        expected = compile(pattern, engine).findall(text)
+        for chunk_size in range(1, len(pattern) + 3):
+            assert parallel_search(text, pattern, engine, workers=2, chunk_size=chunk_size,
+                                   executor=executor) == expected, (pattern, chunk_size)
+            assert parallel_search(text, pattern, engine, workers=1, chunk_size=chunk_size) == expected
+
+
+@pytest.mark.parametrize("case", [ASCII, UNICODE])
+def test_case_folding(case):
+    text = "Straße STRASSE strasse " * 3
+    for engine in ENGINES:
+        expected = compile("SS", engine, case).findall(text)
+        for chunk_size in (1, 2, 3, 5):
+            assert parallel_search(text, "SS", engine, case, workers=1, chunk_size=chunk_size) == expected
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_file(engine, tmp_path, executor):
+    path = tmp_path / "text.txt"
+    text = b"abcab" * 200
+    path.write_bytes(text)
+    expected = compile(b"cabca", engine).findall(text)
+    for chunk_size in (1, 4, 5, 7, 64):
+        assert parallel_search_file(str(path), "cabca", engine, workers=2, chunk_size=chunk_size,
+                                    executor=executor) == expected
+
+
+def test_plan_chunks():
+    assert plan_chunks(10, 2, 1, chunk_size=4) == [(0, 6, 4), (4, 10, 8), (8, 10, 10)]
+    assert plan_chunks(0, 2, 4, chunk_size=4) == []
@@ -0,0 +1,113 @@
+"""
+PersistentAVLTree against a set, checking that every older version is
+left unchanged, and the publication of versions by VersionedAVLTree.
+"""
+import random
+import threading
+
+import pytest
+
+from avl.persistentAvl import PersistentAVLTree, VersionedAVLTree, getDepth, getSize
+
+
+def check(tree):
+    """
+    Returns the keys in order, checking balance, depths
+    and sizes of every node.
+    """
+    keys = []
+
+    def walk(node):
+        if not node:
+            return
+        walk(node.left)
+        keys.append(node.data)
+        walk(node.right)
+        assert abs(getDepth(node.left) - getDepth(node.right)) <= 1
+        assert node.depth == 1 + max(getDepth(node.left), getDepth(node.right))
+        assert node.size == 1 + getSize(node.left) + getSize(node.right)
+
+    walk(tree.root)
+    assert keys == sorted(set(keys))
+    assert list(tree) == keys and len(tree) == len(keys)
+    return keys
+
+
+def test_old_versions_are_unchanged():
+    rnd = random.Random(18)
+    versions = [(PersistentAVLTree(), [])]
+    for _ in range(800):
+        tree, keys = versions[rnd.randrange(len(versions))]
+        key = rnd.randrange(300)
+        if rnd.random() < 0.6:
+            new, new_keys = tree.insert(key), sorted(set(keys) | {key})
+        else:
+            new, new_keys = tree.delete(key), [k for k in keys if k != key]
+        assert (new is tree) == (new_keys == keys)
+        versions.append((new, new_keys))
+    for tree, keys in versions:
+        assert check(tree) == keys
+
+
+def test_rank_select_and_search():
+    keys = list(range(0, 500, 5))
+    tree = PersistentAVLTree.fromSorted(keys)
+    assert check(tree) == keys
+    for k, key in enumerate(keys):
+        assert tree.select(k) == key
+        assert tree.rank(key) == k and tree.rank(key + 1) == k + 1
+        assert key in tree and key + 1 not in tree
+    with pytest.raises(IndexError):
+        tree.select(len(keys))
+
+
+def test_from_sorted_validates():
+    assert list(PersistentAVLTree.fromSorted([1, 1, 2, 3, 3])) == [1, 2, 3]
+    with pytest.raises(ValueError):
+        PersistentAVLTree.fromSorted([1, 3, 2])
+
+
+def test_versioned_publication():
+    versioned = VersionedAVLTree()
+    first = versioned.snapshot()
+    assert versioned.versioned() == (0, first)
+    versioned.insert(5)
+    versioned.insertMany([1, 9])
+    assert versioned.versioned()[0] == 2
+    assert list(versioned.snapshot()) == [1, 5, 9]
+    # no change, no new version
+    versioned.insert(5)
+    versioned.delete(7)
+    assert versioned.versioned()[0] == 2
+    versioned.delete(5)
+    assert versioned.versioned()[0] == 3 and list(versioned.snapshot()) == [1, 9]
+    assert list(first) == []
+
+
+def test_versions_match_their_trees_under_writers():
+    versioned = VersionedAVLTree()
+    seen = []
+    done = threading.Event()
+
+    def read():
+        while not done.is_set():
+            seen.append(versioned.versioned())
+
+    def write(offset):
+        for key in range(offset, 400, 4):
+            versioned.insert(key)
+
+    reader = threading.Thread(target=read)
+    writers = [threading.Thread(target=write, args=(offset,)) for offset in range(4)]
+    reader.start()
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    done.set()
+    reader.join()
+    seen.append(versioned.versioned())
+    # every insert adds one key, so version n holds n keys
+    for version, tree in seen:
+        assert len(tree) == version
+    assert seen[-1][0] == 400
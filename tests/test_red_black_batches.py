@@ -0,0 +1,79 @@
+"""
+RedBlackTree.insert_many and delete_many against a set: the per-value
+results in input order, the invariants afterwards and the rebuild taken
+for batches at least as large as the tree.
+"""
+import random
+
+import pytest
+
+from concurrentTree.treeStress import check_red_black
+from redBlackTree.redBlackTree import RedBlackTree, RedBlackTreeObserver
+from tests.helpers import RedBlack
+
+
+def expected_inserts(present, values):
+    results = []
+    for value in values:
+        results.append(value not in present)
+        present.add(value)
+    return results
+
+
+def expected_deletes(present, values):
+    results = []
+    for value in values:
+        results.append(value in present)
+        present.discard(value)
+    return results
+
+
+@pytest.mark.parametrize("stats", [False, True])
+def test_random_batches(stats):
+    rnd = random.Random(20)
+    tree = RedBlack.make(stats=stats)
+    present = set()
+    for _ in range(60):
+        size = rnd.choice([1, 5, 40, 300])
+        values = [rnd.randrange(1500) for _ in range(size)]
+        if rnd.random() < 0.6:
+            assert tree.insert_many(values) == expected_inserts(present, values)
+        else:
+            assert tree.delete_many(values) == expected_deletes(present, values)
+        check = RedBlack.check if stats else check_red_black
+        assert check(tree) == sorted(present)
+        assert len(tree) == len(present)
+
+
+def test_large_batches_rebuild(monkeypatch):
+    tree = RedBlack.from_sorted(range(0, 200, 2))
+    rebuilds = []
+    build = tree._build_from_sorted
+    monkeypatch.setattr(tree, "_build_from_sorted", lambda values: rebuilds.append(len(values)) or build(values))
+
+    values = list(range(50))
+    assert tree.insert_many(values[:10]) == [value % 2 == 1 for value in values[:10]]
+    assert rebuilds == []
+    values = list(range(300, 50, -1))
+    assert tree.insert_many(values) == [value % 2 == 1 or value >= 200 for value in values]
+    assert rebuilds == [len(tree)]
+    assert RedBlack.check(tree) == sorted(set(range(0, 200, 2)) | set(range(1, 10, 2)) | set(range(51, 301)))
+
+
+def test_observers_and_duplicates():
+    events = []
+
+    class Recorder(RedBlackTreeObserver):
+        def on_insert(self, tree, value, status):
+            events.append(("insert", value, status))
+
+        def on_delete(self, tree, value, status):
+            events.append(("delete", value, status))
+
+    tree = RedBlackTree(quiet=True)
+    tree.subscribe(Recorder())
+    assert tree.insert_many([3, 1, 3, 2]) == [True, True, False, True]
+    assert tree.delete_many([2, 5, 2]) == [True, False, False]
+    assert events == [("insert", 3, True), ("insert", 1, True), ("insert", 3, False), ("insert", 2, True),
+                      ("delete", 2, True), ("delete", 5, False), ("delete", 2, False)]
+    assert list(tree) == [1, 3]
@@ -0,0 +1,64 @@
+"""
+Join-based split, join and set operations of AVLTree, serial and over
+a process pool, against Python sets.
+"""
+import random
+
+import pytest
+
+from avl.avl import AVLTree
+from tests.helpers import AVL
+
+
+def test_avl_set_operations():
+    rnd = random.Random(16)
+    for _ in range(60):
+        first = set(rnd.sample(range(400), rnd.randrange(150)))
+        second = set(rnd.sample(range(400), rnd.randrange(150)))
+        for operation, expected in [("union", first | second), ("intersection", first & second),
+                                    ("difference", first - second)]:
+            a, b = AVL.make(first), AVL.make(second)
+            result = getattr(a, operation)(b)
+            assert AVL.check(result) == sorted(expected)
+            assert a.root is None and b.root is None
+
+
+def test_avl_split_and_join():
+    rnd = random.Random(17)
+    for _ in range(60):
+        keys = sorted(rnd.sample(range(500), rnd.randrange(200)))
+        pivot = rnd.randrange(-5, 505)
+        smaller, found, larger = AVL.make(keys).split(pivot)
+        assert found == (pivot in keys)
+        assert AVL.check(smaller) == [k for k in keys if k < pivot]
+        assert AVL.check(larger) == [k for k in keys if k > pivot]
+        joined = AVLTree.join(smaller, pivot if found else None, larger)
+        assert AVL.check(joined) == keys
+
+
+def test_avl_set_operations_reject_mixed_order_statistics():
+    from avl.parallelSetOps import parallelUnion
+
+    for combine in [AVLTree.union, AVLTree.intersection, AVLTree.difference,
+                    lambda a, b: AVLTree.join(a, 50, b), lambda a, b: parallelUnion(a, b, workers=2)]:
+        for first_stats in (True, False):
+            a = AVL.make(range(10), stats=first_stats)
+            b = AVL.make(range(100, 110), stats=not first_stats)
+            with pytest.raises(ValueError):
+                combine(a, b)
+            assert list(a) == list(range(10))
+            assert list(b) == list(range(100, 110))
+
+
+def test_parallel_set_operations():
+    from avl.parallelSetOps import DIFFERENCE, INTERSECTION, UNION, parallelSetOperation
+
+    rnd = random.Random(160)
+    first = set(rnd.sample(range(400000), 70000))
+    second = set(rnd.sample(range(400000), 60000))
+    for operation, expected in [(UNION, first | second), (INTERSECTION, first & second),
+                                (DIFFERENCE, first - second)]:
+        a, b = AVL.from_sorted(sorted(first)), AVL.from_sorted(sorted(second))
+        result = parallelSetOperation(operation, a, b, workers=2)
+        assert AVL.check(result) == sorted(expected)
+        assert a.root is None and b.root is None
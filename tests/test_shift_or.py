@@ -0,0 +1,76 @@
+"""
+ShiftOrSearch against a naive search for exact matches and against the
+edit distance dynamic program for approximate ones.
+"""
+import random
+
+import pytest
+
+from shiftOr.shiftOr import ShiftOrSearch
+from tests.helpers import CASES, naive
+
+
+def test_findall():
+    for pattern, text in CASES:
+        assert ShiftOrSearch(pattern).findall(text) == naive(pattern, text), (pattern, text)
+
+
+def test_long_pattern():
+    rnd = random.Random(3)
+    pattern = "".join(rnd.choice("acgt") for _ in range(150))
+    text = "".join(rnd.choice("acgt") for _ in range(500))
+    text = text[:200] + pattern + text[200:] + pattern
+    assert ShiftOrSearch(pattern).findall(text) == naive(pattern, text)
+
+
+def edit_distance_ends(pattern, text, max_errors):
+    """
+    (end, errors) of approximate occurrences, by the
+    O(n * m) dynamic program with a free start.
+    """
+    column = list(range(len(pattern) + 1))
+    ends = []
+    for i, c in enumerate(text):
+        new = [0]
+        for j in range(1, len(pattern) + 1):
+            new.append(min(column[j] + 1, new[j - 1] + 1, column[j - 1] + (pattern[j - 1] != c)))
+        column = new
+        if column[-1] <= max_errors:
+            ends.append((i + 1, column[-1]))
+    return ends
+
+
+def test_approximate():
+    rnd = random.Random(11)
+    for pattern, text in CASES[:800]:
+        max_errors = rnd.randrange(len(pattern))
+        expected = edit_distance_ends(pattern, text, max_errors)
+        assert ShiftOrSearch(pattern).findall_approximate(text, max_errors) == expected, (pattern, text, max_errors)
+
+
+def test_approximate_examples():
+    searcher = ShiftOrSearch("survey")
+    # "surgery": substitute v -> g and insert r
+    assert searcher.findall_approximate("surgery", 2) == [(5, 2), (6, 2), (7, 2)]
+    assert searcher.findall_approximate("surgery", 1) == []
+    assert ShiftOrSearch(b"abc").findall_approximate(b"xabx", 1) == [(3, 1), (4, 1)]
+
+
+def test_approximate_rejects_bad_error_counts():
+    searcher = ShiftOrSearch("abc")
+    for max_errors in (-1, 3):
+        with pytest.raises(ValueError):
+            searcher.findall_approximate("abc", max_errors)
+
+
+def test_interface():
+    searcher = ShiftOrSearch("aba")
+    assert searcher.count("ababa") == 2
+    assert searcher.find_first("xxaba") == 2
+    assert searcher.find_first("xx") == -1
+    assert searcher.contains("aba") and not searcher.contains("ab")
+    assert ShiftOrSearch().findall("ababa", pattern="ba") == [1, 3]
+    with pytest.raises(ValueError):
+        ShiftOrSearch().findall("abc")
+    with pytest.raises(TypeError):
+        searcher.findall(b"aba")
@@ -0,0 +1,41 @@
+"""
+Lazy iterators, range scans and neighbour lookups of both trees against
+a sorted list.
+"""
+import bisect
+import random
+
+import pytest
+
+from tests.helpers import TREES
+
+
+@pytest.mark.parametrize("kind", TREES, ids=lambda kind: kind.name)
+def test_traversal(kind):
+    rnd = random.Random(15)
+    keys = sorted(rnd.sample(range(1000), 300))
+    tree = kind.make(rnd.sample(keys, len(keys)), stats=False)
+    assert list(tree) == keys
+    assert list(tree.ascending()) == keys
+    assert list(tree.descending()) == keys[::-1]
+    for probe in range(-2, 1003, 3):
+        hi = probe + rnd.randrange(50)
+        assert list(tree.range(probe, hi)) == [k for k in keys if probe <= k <= hi]
+        i = bisect.bisect_right(keys, probe)
+        j = bisect.bisect_left(keys, probe)
+        assert tree.floor(probe) == (keys[i - 1] if i else None)
+        assert tree.ceiling(probe) == (keys[j] if j < len(keys) else None)
+        assert tree.predecessor(probe) == (keys[j - 1] if j else None)
+        assert tree.successor(probe) == (keys[i] if i < len(keys) else None)
+
+
+@pytest.mark.parametrize("kind", TREES, ids=lambda kind: kind.name)
+def test_iterators_are_lazy_and_empty_trees(kind):
+    tree = kind.make(range(100), stats=False)
+    scan = tree.range(10, 90)
+    assert next(scan) == 10
+    assert next(scan) == 11
+    empty = kind.make(stats=False)
+    assert list(empty) == [] and list(empty.range(0, 10)) == []
+    assert empty.floor(5) is None and empty.ceiling(5) is None
+    assert list(tree.range(50, 40)) == []
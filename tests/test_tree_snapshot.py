@@ -0,0 +1,125 @@
+"""
+Snapshot round trips of both trees, lookups on a mapped SnapshotView,
+and rejection of keys and files a snapshot cannot hold.
+"""
+import bisect
+import random
+import struct
+import sys
+from array import array
+
+import pytest
+
+from avl.avl import AVLTree
+from redBlackTree.redBlackTree import RedBlackTree
+from tests.helpers import TREES
+from treeSnapshot.treeSnapshot import (HEADER, MAGIC, VERSION, SnapshotView, key_type_of, read_snapshot,
+                                       write_snapshot)
+
+
+def load(kind, path):
+    if kind.name == "avl":
+        return AVLTree.load(path, orderStatistics=True)
+    return RedBlackTree.load(path, quiet=True, order_statistics=True)
+
+
+def write_raw(path, key_type, keys, byte_order=sys.byteorder):
+    """
+    Writes a snapshot without any of the checks of
+    write_snapshot.
+    """
+    data = array(key_type, keys)
+    if byte_order != sys.byteorder:
+        data.byteswap()
+    order = b"\x00" if byte_order == "little" else b"\x01"
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, key_type.encode("ascii"), order, len(data)))
+        data.tofile(f)
+
+
+@pytest.mark.parametrize("kind", TREES, ids=lambda kind: kind.name)
+@pytest.mark.parametrize("keys", [[], [7], list(range(-500, 500, 3)), [-2.5, 0.0, 2 ** 53, 1e300]])
+def test_round_trip(kind, keys, tmp_path):
+    path = str(tmp_path / "tree.snap")
+    kind.from_sorted(keys).save(path)
+    tree = load(kind, path)
+    assert kind.check(tree) == keys
+    assert list(read_snapshot(path)) == keys
+
+
+def test_view_lookups(tmp_path):
+    rnd = random.Random(17)
+    keys = sorted(rnd.sample(range(-10000, 10000), 2000))
+    path = str(tmp_path / "view.snap")
+    write_snapshot(path, keys)
+    with SnapshotView(path) as view:
+        assert view.key_type == "q"
+        assert len(view) == len(keys) and list(view) == keys and view[5] == keys[5]
+        for probe in range(-10005, 10005, 7):
+            i, j = bisect.bisect_left(keys, probe), bisect.bisect_right(keys, probe)
+            assert (probe in view) == (i < j)
+            assert view.rank(probe) == i
+            assert view.floor(probe) == (keys[j - 1] if j else None)
+            assert view.ceiling(probe) == (keys[i] if i < len(keys) else None)
+            assert list(view.range(probe, probe + 50)) == keys[i:bisect.bisect_right(keys, probe + 50)]
+
+
+def test_key_types():
+    assert key_type_of([1, 2 ** 63 - 1, -2 ** 63]) == "q"
+    assert key_type_of([1, 2.5, 2 ** 53]) == "d"
+    with pytest.raises(ValueError):
+        key_type_of([2 ** 63])
+    with pytest.raises(ValueError):
+        key_type_of([0.5, 2 ** 53 + 1])
+    for keys in (["a"], [True, 2], [1, None]):
+        with pytest.raises(TypeError):
+            key_type_of(keys)
+
+
+def test_write_rejects(tmp_path):
+    path = str(tmp_path / "bad.snap")
+    with pytest.raises(ValueError):
+        write_snapshot(path, [1, 2], "i")
+    with pytest.raises(ValueError):
+        write_snapshot(path, [2, 1])
+    with pytest.raises(ValueError):
+        write_snapshot(path, [1, 1])
+    # distinct ints that are equal as floats
+    with pytest.raises(ValueError):
+        write_snapshot(path, [2 ** 53, 2 ** 53 + 1], "d")
+    with pytest.raises(ValueError):
+        write_snapshot(path, [0.0, float("nan")])
+    with pytest.raises(TypeError):
+        write_snapshot(path, ["a", "b"])
+
+
+@pytest.mark.parametrize("kind", TREES, ids=lambda kind: kind.name)
+def test_load_rejects_unsorted_files(kind, tmp_path):
+    path = str(tmp_path / "unsorted.snap")
+    write_raw(path, "q", [1, 3, 2])
+    with pytest.raises(ValueError):
+        load(kind, path)
+    write_raw(path, "q", [1, 1])
+    with pytest.raises(ValueError):
+        load(kind, path)
+
+
+def test_corrupt_files(tmp_path):
+    path = tmp_path / "corrupt.snap"
+    good = HEADER.pack(MAGIC, VERSION, b"q", b"\x00", 1) + struct.pack("<q", 5)
+    for data in [b"TSNP", b"XXXX" + good[4:], HEADER.pack(MAGIC, VERSION + 1, b"q", b"\x00", 1) + good[16:],
+                 HEADER.pack(MAGIC, VERSION, b"s", b"\x00", 1) + good[16:], good + b"\x00"]:
+        path.write_bytes(data)
+        with pytest.raises(ValueError):
+            read_snapshot(str(path))
+        with pytest.raises(ValueError):
+            SnapshotView(str(path))
+
+
+def test_other_byte_order(tmp_path):
+    path = str(tmp_path / "swapped.snap")
+    other = "big" if sys.byteorder == "little" else "little"
+    write_raw(path, "q", [-3, 1, 2 ** 40], byte_order=other)
+    assert list(read_snapshot(path)) == [-3, 1, 2 ** 40]
+    with pytest.raises(ValueError):
+        SnapshotView(path)
@@ -0,0 +1,55 @@
+"""
+Operation counters of both trees, used directly and through
+ConcurrentTree.
+"""
+import random
+
+import pytest
+
+from avl.avl import AVLTree
+from concurrentTree.concurrentTree import ConcurrentTree
+from redBlackTree.redBlackTree import RedBlackTree
+
+
+def avl_tree():
+    tree = AVLTree()
+    return tree, tree.enableStats(), tree.statsSnapshot
+
+
+def red_black_tree():
+    tree = RedBlackTree(quiet=True)
+    return tree, tree.enable_stats(), tree.stats_snapshot
+
+
+@pytest.mark.parametrize("make", [avl_tree, red_black_tree], ids=["avl", "redblack"])
+def test_concurrent_searches_are_counted(make):
+    rnd = random.Random(21)
+    tree, stats, snapshot = make()
+    shared = ConcurrentTree(tree)
+    keys = rnd.sample(range(10000), 1000)
+    for key in keys:
+        shared.insert(key)
+    assert stats.searches == 0
+    assert stats.rotations > 0
+
+    probes = [rnd.randrange(10000) for _ in range(500)]
+    visited = stats.nodes_visited
+    present = set(keys)
+    assert [shared.search(key) for key in probes] == [key in present for key in probes]
+    counts = snapshot()
+    assert counts["searches"] == len(probes)
+    assert counts["nodes_visited"] > visited
+    # a search visits at most one node per level
+    assert 1 <= counts["visited_per_search"] <= counts["height"] + 1
+
+
+@pytest.mark.parametrize("make", [avl_tree, red_black_tree], ids=["avl", "redblack"])
+def test_reset(make):
+    tree, stats, snapshot = make()
+    shared = ConcurrentTree(tree)
+    for key in range(100):
+        shared.insert(key)
+    stats.reset()
+    assert all(value == 0 for name, value in snapshot().items() if name != "height")
+    shared.search(5)
+    assert snapshot()["searches"] == 1
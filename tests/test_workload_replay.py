@@ -0,0 +1,78 @@
+"""
+Parsing and running replay files, and the exit status of the driver.
+"""
+import json
+
+import pytest
+
+from benchmark.workloadReplay import Replay, main
+
+
+def test_parse_valid_lines():
+    replay = Replay()
+    assert replay.parse("avl insert 42") == ("avl", "insert", [42])
+    assert replay.parse("redblack delete -7") == ("redblack", "delete", [-7])
+    assert replay.parse('kmp search needle "a needle, a Needle"') == ("kmp", "search", ["needle", "a needle, a Needle"])
+    assert replay.parse("shift_or search ab abab") == ("shift_or", "search", ["ab", "abab"])
+
+
+@pytest.mark.parametrize("line", [
+    "avl",
+    "avl insert",
+    "avl insert 1 2",
+    "avl insert x",
+    "avl rotate 1",
+    "btree insert 1",
+    "kmp search needle",
+    "kmp insert a b",
+    'kmp search "unterminated text',
+])
+def test_parse_malformed_lines(line):
+    with pytest.raises(ValueError):
+        Replay().parse(line)
+
+
+def test_run_counts_hits_and_errors():
+    replay = Replay()
+    replay.run([
+        "# comment",
+        "",
+        "avl insert 1",
+        "avl insert 1",
+        "avl search 1",
+        "redblack insert 1",
+        "redblack delete 2",
+        "kmp search data 'DATA data'",
+        "boyer_moore search data 'DATA data'",
+        "avl insert one",
+        "boyer_moore search '' text",
+    ])
+    results = {(r["target"], r["operation"]): r for r in replay.results()}
+    assert results[("avl", "insert")]["count"] == 2
+    assert results[("avl", "insert")]["hits"] == 1
+    assert results[("avl", "search")]["hits"] == 1
+    assert results[("redblack", "delete")]["hits"] == 0
+    assert replay.handlers[("kmp", "search")]("data", "DATA data") == 2
+    assert replay.handlers[("boyer_moore", "search")]("data", "DATA data") == 1
+    assert replay.error_count == 2
+    assert replay.errors[0].startswith("line 10:")
+    assert replay.errors[1].startswith("line 11:")
+
+
+def test_case_option():
+    replay = Replay("sensitive")
+    assert replay.handlers[("kmp", "search")]("data", "DATA data") == 1
+
+
+def test_exit_status(tmp_path, capsys):
+    good = tmp_path / "good.txt"
+    good.write_text("avl insert 1\nredblack search 1\n")
+    output = tmp_path / "replay.json"
+    assert main([str(good), "--output", str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert report["skipped"] == 0 and len(report["results"]) == 2
+
+    bad = tmp_path / "bad.txt"
+    bad.write_text("avl insert 1\navl frobnicate 1\n")
+    assert main([str(bad)]) == 1
+    assert "line 2:" in capsys.readouterr().err
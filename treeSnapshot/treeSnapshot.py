@@ -0,0 +1,222 @@
+"""
+Binary snapshots of the keys of a tree.
+
+A snapshot is the sorted key array of an AVLTree or RedBlackTree with
+a fixed 16 byte header:
+
+offset  size  field
+0       4     magic b"TSNP"
+4       2     format version, little endian
+6       1     key typecode, b"q" (64-bit int) or b"d" (64-bit float)
+7       1     byte order of the keys, 0 little endian, 1 big endian
+8       8     number of keys, little endian
+
+followed by the keys, 8 bytes each, in ascending order and without
+duplicates. Only the tree shape is lost, which is cheap to rebuild:
+loading builds a perfectly balanced tree in linear time.
+
+SnapshotView memory-maps a snapshot and serves read-only lookups by
+binary search straight from the mapped array, so nothing is built
+and only the touched pages are read from disk.
+
+Usage:
+tree.save("index.snap")
+tree = AVLTree.load("index.snap")
+with SnapshotView("index.snap") as view: 42 in view
+"""
+import bisect
+import mmap
+import operator
+import os
+import struct
+import sys
+from array import array
+from itertools import islice
+
+MAGIC = b"TSNP"
+VERSION = 1
+HEADER = struct.Struct("<4sHccQ")
+KEY_TYPES = ("q", "d")
+BYTE_ORDERS = {"little": b"\x00", "big": b"\x01"}
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+# every int up to this magnitude is exactly a float
+MAX_EXACT_FLOAT_INT = 2 ** 53
+
+
+def key_type_of(keys):
+    """
+    Typecode able to hold every key exactly: 'q' when they
+    are all 64-bit ints, 'd' when they are floats and ints
+    of at most 2**53 in magnitude. Raises ValueError for
+    keys neither can hold, rather than losing precision.
+    """
+    if all(isinstance(key, int) and not isinstance(key, bool) for key in keys):
+        if keys and not (INT64_MIN <= min(keys) and max(keys) <= INT64_MAX):
+            raise ValueError("int keys must fit in 64 bits")
+        return "q"
+    if all(isinstance(key, (int, float)) and not isinstance(key, bool) for key in keys):
+        for key in keys:
+            if isinstance(key, int) and abs(key) > MAX_EXACT_FLOAT_INT:
+                raise ValueError("int key %d mixed with float keys cannot be stored exactly" % key)
+        return "d"
+    raise TypeError("snapshots hold int or float keys only")
+
+
+def check_keys(keys):
+    """
+    Raises ValueError unless keys are strictly ascending,
+    which also rules out duplicates and NaN.
+    """
+    if all(map(operator.lt, keys, islice(keys, 1, None))):
+        return
+    for i in range(1, len(keys)):
+        if not keys[i - 1] < keys[i]:
+            raise ValueError("keys are not sorted and unique: " + str(keys[i]) + " after " + str(keys[i - 1]))
+
+
+def write_snapshot(path, keys, key_type=None):
+    """
+    Writes keys, ascending and unique, to path. The file is
+    written next to path and renamed over it, so readers
+    never see a half written snapshot.
+    """
+    keys = keys if isinstance(keys, list) else list(keys)
+    key_type = key_type or key_type_of(keys)
+    if key_type not in KEY_TYPES:
+        raise ValueError("Unknown key type %r, expected one of %s" % (key_type, ", ".join(KEY_TYPES)))
+    data = array(key_type, keys)
+    # checked after the conversion, so keys that only become
+    # equal as floats are caught too.
+    check_keys(data)
+    header = HEADER.pack(MAGIC, VERSION, key_type.encode("ascii"), BYTE_ORDERS[sys.byteorder], len(data))
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(header)
+        data.tofile(f)
+    os.replace(temp_path, path)
+
+
+def read_header(buffer, size):
+    """
+    Checks the header at the start of buffer against the
+    size of the file. Returns (key type, byte order, count).
+    """
+    if size < HEADER.size:
+        raise ValueError("not a tree snapshot: file too short")
+    magic, version, key_type, byte_order, count = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError("not a tree snapshot")
+    if version != VERSION:
+        raise ValueError("unsupported snapshot version %d, expected %d" % (version, VERSION))
+    key_type = key_type.decode("ascii")
+    if key_type not in KEY_TYPES or byte_order not in BYTE_ORDERS.values():
+        raise ValueError("corrupt snapshot header")
+    if size != HEADER.size + 8 * count:
+        raise ValueError("snapshot size does not match its key count")
+    return key_type, byte_order, count
+
+
+def read_snapshot(path):
+    """
+    Reads the keys of a snapshot into an array, converting
+    the byte order if the file was written on a machine
+    with the other one.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    key_type, byte_order, count = read_header(data, len(data))
+    keys = array(key_type)
+    keys.frombytes(data[HEADER.size:])
+    if byte_order != BYTE_ORDERS[sys.byteorder]:
+        keys.byteswap()
+    return keys
+
+
+class SnapshotView:
+    """
+    Read-only sorted key array memory-mapped from a
+    snapshot. Supports len, indexing, iteration and `in`,
+    plus search, rank, floor, ceiling and range in
+    O(log n). Close it, or use it as a context manager,
+    to unmap the file.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.key_type, byte_order, count = read_header(self._mapped, len(self._mapped))
+            if byte_order != BYTE_ORDERS[sys.byteorder]:
+                raise ValueError("snapshot was written with the other byte order, use read_snapshot")
+            self._view = memoryview(self._mapped)
+            self.keys = self._view[HEADER.size:].cast(self.key_type)
+        except Exception:
+            self._mapped.close()
+            raise
+
+    def validate(self):
+        """
+        Checks that the keys are sorted and unique, as
+        lookups and tree loading assume, in O(n). Returns
+        the view.
+        """
+        check_keys(self.keys)
+        return self
+
+    def close(self):
+        if self._mapped is not None:
+            self.keys.release()
+            self._view.release()
+            self._mapped.close()
+            self._mapped = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getitem__(self, index):
+        return self.keys[index]
+
+    def __iter__(self):
+        return iter(self.keys)
+
+    def __contains__(self, key):
+        return self.search(key)
+
+    def search(self, key):
+        i = bisect.bisect_left(self.keys, key)
+        return i < len(self.keys) and self.keys[i] == key
+
+    def rank(self, key):
+        """
+        Number of keys smaller than key.
+        """
+        return bisect.bisect_left(self.keys, key)
+
+    def floor(self, key):
+        """
+        Largest key <= key, None if there is none.
+        """
+        i = bisect.bisect_right(self.keys, key)
+        return self.keys[i - 1] if i else None
+
+    def ceiling(self, key):
+        """
+        Smallest key >= key, None if there is none.
+        """
+        i = bisect.bisect_left(self.keys, key)
+        return self.keys[i] if i < len(self.keys) else None
+
+    def range(self, low, high):
+        """
+        Generator over the keys with low <= key <= high.
+        """
+        keys = self.keys
+        for i in range(bisect.bisect_left(keys, low), bisect.bisect_right(keys, high)):
+            yield keys[i]
@@ -0,0 +1,38 @@
+"""
+Operation counters shared by AVLTree and RedBlackTree.
+
+A tree only counts while it has a TreeStats attached (see
+AVLTree.enableStats and RedBlackTree.enable_stats); otherwise every
+counting site is a single `is not None` test.
+
+Counters:
+comparisons      key comparisons made by search, insert and delete
+rotations        single rotations, including the two halves of a double one
+double_rotations LR/RL cases, each also counted as two rotations
+recolorings      colour changes made while rebalancing (red black only)
+searches         calls to search
+nodes_visited    nodes visited by those searches
+"""
+
+COUNTERS = ("comparisons", "rotations", "double_rotations", "recolorings", "searches", "nodes_visited")
+
+
+class TreeStats:
+    __slots__ = COUNTERS
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        for name in COUNTERS:
+            setattr(self, name, 0)
+
+    def snapshot(self, height):
+        """
+        The counters as a dict, with the current height
+        of the tree and the mean nodes visited per search.
+        """
+        counts = {name: getattr(self, name) for name in COUNTERS}
+        counts["height"] = height
+        counts["visited_per_search"] = self.nodes_visited / self.searches if self.searches else 0.0
+        return counts